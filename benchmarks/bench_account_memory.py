@@ -0,0 +1,62 @@
+# benchmarks/bench_account_memory.py
+"""Mémoire par compte : dictionnaire de MemoryAccount contre AccountStore.
+
+Les identifiants sont créés avant la mesure : seul le coût du stockage des
+comptes (index compris) est comptabilisé.
+
+Usage : python benchmarks/bench_account_memory.py --accounts 1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from src.app.core.core import MemoryAccount
+from src.app.core.store import AccountStore
+
+
+def _build_dict(account_ids):
+    accounts = {}
+    for i, account_id in enumerate(account_ids):
+        accounts[account_id] = MemoryAccount(id=account_id, balance=float(i), owner_id=1)
+    return accounts
+
+
+def _build_store(account_ids):
+    accounts = AccountStore()
+    for i, account_id in enumerate(account_ids):
+        accounts.add(account_id, i * 100, owner_id=1)
+    return accounts
+
+
+def measure(builder, account_ids):
+    """Retourne le nombre d'octets alloués par compte par `builder`."""
+    gc.collect()
+    tracemalloc.start()
+    container = builder(account_ids)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del container
+    return current / len(account_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    account_ids = [f"acc-{i:010d}" for i in range(args.accounts)]
+    legacy = measure(_build_dict, account_ids)
+    columnar = measure(_build_store, account_ids)
+    print(f"comptes               : {args.accounts:,}")
+    print(f"dict[MemoryAccount]   : {legacy:8.1f} octets/compte")
+    print(f"AccountStore          : {columnar:8.1f} octets/compte")
+    print(f"gain                  : {legacy / columnar:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
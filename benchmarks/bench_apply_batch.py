@@ -0,0 +1,70 @@
+# benchmarks/bench_apply_batch.py
+"""Rejeu d'un lot de règlement : appels unitaires contre BankingCore.apply_batch.
+
+Usage : python benchmarks/bench_apply_batch.py --ops 1000000 --accounts 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from src.app.core.core import BankingCore
+from src.app.core.events import OP_DEPOSIT, OP_WITHDRAW
+
+
+def _make_bank(account_ids):
+    bank = BankingCore()
+    for account_id in account_ids:
+        bank.create_account(account_id, 1000.0)
+    return bank
+
+
+def _scalar(bank, account_ids, rows, amounts, ops):
+    for row, amount, op in zip(rows.tolist(), amounts.tolist(), ops.tolist()):
+        if op == OP_DEPOSIT:
+            bank.deposit(account_ids[row], amount / 100)
+        else:
+            bank.withdraw(account_ids[row], -amount / 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--withdraw-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    account_ids = [f"acc-{i}" for i in range(args.accounts)]
+    rows = rng.integers(0, args.accounts, args.ops)
+    ops = np.where(rng.random(args.ops) < args.withdraw_ratio, OP_WITHDRAW, OP_DEPOSIT).astype(np.int8)
+    magnitudes = rng.integers(1, 10_000, args.ops)
+    amounts = np.where(ops == OP_DEPOSIT, magnitudes, -magnitudes)
+
+    scenarios = (
+        ("dépôts seuls", np.full(args.ops, OP_DEPOSIT, dtype=np.int8), magnitudes),
+        ("dépôts + retraits", ops, amounts),
+    )
+    for label, batch_ops, batch_amounts in scenarios:
+        bank = _make_bank(account_ids)
+        start = time.perf_counter()
+        _scalar(bank, account_ids, rows, batch_amounts, batch_ops)
+        scalar = time.perf_counter() - start
+
+        bank = _make_bank(account_ids)
+        start = time.perf_counter()
+        outcomes = bank.apply_batch(rows, batch_amounts, batch_ops)
+        vectorized = time.perf_counter() - start
+
+        print(f"{label:<18} scalaire {args.ops / scalar:>12,.0f} ops/s   "
+              f"apply_batch {args.ops / vectorized:>12,.0f} ops/s   "
+              f"(x{scalar / vectorized:.1f}, {int((outcomes == 1).sum()):,} appliquées)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_crud_bulk.py
+"""Benchmark d'import de transactions : crud ligne à ligne contre écritures en masse.
+
+Ligne à ligne : crud.create_transaction (add → commit → refresh). En masse :
+crud.create_transactions_bulk (INSERT multi-lignes + RETURNING, un commit) et
+crud.copy_transactions (COPY sur PostgreSQL, INSERT sans RETURNING ailleurs).
+
+Usage : python benchmarks/bench_crud_bulk.py --rows 200000 --database-url sqlite:///bulk.db
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# crud importe `schemas` en absolu (comme avec PYTHONPATH=src/app pour les tests)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "app")))
+os.environ.setdefault("TESTING", "1")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.app import crud
+from src.app.models import Base
+
+
+def _transactions(count):
+    return [{"type": "deposit", "amount": (i % 1000) + 0.25, "account_id": f"acc-{i % 1000}"}
+            for i in range(count)]
+
+
+def _rate(session_factory, count, load):
+    db = session_factory()
+    try:
+        start = time.perf_counter()
+        load(db, _transactions(count))
+        return count / (time.perf_counter() - start)
+    finally:
+        db.close()
+
+
+def run(rows=200_000, row_sample=2_000, database_url=None):
+    """Retourne (lignes/s ligne à ligne, lignes/s RETURNING, lignes/s COPY)."""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(database_url or f"sqlite:///{os.path.join(directory, 'bulk.db')}")
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        per_row = _rate(session_factory, row_sample,
+                        lambda db, items: [crud.create_transaction(db, item) for item in items])
+        returning = _rate(session_factory, rows, crud.create_transactions_bulk)
+        copy = _rate(session_factory, rows, crud.copy_transactions)
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+    return per_row, returning, copy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--database-url", help="base de test (détruite) ; SQLite temporaire par défaut")
+    args = parser.parse_args()
+
+    per_row, returning, copy = run(args.rows, database_url=args.database_url)
+    print(f"ligne à ligne  {per_row:>12,.0f} lignes/s")
+    print(f"RETURNING      {returning:>12,.0f} lignes/s   ({returning / per_row:,.0f}x)")
+    print(f"COPY / INSERT  {copy:>12,.0f} lignes/s   ({copy / per_row:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_event_actor.py
+"""Benchmark de POST /event : threadpool avec verrous contre écrivain unique asyncio.
+
+L'application tourne en processus (transport ASGI de httpx, sans réseau) ;
+`--clients` coroutines envoient des dépôts et des retraits en boucle. Pour
+chaque mode : requêtes/s et latences p50/p99/max.
+
+Usage : python benchmarks/bench_event_actor.py --clients 64 --requests 20000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# crud importe `schemas` en absolu (comme avec PYTHONPATH=src/app pour les tests)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "app")))
+os.environ.setdefault("TESTING", "1")
+
+import httpx
+
+from src.app import main as app_main
+from src.app.core import core
+
+
+async def _client(http, seed, count, account_ids, latencies):
+    rng = random.Random(seed)
+    for _ in range(count):
+        kind = "deposit" if rng.random() < 0.7 else "withdraw"
+        payload = {"type": kind, "account_id": rng.choice(account_ids), "amount": 1}
+        start = time.perf_counter()
+        response = await http.post("/event", json=payload)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 500:
+            raise RuntimeError(response.text)
+
+
+async def run(actor: bool, clients=64, requests=20_000, accounts=256):
+    """Retourne (requêtes/s, latences triées en secondes)."""
+    core.reset_memory()
+    account_ids = [f"acc-{i}" for i in range(accounts)]
+    for account_id in account_ids:
+        core.create_or_update_account(account_id, 1_000_000)
+    if actor:
+        app_main.ledger_actor.start()
+    latencies = []
+    transport = httpx.ASGITransport(app=app_main.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                _client(http, seed, requests // clients, account_ids, latencies)
+                for seed in range(clients)
+            ))
+            elapsed = time.perf_counter() - start
+    finally:
+        await app_main.ledger_actor.stop()
+    latencies.sort()
+    return len(latencies) / elapsed, latencies
+
+
+def _percentile(values, q):
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64, help="requêtes simultanées")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--accounts", type=int, default=256)
+    args = parser.parse_args()
+
+    # Une ligne de log httpx par requête fausserait la mesure
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    for label, actor in (("threadpool + verrous", False), ("acteur asyncio", True)):
+        throughput, latencies = asyncio.run(run(actor, args.clients, args.requests, args.accounts))
+        p50, p99 = (_percentile(latencies, q) * 1000 for q in (0.5, 0.99))
+        print(f"{label:<22} {throughput:>10,.0f} req/s   p50 {p50:6.2f} ms   "
+              f"p99 {p99:6.2f} ms   max {latencies[-1] * 1000:6.2f} ms")
+    core.reset_memory()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_fee_engine.py
+"""Benchmark du calcul de frais : boucle scalaire contre lot NumPy (searchsorted).
+
+Usage : python benchmarks/bench_fee_engine.py --transfers 5000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+import numpy as np
+
+from src.app.core.events import OP_DEPOSIT, OP_TRANSFER, OP_WITHDRAW
+from src.app.models.transaction_utils import FeeSchedule
+
+SCHEDULE = FeeSchedule({
+    "transfer": {"brackets": [(0, 250), (100, 150), (1_000, 80), (10_000, 40)],
+                 "minimum": 0.3, "cap": 50},
+    "withdraw": {"brackets": [(0, 100), (500, 50)], "progressive": True, "cap": 20},
+})
+
+
+def run(transfers=5_000_000, scalar_sample=200_000):
+    """Retourne (frais/s en scalaire, frais/s en lot)."""
+    rng = np.random.default_rng(0)
+    amounts = rng.integers(1, 5_000_000, size=transfers)
+    types = rng.choice([OP_DEPOSIT, OP_WITHDRAW, OP_TRANSFER], size=transfers)
+
+    sample_amounts = amounts[:scalar_sample].tolist()
+    sample_types = types[:scalar_sample].tolist()
+    start = time.perf_counter()
+    scalar = [SCHEDULE.fee_minor(a, t) for a, t in zip(sample_amounts, sample_types)]
+    scalar_rate = scalar_sample / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    fees = SCHEDULE.fees_minor(amounts, types)
+    batch_rate = transfers / (time.perf_counter() - start)
+    assert fees[:scalar_sample].tolist() == scalar
+    return scalar_rate, batch_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transfers", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    scalar_rate, batch_rate = run(args.transfers)
+    print(f"scalaire  {scalar_rate:>14,.0f} frais/s")
+    print(f"lot       {batch_rate:>14,.0f} frais/s   ({batch_rate / scalar_rate:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
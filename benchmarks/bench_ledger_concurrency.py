@@ -0,0 +1,86 @@
+# benchmarks/bench_ledger_concurrency.py
+"""Benchmark multi-thread du ledger en mémoire.
+
+Chaque thread applique des dépôts et des retraits sur un ensemble de comptes
+partagés. À la fin, le solde de chaque compte doit être exactement égal à la
+somme des opérations réussies : tout écart est une mise à jour perdue.
+
+Usage : python benchmarks/bench_ledger_concurrency.py --threads 8 --ops 50000
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from src.app.core import core
+
+
+def _worker(seed, ops, account_ids, applied, unsafe):
+    rng = random.Random(seed)
+    local = dict.fromkeys(account_ids, 0)
+    for _ in range(ops):
+        account_id = rng.choice(account_ids)
+        if rng.random() < 0.7:
+            if unsafe:
+                core.accounts[account_id].balance += 1
+            else:
+                core.create_or_update_account(account_id, 1)
+            local[account_id] += 1
+        elif unsafe:
+            account = core.accounts[account_id]
+            if account.balance >= 1:
+                account.balance -= 1
+                local[account_id] -= 1
+        elif core.withdraw_from_account(account_id, 1) is not None:
+            local[account_id] -= 1
+    applied.append(local)
+
+
+def run(threads=8, ops=50_000, accounts=16, unsafe=False):
+    """Lance le benchmark et retourne (ops/s, nombre de mises à jour perdues)."""
+    core.accounts.clear()
+    account_ids = [f"acc-{i}" for i in range(accounts)]
+    for account_id in account_ids:
+        core.accounts[account_id] = core.MemoryAccount(id=account_id, balance=0)
+
+    applied = []
+    workers = [
+        threading.Thread(target=_worker, args=(seed, ops, account_ids, applied, unsafe))
+        for seed in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    lost = 0
+    for account_id in account_ids:
+        expected = sum(local[account_id] for local in applied)
+        lost += abs(expected - core.accounts[account_id].balance)
+    return threads * ops / elapsed, lost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=50_000, help="opérations par thread")
+    parser.add_argument("--accounts", type=int, default=16)
+    parser.add_argument("--switch-interval", type=float, default=1e-6,
+                        help="intervalle de bascule du GIL (petit = plus d'entrelacements)")
+    args = parser.parse_args()
+
+    sys.setswitchinterval(args.switch_interval)
+    for label, unsafe in (("sans verrou", True), ("verrous par compte", False)):
+        throughput, lost = run(args.threads, args.ops, args.accounts, unsafe)
+        print(f"{label:<20} {throughput:>12,.0f} ops/s   mises à jour perdues : {lost}")
+
+
+if __name__ == "__main__":
+    main()
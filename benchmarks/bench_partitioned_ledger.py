@@ -0,0 +1,87 @@
+# benchmarks/bench_partitioned_ledger.py
+"""Débit du ledger partitionné selon le nombre de processus propriétaires.
+
+Pour chaque nombre de partitions, démarre les propriétaires puis `--clients`
+processus clients qui enchaînent dépôts, retraits et transferts (entre
+partitions pour la plupart). Le débit ne croît qu'avec des cœurs disponibles.
+
+Usage : python benchmarks/bench_partitioned_ledger.py --partitions 1 2 4 --clients 8
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from src.app.core.partition import LedgerClient, start_owners, stop_owners
+
+
+def _client(socket_dir, partitions, ids, ops, seed, results):
+    client = LedgerClient(socket_dir, partitions)
+    rng = random.Random(seed)
+    for _ in range(ops):
+        draw = rng.random()
+        account_id = rng.choice(ids)
+        if draw < 0.4:
+            client.create_or_update_account(account_id, 0)
+        elif draw < 0.7:
+            client.withdraw_from_account(account_id, 0.01)
+        else:
+            client.transfer_between_accounts(account_id, rng.choice(ids), 0.01)
+    client.close()
+    results.put(ops)
+
+
+def run(partitions, clients, ops, accounts):
+    socket_dir = tempfile.mkdtemp(prefix="ledger-bench-")
+    processes = start_owners(partitions, socket_dir)
+    try:
+        setup = LedgerClient(socket_dir, partitions)
+        ids = [f"bench-{i}" for i in range(accounts)]
+        for account_id in ids:
+            setup.create_or_update_account(account_id, 1000)
+        total_before = sum(setup.get_account_balance(account_id) for account_id in ids)
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        workers = [context.Process(target=_client,
+                                   args=(socket_dir, partitions, ids, ops, seed, results))
+                   for seed in range(clients)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        done = sum(results.get() for _ in workers)
+        elapsed = time.perf_counter() - start
+        for worker in workers:
+            worker.join()
+
+        # Les dépôts sont nuls : le total ne varie que par les retraits réussis
+        total_after = sum(setup.get_account_balance(account_id) for account_id in ids)
+        setup.close()
+        print(f"partitions={partitions:<3} ops={done:,} en {elapsed:.2f}s "
+              f"({done / elapsed:,.0f}/s)  total {total_before:.2f} -> {total_after:.2f}")
+    finally:
+        stop_owners(processes)
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--partitions", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8, help="processus clients")
+    parser.add_argument("--ops", type=int, default=5_000, help="opérations par client")
+    parser.add_argument("--accounts", type=int, default=1_000)
+    args = parser.parse_args()
+
+    for partitions in args.partitions:
+        run(partitions, args.clients, args.ops, args.accounts)
+
+
+if __name__ == "__main__":
+    main()
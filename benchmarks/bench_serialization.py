@@ -0,0 +1,67 @@
+# benchmarks/bench_serialization.py
+"""Benchmark de sérialisation d'une réponse /event : chemin FastAPI contre chemin rapide.
+
+Chemin FastAPI : construction validée de TransactionResponse, revalidation
+contre `response_model`, `jsonable_encoder` puis json.dumps (ce que fait
+FastAPI pour un modèle retourné). Chemin rapide (FAST_SERIALIZATION=1) :
+`model_construct` puis encodeur orjson précalculé.
+
+Usage : python benchmarks/bench_serialization.py --responses 200000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src.app.schemas import TransactionResponse
+from src.app.serialization import FastJSONResponse
+
+_RESPONSE_FIELD = TypeAdapter(TransactionResponse)
+
+
+def _default_path(account_id):
+    response = TransactionResponse(type="deposit", account_id=account_id, status="success")
+    validated = _RESPONSE_FIELD.validate_python(response, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode()
+
+
+def _fast_path(account_id):
+    response = TransactionResponse.model_construct(type="deposit", account_id=account_id,
+                                                   status="success", timestamp=datetime.now())
+    return FastJSONResponse(response, model=TransactionResponse).body
+
+
+def _rate(count, fn):
+    ids = [f"acc-{i % 1000}" for i in range(count)]
+    start = time.perf_counter()
+    for account_id in ids:
+        fn(account_id)
+    return count / (time.perf_counter() - start)
+
+
+def run(responses=200_000):
+    """Retourne (réponses/s chemin FastAPI, réponses/s chemin rapide)."""
+    assert json.loads(_default_path("a")).keys() == json.loads(_fast_path("a")).keys()
+    return _rate(responses, _default_path), _rate(responses, _fast_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--responses", type=int, default=200_000)
+    args = parser.parse_args()
+
+    default, fast = run(args.responses)
+    print(f"FastAPI   {default:>12,.0f} réponses/s")
+    print(f"rapide    {fast:>12,.0f} réponses/s   ({fast / default:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# benchmarks/bench_shared_balance.py
+"""Lecture d'un solde : table en mémoire partagée contre appel au propriétaire.
+
+Démarre les propriétaires de partitions avec publication en mémoire partagée,
+puis mesure le débit de lectures aléatoires par les deux chemins.
+
+Usage : python benchmarks/bench_shared_balance.py --partitions 2 --reads 100000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from src.app.core.partition import (
+    LedgerClient, PartitionedBalanceReader, start_owners, stop_owners,
+)
+
+
+def _measure(label, read, ids, reads):
+    rng = random.Random(0)
+    sample = [rng.choice(ids) for _ in range(reads)]
+    start = time.perf_counter()
+    for account_id in sample:
+        read(account_id)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<18}: {reads / elapsed:>12,.0f} lectures/s ({elapsed / reads * 1e6:.2f} µs)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--partitions", type=int, default=2)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--reads", type=int, default=100_000)
+    args = parser.parse_args()
+
+    socket_dir = tempfile.mkdtemp(prefix="ledger-bench-")
+    shm_name = f"ledger-bench-{uuid.uuid4().hex[:8]}"
+    processes = start_owners(args.partitions, socket_dir, shm_name=shm_name,
+                             shm_capacity=max(1024, args.accounts * 2))
+    client = LedgerClient(socket_dir, args.partitions)
+    reader = PartitionedBalanceReader(shm_name, args.partitions)
+    try:
+        ids = [f"acc-{i}" for i in range(args.accounts)]
+        for account_id in ids:
+            client.create_or_update_account(account_id, 100)
+        _measure("mémoire partagée", reader.get_account_balance, ids, args.reads)
+        _measure("socket Unix", client.get_account_balance, ids, min(args.reads, 20_000))
+    finally:
+        reader.close()
+        client.close()
+        stop_owners(processes)
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_snapshot_restore.py
+"""Benchmark du retour à un jeu de données initial : rechargement contre instantané.
+
+Rechargement : DROP/CREATE des tables puis réinsertion des comptes (ce que
+faisait /reset suivi du peuplement du harnais de charge). Instantané : copie
+des colonnes du store en mémoire et API de sauvegarde SQLite.
+
+Usage : python benchmarks/bench_snapshot_restore.py --accounts 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from sqlalchemy import create_engine, insert
+
+from src.app.core.snapshots import DatabaseSnapshots
+from src.app.core.store import AccountStore
+from src.app.models import Base
+from src.app.models.account import AccountModel
+
+_INSERT_CHUNK = 50_000
+
+
+def _seed(engine, store, accounts):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    store.clear()
+    with engine.begin() as conn:
+        for start in range(0, accounts, _INSERT_CHUNK):
+            rows = [{"id": f"acc-{i}", "balance": 100, "owner_id": 1}
+                    for i in range(start, min(start + _INSERT_CHUNK, accounts))]
+            conn.execute(insert(AccountModel), rows)
+            for row in rows:
+                store.add(row["id"], 10_000)
+
+
+def run(accounts=1_000_000):
+    """Retourne (secondes par rechargement, secondes par restauration)."""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        store = AccountStore()
+        start = time.perf_counter()
+        _seed(engine, store, accounts)
+        reseed = time.perf_counter() - start
+
+        snapshots = DatabaseSnapshots(engine)
+        memory = store.snapshot()
+        snapshots.save("seed")
+        store.add("extra", 1)
+        start = time.perf_counter()
+        store.restore(memory)
+        snapshots.restore("seed")
+        restore = time.perf_counter() - start
+        assert len(store) == accounts
+        snapshots.delete("seed")
+        engine.dispose()
+    return reseed, restore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    reseed, restore = run(args.accounts)
+    print(f"rechargement  {reseed:8.3f} s")
+    print(f"instantané    {restore:8.3f} s   ({reseed / restore:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_sqlite_tuning.py
+"""Benchmark SQLite : réglages par défaut contre mode haut débit (WAL, PRAGMA).
+
+Un écrivain commite une transaction par événement (comme /event avec
+persistance SQL) pendant que des lecteurs interrogent les soldes en boucle ;
+en mode haut débit les lecteurs passent par le pool en lecture seule.
+
+Usage : python benchmarks/bench_sqlite_tuning.py --commits 5000 --readers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from sqlalchemy import create_engine, text
+
+from src.app.models import database
+
+_ACCOUNTS = 1_000
+
+
+def _measure(write_engine, read_engine, commits, readers):
+    with write_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE accounts (id INTEGER PRIMARY KEY, balance INTEGER)"))
+        conn.execute(text("INSERT INTO accounts VALUES (:id, 0)"),
+                     [{"id": i} for i in range(_ACCOUNTS)])
+    done = threading.Event()
+    reads = [0] * readers
+
+    def read(slot):
+        with read_engine.connect() as conn:
+            while not done.is_set():
+                conn.execute(text("SELECT balance FROM accounts WHERE id = :id"),
+                             {"id": reads[slot] % _ACCOUNTS}).scalar()
+                conn.commit()
+                reads[slot] += 1
+
+    threads = [threading.Thread(target=read, args=(slot,)) for slot in range(readers)]
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    with write_engine.connect() as conn:
+        for i in range(commits):
+            conn.execute(text("UPDATE accounts SET balance = balance + 1 WHERE id = :id"),
+                         {"id": i % _ACCOUNTS})
+            conn.commit()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in threads:
+        thread.join()
+    return commits / elapsed, sum(reads) / elapsed
+
+
+def run(commits=5_000, readers=4):
+    """Retourne ((commits/s, lectures/s) par défaut, (commits/s, lectures/s) en mode haut débit)."""
+    results = []
+    for tuned in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            if tuned:
+                database.SQLITE_TUNING = True
+                write_engine = database.make_engine(url)
+                read_engine = database.make_read_engine(url, pool_size=readers)
+            else:
+                write_engine = read_engine = create_engine(
+                    url, connect_args={"check_same_thread": False}, pool_size=readers + 1)
+            results.append(_measure(write_engine, read_engine, commits, readers))
+            read_engine.dispose()
+            write_engine.dispose()
+    database.SQLITE_TUNING = False
+    return tuple(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=5_000)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    (default_commits, default_reads), (tuned_commits, tuned_reads) = run(args.commits, args.readers)
+    print(f"défaut       {default_commits:>10,.0f} commits/s  {default_reads:>12,.0f} lectures/s")
+    print(f"haut débit   {tuned_commits:>10,.0f} commits/s  {tuned_reads:>12,.0f} lectures/s"
+          f"   ({tuned_commits / default_commits:.1f}x commits, {tuned_reads / default_reads:.1f}x lectures)")
+
+
+if __name__ == "__main__":
+    main()
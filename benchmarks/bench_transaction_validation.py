@@ -0,0 +1,84 @@
+# benchmarks/bench_transaction_validation.py
+"""Benchmark de validation de TransactionCreate : validateurs v1 contre contraintes v2 natives.
+
+Compare l'ancien schéma (@validator de compatibilité v1), le schéma actuel
+validé événement par événement, et le même schéma validé par lot via
+TransactionBatch (un seul appel au cœur pydantic).
+
+Usage : python benchmarks/bench_transaction_validation.py --events 200000
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+from typing import Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from pydantic import BaseModel, Field
+
+from src.app.money import Money
+from src.app.schemas import TransactionBatch, TransactionCreate
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from pydantic import validator
+
+    class LegacyTransactionCreate(BaseModel):
+        """Schéma d'avant la migration, conservé pour la comparaison."""
+
+        type: str
+        amount: Money = Field(..., gt=0)
+        account_id: str
+        destination: Optional[str] = None
+
+        @validator('type')
+        def validate_type(cls, v):
+            if v not in ['deposit', 'withdraw', 'transfer']:
+                raise ValueError('Type must be deposit, withdraw, or transfer')
+            return v
+
+        @validator('amount')
+        def validate_amount(cls, v):
+            if v <= 0:
+                raise ValueError('Amount must be greater than 0')
+            return v
+
+
+def _events(count):
+    kinds = ("deposit", "withdraw", "transfer")
+    return [{"type": kinds[i % 3], "amount": (i % 1000) + 1.25, "account_id": f"acc-{i % 500}",
+             "destination": f"acc-{(i + 1) % 500}" if i % 3 == 2 else None}
+            for i in range(count)]
+
+
+def _rate(count, fn):
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def run(events=200_000):
+    """Retourne (validations/s v1, validations/s v2 unitaire, validations/s v2 par lot)."""
+    items = _events(events)
+    legacy = _rate(events, lambda: [LegacyTransactionCreate.model_validate(i) for i in items])
+    single = _rate(events, lambda: [TransactionCreate.model_validate(i) for i in items])
+    batch = _rate(events, lambda: TransactionBatch.validate_python(items))
+    return legacy, single, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    args = parser.parse_args()
+
+    legacy, single, batch = run(args.events)
+    print(f"v1 @validator  {legacy:>12,.0f} validations/s")
+    print(f"v2 unitaire    {single:>12,.0f} validations/s   ({single / legacy:.1f}x)")
+    print(f"v2 par lot     {batch:>12,.0f} validations/s   ({batch / legacy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
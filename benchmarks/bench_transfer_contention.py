@@ -0,0 +1,79 @@
+# benchmarks/bench_transfer_contention.py
+"""Contention des transferts sur des paires de comptes chaudes.
+
+Des threads transfèrent en continu dans les deux sens (A→B et B→A) sur un
+petit nombre de paires. Le benchmark mesure le débit et la latence par
+opération (p50/p99) et vérifie que la somme des soldes est conservée.
+
+Usage : python benchmarks/bench_transfer_contention.py --threads 16 --pairs 2
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("TESTING", "1")
+
+from src.app.core import core
+
+
+def _worker(seed, ops, pairs, latencies):
+    rng = random.Random(seed)
+    local = []
+    for _ in range(ops):
+        origin, dest = rng.choice(pairs)
+        if rng.random() < 0.5:
+            origin, dest = dest, origin
+        start = time.perf_counter_ns()
+        core.transfer_between_accounts(origin, dest, 1)
+        local.append(time.perf_counter_ns() - start)
+    latencies.extend(local)
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=20_000, help="transferts par thread")
+    parser.add_argument("--pairs", type=int, default=2, help="nombre de paires chaudes")
+    parser.add_argument("--switch-interval", type=float, default=1e-5)
+    args = parser.parse_args()
+
+    sys.setswitchinterval(args.switch_interval)
+    core.accounts.clear()
+    pairs = []
+    for i in range(args.pairs):
+        a, b = f"hot-{i}-a", f"hot-{i}-b"
+        core.create_or_update_account(a, 1000)
+        core.create_or_update_account(b, 1000)
+        pairs.append((a, b))
+    total_before = sum(account.balance for account in core.accounts.values())
+
+    latencies = []
+    threads = [threading.Thread(target=_worker, args=(seed, args.ops, pairs, latencies))
+               for seed in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total_after = sum(account.balance for account in core.accounts.values())
+    print(f"transferts      : {len(latencies):,} en {elapsed:.2f}s ({len(latencies) / elapsed:,.0f}/s)")
+    print(f"latence p50     : {_percentile(latencies, 0.50) / 1000:.1f} µs")
+    print(f"latence p99     : {_percentile(latencies, 0.99) / 1000:.1f} µs")
+    print(f"latence moyenne : {statistics.fmean(latencies) / 1000:.1f} µs")
+    print(f"total conservé  : {total_before == total_after} ({total_before} -> {total_after})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.app.models import UserModel, AccountModel, TransactionModel
+from schemas import UserCreate, AccountCreate
+
+# Pendant asynchrone de crud.py (AsyncSession, pilotes aiosqlite/asyncpg) : mêmes
+# fonctions et mêmes résultats, sans occuper un thread du threadpool par requête
+
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.scalar(select(UserModel).where(UserModel.id == user_id))
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
+    return (await db.scalars(select(UserModel).offset(skip).limit(limit))).all()
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    db_user = UserModel(name=user.name, email=user.email, password=user.password)
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+async def get_account(db: AsyncSession, account_id: str):
+    return await db.scalar(select(AccountModel).where(AccountModel.id == account_id))
+
+async def get_accounts(db: AsyncSession, skip: int = 0, limit: int = 100):
+    return (await db.scalars(select(AccountModel).offset(skip).limit(limit))).all()
+
+async def create_account(db: AsyncSession, account: AccountCreate, user_id: int):
+    db_account = AccountModel(id=account.id, balance=account.balance, owner_id=user_id)
+    db.add(db_account)
+    await db.commit()
+    await db.refresh(db_account)
+    return db_account
+
+async def get_transaction(db: AsyncSession, transaction_id: int):
+    return await db.scalar(select(TransactionModel).where(TransactionModel.id == transaction_id))
+
+async def get_transactions(db: AsyncSession, skip: int = 0, limit: int = 100):
+    return (await db.scalars(select(TransactionModel).offset(skip).limit(limit))).all()
+
+async def get_account_transactions(db: AsyncSession, account_id: str, before_time=None,
+                                   before_id=None, limit: int = 50):
+    """Transactions d'un compte, des plus récentes aux plus anciennes (voir crud)."""
+    query = select(TransactionModel).where(TransactionModel.account_id == account_id)
+    if before_time is not None:
+        if before_id is None:
+            query = query.where(TransactionModel.created_at < before_time)
+        else:
+            query = query.where(or_(
+                TransactionModel.created_at < before_time,
+                and_(TransactionModel.created_at == before_time, TransactionModel.id < before_id),
+            ))
+    order = (TransactionModel.created_at.desc(), TransactionModel.id.desc())
+    return (await db.scalars(query.order_by(*order).limit(limit))).all()
+
+async def create_transaction(db: AsyncSession, transaction: dict):
+    db_transaction = TransactionModel(
+        type=transaction.get("type"),
+        amount=transaction.get("amount"),
+        account_id=transaction.get("account_id")
+    )
+    db.add(db_transaction)
+    await db.commit()
+    await db.refresh(db_transaction)
+    return db_transaction
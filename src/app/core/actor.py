@@ -0,0 +1,175 @@
+# src/app/core/actor.py
+"""Écrivain unique du ledger sur la boucle asyncio.
+
+Les endpoints asynchrones déposent leurs opérations dans une file ; une tâche
+unique les applique dans l'ordre d'arrivée avec les mutations sans verrou de
+`core`. Aucun thread du threadpool n'est mobilisé par opération.
+"""
+import asyncio
+import logging
+
+from src.app.core import core
+from src.app.money import to_minor
+
+logger = logging.getLogger("fastapi-app")
+
+OP_DEPOSIT, OP_WITHDRAW, OP_TRANSFER = "deposit", "withdraw", "transfer"
+
+DEFAULT_MAX_PENDING = 10_000
+# Opérations appliquées par passage : borne le temps pendant lequel la boucle est occupée
+DEFAULT_MAX_BATCH = 256
+
+
+def _release_acquired(acquiring):
+    if not acquiring.cancelled() and acquiring.exception() is None:
+        core.unlock_exclusive()
+
+
+class LedgerActor:
+    """Tâche asyncio seule autorisée à muter le ledger en mode acteur.
+
+    Les opérations sont drainées par lots : un lot est appliqué sous
+    l'exclusion de `core.exclusive()` (une acquisition de tous les verrous par
+    lot, pour exclure les rares écrivains du threadpool comme /events ou
+    /reset), puis une seule attente de durabilité du journal couvre tout le
+    lot, sans retarder l'application du lot suivant. Si un tel écrivain tient
+    les verrous, l'acquisition est attendue dans un thread du pool : la boucle
+    continue de servir les autres requêtes.
+
+    `persist`, s'il est défini, reçoit les opérations acceptées d'un lot
+    (op, account_id, minor, dest_id, timestamp_ns) et retourne un Future de
+    leur commit SQL : le lot n'est appliqué qu'une fois ce commit réussi, et
+    un échec laisse le ledger intact.
+    """
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING, max_batch: int = DEFAULT_MAX_BATCH,
+                 persist=None):
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.persist = persist
+        self._queue = None
+        self._task = None
+        self._waiting = set()  # lots appliqués en attente de durabilité
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Démarre la tâche d'écriture sur la boucle courante."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(self.max_pending)
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="ledger-actor")
+
+    async def stop(self):
+        """Applique les opérations en file puis arrête la tâche."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    # ---------------- Soumission ----------------
+    async def submit(self, op: str, account_id: str, minor: int, dest_id: str = ""):
+        if not self.running:
+            raise RuntimeError("Acteur du ledger arrêté")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, account_id, minor, dest_id, future))
+        return await future
+
+    async def create_or_update_account(self, account_id: str, amount: float):
+        return await self.submit(OP_DEPOSIT, account_id, to_minor(amount))
+
+    async def withdraw_from_account(self, account_id: str, amount: float):
+        return await self.submit(OP_WITHDRAW, account_id, to_minor(amount))
+
+    async def transfer_between_accounts(self, origin_id: str, dest_id: str, amount: float):
+        return await self.submit(OP_TRANSFER, origin_id, to_minor(amount), dest_id)
+
+    # ---------------- Tâche d'écriture ----------------
+    async def _persist(self, ops):
+        # Appelé sous exclusive() : les acceptations prévues restent valables
+        accepted = [op for op, ok in zip(ops, core.plan_unlocked(ops)) if ok]
+        if accepted:
+            await asyncio.wrap_future(self.persist(accepted))
+
+    @staticmethod
+    async def _lock():
+        # Verrous libres (cas courant) : pris sans quitter la boucle. Sinon un
+        # écrivain du threadpool les tient (reset, sauvegarde, verify...) : on
+        # attend dans un thread du pool pour ne pas bloquer la boucle.
+        if core.lock_exclusive(blocking=False):
+            return
+        acquiring = asyncio.get_running_loop().run_in_executor(None, core.lock_exclusive)
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # Le thread finira par acquérir les verrous : les rendre aussitôt
+            acquiring.add_done_callback(_release_acquired)
+            raise
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            stopping = None in batch
+            if stopping:
+                batch = [item for item in batch if item is not None]
+
+            outcomes = []
+            last_seq = None
+            await self._lock()
+            try:
+                # Horodatages attribués avant le commit SQL, repris par les événements
+                ops = [(op, account_id, minor, dest_id, core.event_timestamp())
+                       for op, account_id, minor, dest_id, _ in batch]
+                if self.persist is not None:
+                    try:
+                        await self._persist(ops)
+                    except Exception as e:
+                        logger.error(f"Lot non persisté en SQL, ledger inchangé : {e}")
+                        self._resolve([(item[-1], None, e) for item in batch])
+                        continue
+                for op, (_, _, _, _, future) in zip(ops, batch):
+                    try:
+                        result, seq = core.apply_unlocked(*op)
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+                        continue
+                    if seq is not None:
+                        last_seq = seq
+                    outcomes.append((future, result, None))
+            finally:
+                core.unlock_exclusive()
+
+            if last_seq is None:
+                self._resolve(outcomes)
+            else:
+                # Le lot suivant s'applique pendant le fsync de celui-ci
+                task = asyncio.get_running_loop().create_task(self._resolve_durable(outcomes, last_seq))
+                self._waiting.add(task)
+                task.add_done_callback(self._waiting.discard)
+        if self._waiting:
+            await asyncio.gather(*self._waiting)
+
+    async def _resolve_durable(self, outcomes, seq):
+        try:
+            # Hors de la boucle : l'attente du fsync groupé peut durer des millisecondes
+            await asyncio.to_thread(core.wait_durable, seq)
+        except Exception as e:
+            logger.error(f"Durabilité du journal non atteinte : {e}")
+            outcomes = [(future, None, exc or e) for future, _, exc in outcomes]
+        self._resolve(outcomes)
+
+    @staticmethod
+    def _resolve(outcomes):
+        for future, result, exc in outcomes:
+            if future.done():  # requête annulée entre-temps
+                continue
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
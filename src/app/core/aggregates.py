@@ -0,0 +1,145 @@
+# src/app/core/aggregates.py
+import threading
+from array import array
+
+from src.app.core.events import LedgerListener, OP_DEPOSIT, OP_NAMES, OP_TRANSFER, OP_WITHDRAW
+from src.app.money import from_minor
+
+# Colonnes des agrégats par compte (array('q') de 9 entiers)
+OPENING = 0  # solde à l'amorçage (comptes antérieurs au processus)
+DEPOSIT_COUNT, DEPOSIT_SUM = 1, 2
+WITHDRAW_COUNT, WITHDRAW_SUM = 3, 4
+TRANSFER_IN_COUNT, TRANSFER_IN_SUM = 5, 6
+TRANSFER_OUT_COUNT, TRANSFER_OUT_SUM = 7, 8
+_WIDTH = 9
+# Nombre maximal de comptes divergents listés par verify
+_MAX_REPORTED = 20
+
+
+class LedgerAggregates(LedgerListener):
+    """Agrégats du ledger tenus à jour à chaque mutation, lisibles en O(1).
+
+    Globaux : nombre et somme par type d'opération, nombre de comptes, total
+    des soldes. Par compte : dépôts, retraits, transferts reçus et émis. Les
+    montants sont en unités mineures ; `verify` recalcule tout depuis le store.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.counts = {op: 0 for op in OP_NAMES}
+        self.sums = {op: 0 for op in OP_NAMES}
+        self.opening_total = 0
+        self.total_balance = 0
+        self._accounts = {}  # id -> array('q') des colonnes ci-dessus
+
+    def _row(self, account_id):
+        # Appelé sous le verrou
+        row = self._accounts.get(account_id)
+        if row is None:
+            row = self._accounts[account_id] = array("q", bytes(8 * _WIDTH))
+        return row
+
+    # ---------------- Abonné du ledger ----------------
+    def on_event(self, event):
+        amount = event.amount_minor
+        with self._lock:
+            self.counts[event.op] += 1
+            self.sums[event.op] += amount
+            row = self._row(event.account_id)
+            if event.op == OP_DEPOSIT:
+                row[DEPOSIT_COUNT] += 1
+                row[DEPOSIT_SUM] += amount
+                self.total_balance += amount
+            elif event.op == OP_WITHDRAW:
+                row[WITHDRAW_COUNT] += 1
+                row[WITHDRAW_SUM] += amount
+                self.total_balance -= amount
+            elif event.op == OP_TRANSFER:
+                row[TRANSFER_OUT_COUNT] += 1
+                row[TRANSFER_OUT_SUM] += amount
+                dest = self._row(event.dest_id)
+                dest[TRANSFER_IN_COUNT] += 1
+                dest[TRANSFER_IN_SUM] += amount
+
+    def on_reset(self):
+        with self._lock:
+            self._reset()
+
+    def on_restore(self, store):
+        self.seed(store)
+
+    def seed(self, store):
+        """Reprend les soldes existants comme soldes d'ouverture (après rejeu du journal)."""
+        with self._lock:
+            self._reset()
+            for row_index in range(len(store)):
+                balance = store.balances[row_index]
+                self._row(store.id_at(row_index))[OPENING] = balance
+                self.opening_total += balance
+            self.total_balance = self.opening_total
+
+    # ---------------- Lecture ----------------
+    def snapshot(self) -> dict:
+        """Agrégats globaux, en unités majeures."""
+        with self._lock:
+            return {
+                "accounts": len(self._accounts),
+                "total_balance": from_minor(self.total_balance),
+                "operations": {
+                    OP_NAMES[op]: {"count": self.counts[op], "total": from_minor(self.sums[op])}
+                    for op in OP_NAMES
+                },
+            }
+
+    def account(self, account_id: str):
+        """Agrégats d'un compte, en unités majeures, ou None s'il est inconnu."""
+        with self._lock:
+            row = self._accounts.get(account_id)
+            if row is None:
+                return None
+            row = array("q", row)
+        return {
+            "account_id": account_id,
+            "opening_balance": from_minor(row[OPENING]),
+            "deposits": {"count": row[DEPOSIT_COUNT], "total": from_minor(row[DEPOSIT_SUM])},
+            "withdrawals": {"count": row[WITHDRAW_COUNT], "total": from_minor(row[WITHDRAW_SUM])},
+            "transfers_in": {"count": row[TRANSFER_IN_COUNT], "total": from_minor(row[TRANSFER_IN_SUM])},
+            "transfers_out": {"count": row[TRANSFER_OUT_COUNT],
+                              "total": from_minor(row[TRANSFER_OUT_SUM])},
+        }
+
+    # ---------------- Vérification ----------------
+    def verify(self, store) -> dict:
+        """Recalcule les agrégats depuis le store et signale les écarts.
+
+        Pour chaque compte : ouverture + dépôts − retraits + reçus − émis doit
+        égaler le solde. À appeler sans mutation concurrente (core.exclusive()).
+        """
+        with self._lock:
+            drifted = []
+            actual_total = 0
+            for row_index in range(len(store)):
+                account_id = store.id_at(row_index)
+                balance = store.balances[row_index]
+                actual_total += balance
+                row = self._accounts.get(account_id)
+                expected = 0 if row is None else (
+                    row[OPENING] + row[DEPOSIT_SUM] - row[WITHDRAW_SUM]
+                    + row[TRANSFER_IN_SUM] - row[TRANSFER_OUT_SUM])
+                if expected != balance:
+                    drifted.append(account_id)
+            unknown = sum(1 for account_id in self._accounts if account_id not in store)
+            flows_total = (self.opening_total + self.sums[OP_DEPOSIT] - self.sums[OP_WITHDRAW])
+            ok = (not drifted and not unknown and actual_total == self.total_balance
+                  and flows_total == self.total_balance and len(store) == len(self._accounts))
+            return {
+                "ok": ok,
+                "accounts": {"tracked": len(self._accounts), "actual": len(store)},
+                "total_balance": {"tracked": from_minor(self.total_balance),
+                                  "actual": from_minor(actual_total)},
+                "drifted_accounts": drifted[:_MAX_REPORTED],
+                "drifted_count": len(drifted) + unknown,
+            }
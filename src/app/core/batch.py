@@ -0,0 +1,100 @@
+# src/app/core/batch.py
+import numpy as np
+
+from src.app.core.events import OP_DEPOSIT, OP_WITHDRAW, OP_TRANSFER
+
+# Résultat par opération d'un lot
+BATCH_APPLIED = 1
+BATCH_REJECTED = 0  # solde insuffisant
+BATCH_INVALID = -1  # index hors limites, signe incohérent ou type inconnu
+
+
+def apply_ops(balances, rows, amounts, ops, dests=None) -> np.ndarray:
+    """Applique un lot d'opérations colonnaires à un tableau de soldes int64.
+
+    `rows` : ligne du compte concerné ; `amounts` : variation signée de ce
+    compte en unités mineures (positive pour un dépôt, négative pour un
+    retrait ou l'émetteur d'un transfert) ; `ops` : code d'opération ;
+    `dests` : ligne du destinataire pour les transferts (crédité de
+    `-amounts`). `balances` est modifié en place.
+
+    Si aucune opération ne peut faire passer un solde sous zéro en supposant
+    que toutes réussissent, le lot entier est appliqué par scatter-add. Sinon
+    les comptes concernés (ou tout le lot s'il contient des transferts, qui
+    couplent les comptes) sont rejoués dans l'ordre, opération par opération.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.int64)
+    ops = np.asarray(ops, dtype=np.int8)
+    count = len(rows)
+    if len(amounts) != count or len(ops) != count:
+        raise ValueError("Les colonnes du lot doivent avoir la même longueur")
+    is_transfer = ops == OP_TRANSFER
+    if dests is None:
+        if is_transfer.any():
+            raise ValueError("Les transferts nécessitent une colonne de destinataires")
+        dests = np.full(count, -1, dtype=np.int64)
+    else:
+        dests = np.asarray(dests, dtype=np.int64)
+
+    size = len(balances)
+    valid = (rows >= 0) & (rows < size)
+    valid &= np.where(ops == OP_DEPOSIT, amounts > 0, amounts < 0)
+    valid &= (ops == OP_DEPOSIT) | (ops == OP_WITHDRAW) | is_transfer
+    valid &= ~is_transfer | ((dests >= 0) & (dests < size) & (dests != rows))
+
+    outcomes = np.where(valid, BATCH_APPLIED, BATCH_INVALID).astype(np.int8)
+    transfers = valid & is_transfer
+
+    # Écritures à plat : une par compte touché, dans l'ordre des opérations
+    positions = np.flatnonzero(valid)
+    credit_positions = np.flatnonzero(transfers)
+    entry_rows = np.concatenate([rows[positions], dests[credit_positions]])
+    entry_deltas = np.concatenate([amounts[positions], -amounts[credit_positions]])
+    entry_positions = np.concatenate([positions, credit_positions])
+
+    if not (entry_deltas < 0).any():
+        # Lot sans débit : aucun contrôle de solde, scatter-add direct
+        np.add.at(balances, entry_rows, entry_deltas)
+        return outcomes
+
+    # Solde courant après chaque écriture, en supposant que toutes réussissent
+    order = np.lexsort((entry_positions, entry_rows))
+    sorted_rows = entry_rows[order]
+    running = np.cumsum(entry_deltas[order])
+    group_start = np.ones(len(order), dtype=bool)
+    group_start[1:] = sorted_rows[1:] != sorted_rows[:-1]
+    starts = np.flatnonzero(group_start)
+    before_group = np.where(starts > 0, running[starts - 1], 0)
+    group_ids = np.cumsum(group_start) - 1
+    running = running - before_group[group_ids] + balances[sorted_rows]
+    overdrawn = running < 0
+
+    if not overdrawn.any():
+        np.add.at(balances, entry_rows, entry_deltas)
+        return outcomes
+
+    if transfers.any():
+        _apply_ordered(balances, np.flatnonzero(valid), rows, amounts, ops, dests, outcomes)
+        return outcomes
+
+    # Sans transfert, les comptes sont indépendants : seuls ceux qui passent
+    # sous zéro sont rejoués dans l'ordre, les autres restent vectorisés
+    bad_rows = np.unique(sorted_rows[overdrawn])
+    slow = np.isin(entry_rows, bad_rows)
+    np.add.at(balances, entry_rows[~slow], entry_deltas[~slow])
+    _apply_ordered(balances, entry_positions[slow], rows, amounts, ops, dests, outcomes)
+    return outcomes
+
+
+def _apply_ordered(balances, positions, rows, amounts, ops, dests, outcomes):
+    # Rejoue les opérations une à une ; `positions` est trié par ordre d'arrivée
+    for position, row, amount, op, dest in zip(
+            positions.tolist(), rows[positions].tolist(), amounts[positions].tolist(),
+            ops[positions].tolist(), dests[positions].tolist()):
+        if amount < 0 and balances[row] < -amount:
+            outcomes[position] = BATCH_REJECTED
+            continue
+        balances[row] += amount
+        if op == OP_TRANSFER:
+            balances[dest] -= amount
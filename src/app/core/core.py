@@ -1,21 +1,219 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
 from sqlalchemy import inspect, text
 from src.app.models.base import Base
 from src.app.models.database import engine
+from src.app.core.locking import LockStripes
+from src.app.core.store import AccountStore
+from src.app.money import to_minor
+from src.app.core.events import LedgerEvent, OP_DEPOSIT, OP_MARK, OP_WITHDRAW, OP_TRANSFER
+from src.app.core.journal import Journal, JournalReader
+from src.app.core.batch import apply_ops
+from src.app.core.snapshots import DatabaseSnapshots, SnapshotError, UnknownSnapshot, check_name
 
 # Création d'une classe simple pour les comptes en mémoire
+# (conservée comme format d'échange : le stockage réel est colonnaire)
 class MemoryAccount:
     def __init__(self, id: str, balance: float, owner_id: int = 1):
         self.id = id
         self.balance = balance
         self.owner_id = owner_id
 
-# Dictionnaire pour stocker les comptes en mémoire
-accounts = {}
+# Store colonnaire des comptes en mémoire (s'utilise comme un dictionnaire)
+accounts = AccountStore()
 
-def reset_state():
-    """Réinitialise complètement l'état mémoire et la base SQLite."""
+# Verrous par compte : /event et /balance tournent en parallèle dans le threadpool
+_locks = LockStripes()
+
+# Journal d'écriture anticipée (désactivé tant que open_journal n'est pas appelé)
+_journal = None
+# Attente de durabilité différée par thread (voir batch_durability)
+_deferred = threading.local()
+# Abonnés notifiés de chaque mutation (persistance différée, statistiques, ...)
+_listeners = []
+# Instantanés nommés : comptes en mémoire (nom -> StoreSnapshot) et base SQL
+_memory_snapshots = {}
+database_snapshots = DatabaseSnapshots(engine, os.getenv("SNAPSHOT_DIR"))
+# Dernier horodatage d'événement attribué, en microsecondes (voir event_timestamp)
+_clock = threading.Lock()
+_last_timestamp_us = 0
+
+def add_listener(listener):
+    """Abonne un LedgerListener aux mutations des comptes en mémoire."""
+    with _locks.hold_all():
+        _listeners.append(listener)
+
+def remove_listener(listener):
+    """Désabonne un LedgerListener."""
+    with _locks.hold_all():
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+def open_journal(path: str, replay_to=(), **options):
+    """Rejoue le journal dans les comptes en mémoire puis l'active.
+
+    Les abonnés de `replay_to` reçoivent aussi chaque événement rejoué (les
+    autres abonnés, comme la persistance SQL, l'ont déjà traité avant l'arrêt)
+    et les marqueurs de journal_mark (on_mark). Retourne le nombre
+    d'enregistrements rejoués.
+    """
+    global _journal
+    reader = JournalReader(path)
+    replayed = 0
+    with _locks.hold_all():
+        for record in reader:
+            if record.op != OP_MARK:
+                _replay(record)
+            if replay_to:
+                event = LedgerEvent(record.timestamp_ns, record.op, record.account_id,
+                                    record.dest_id, record.amount_minor)
+                for listener in replay_to:
+                    if record.op == OP_MARK:
+                        listener.on_mark(event)
+                    else:
+                        listener.on_event(event)
+            replayed += 1
+        _journal = Journal(path, reader=reader, **options)
+    return replayed
+
+def close_journal():
+    """Écrit les événements en attente et ferme le journal."""
+    global _journal
+    if _journal is not None:
+        _journal.close()
+        _journal = None
+
+def _replay(record):
+    # Les événements journalisés ont déjà été validés : on les applique sans contrôle
+    row = accounts.row_of(record.account_id)
+    if row is None:
+        row = accounts.add(record.account_id, 0, owner_id=1)
+    if record.op == OP_DEPOSIT:
+        accounts.balances[row] += record.amount_minor
+    else:
+        accounts.balances[row] -= record.amount_minor
+        if record.op == OP_TRANSFER:
+            accounts.balances[accounts.row_of(record.dest_id)] += record.amount_minor
+
+def event_timestamp() -> int:
+    """Horodatage (ns) d'un nouvel événement, strictement croissant à la microseconde.
+
+    La colonne created_at garde la microseconde : deux événements n'y ont
+    jamais le même horodatage, qui sert de clé de pagination commune à
+    l'historique en mémoire et aux lignes SQL.
+    """
+    global _last_timestamp_us
+    with _clock:
+        now = time.time_ns() // 1000
+        _last_timestamp_us = max(now, _last_timestamp_us + 1)
+        return _last_timestamp_us * 1000
+
+def _log(op: int, account_id: str, minor: int, dest_id: str = "", timestamp_ns: int = None):
+    # Appelé sous le verrou du compte : l'ordre du journal et des abonnés
+    # suit l'ordre d'application pour un même compte
+    if timestamp_ns is None:
+        timestamp_ns = event_timestamp()
+    if _listeners:
+        event = LedgerEvent(timestamp_ns, op, account_id, dest_id, minor)
+        for listener in _listeners:
+            listener.on_event(event)
+    if _journal is None:
+        return None
+    return _journal.append(op, account_id, minor, dest_id, timestamp_ns)
+
+def journal_mark(tag: str):
+    """Journalise un marqueur sans effet sur les soldes et attend sa durabilité.
+
+    Sert aux états qui doivent survivre à un redémarrage sans mouvement de
+    fonds (clôture d'un transfert entre partitions). Rejoué vers on_mark des
+    abonnés `replay_to` ; sans journal actif, ne fait rien.
+    """
+    if _journal is None:
+        return
+    seq = _journal.append(OP_MARK, "", 0, tag)
+    if _journal.wait_durable:
+        _journal.wait(seq)
+
+def _await_durable(seq):
+    # Appelé hors verrou : l'attente du fsync ne bloque pas les autres opérations
+    if seq is None or _journal is None or not _journal.wait_durable:
+        return
+    if getattr(_deferred, "seq", None) is not None:
+        _deferred.seq = max(_deferred.seq, seq)
+        return
+    _journal.wait(seq)
+
+@contextmanager
+def batch_durability():
+    """Regroupe l'attente de durabilité des opérations d'un lot en une seule.
+
+    À la sortie du bloc, attend que la dernière opération journalisée par ce
+    thread soit durable (et donc toutes les précédentes).
+    """
+    _deferred.seq = 0
+    try:
+        yield
+    finally:
+        seq = _deferred.seq
+        _deferred.seq = None
+        _await_durable(seq or None)
+
+@contextmanager
+def exclusive():
+    """Bloque toutes les mutations du ledger le temps du bloc (lectures cohérentes)."""
+    with _locks.hold_all():
+        yield
+
+def lock_exclusive(blocking: bool = True) -> bool:
+    """Prend l'exclusion de exclusive() hors d'un bloc `with`.
+
+    À libérer par unlock_exclusive, qui peut être appelé depuis un autre
+    thread (acquisition dans un thread du pool, mutations sur la boucle).
+    Sans blocage, retourne False si un verrou est déjà pris.
+    """
+    return _locks.acquire_all(blocking)
+
+def unlock_exclusive():
+    """Libère l'exclusion prise par lock_exclusive."""
+    _locks.release_all()
+
+@contextmanager
+def holding(*account_ids: str):
+    """Bloque les mutations des comptes `account_ids` le temps du bloc."""
+    with _locks.hold(*account_ids):
+        yield
+
+def _reset_memory():
+    # Appelé sous tous les verrous
     accounts.clear()
+    if _journal is not None:
+        _journal.truncate()
+    for listener in _listeners:
+        listener.on_reset()
+
+def reset_memory():
+    """Vide les comptes en mémoire et le journal, sans toucher à la base."""
+    with _locks.hold_all():
+        _reset_memory()
+
+def load_balances(balances: dict):
+    """Remplace les comptes en mémoire par des soldes reconstruits (unités mineures).
+
+    Non journalisé : les soldes viennent de la base. Les abonnés repartent de
+    ces soldes (on_restore).
+    """
+    with _locks.hold_all():
+        accounts.clear()
+        for account_id, minor in balances.items():
+            accounts.add(account_id, minor, owner_id=1)
+        for listener in _listeners:
+            listener.on_restore(accounts)
 
+def reset_database():
+    """Recrée les tables SQL vides."""
     # Supprime explicitement les tables pour éviter les conflits persistants
     with engine.begin() as conn:
         conn.execute(text("DROP TABLE IF EXISTS transactions"))
@@ -23,34 +221,187 @@ def reset_state():
         conn.execute(text("DROP TABLE IF EXISTS users"))
         Base.metadata.create_all(bind=conn)
 
-def create_or_update_account(account_id: str, amount: float):
-    """Crée ou met à jour un compte en mémoire avec un montant."""
-    if account_id in accounts:
-        accounts[account_id].balance += amount
+def reset_state():
+    """Réinitialise complètement l'état mémoire et la base SQLite."""
+    with _locks.hold_all():
+        _reset_memory()
+        # Sous les verrous : aucune mutation ne peut viser les anciennes tables
+        reset_database()
+
+# ---------------- Instantanés ----------------
+def save_memory_snapshot(name: str):
+    """Copie figée des comptes en mémoire, restaurable par restore_memory_snapshot."""
+    with _locks.hold_all():
+        _memory_snapshots[name] = accounts.snapshot()
+
+def restore_memory_snapshot(name: str):
+    """Remplace les comptes en mémoire par l'instantané `name` (copie mémoire des colonnes).
+
+    Les abonnés repartent des soldes restaurés (on_restore). Refusé avec un journal
+    actif : son contenu ne correspondrait plus aux comptes restaurés.
+    """
+    snapshot = _checked_snapshot(name)
+    with _locks.hold_all():
+        _restore_memory(snapshot)
+
+def _checked_snapshot(name):
+    snapshot = _memory_snapshots.get(name)
+    if snapshot is None:
+        raise UnknownSnapshot(name)
+    if _journal is not None:
+        raise SnapshotError("Restauration impossible avec un journal actif")
+    return snapshot
+
+def _restore_memory(snapshot):
+    # Appelé sous tous les verrous
+    accounts.restore(snapshot)
+    for listener in _listeners:
+        listener.on_restore(accounts)
+
+def delete_memory_snapshot(name: str):
+    _memory_snapshots.pop(name, None)
+
+def snapshot_names() -> list:
+    return sorted(_memory_snapshots)
+
+def save_snapshot(name: str):
+    """Instantané nommé des comptes en mémoire et de la base SQL."""
+    check_name(name)
+    with _locks.hold_all():
+        # Sous les verrous : mémoire et base décrivent le même instant
+        database_snapshots.save(name)
+        _memory_snapshots[name] = accounts.snapshot()
+
+def restore_snapshot(name: str):
+    """Restaure mémoire et base depuis l'instantané `name` (remplace reset_state)."""
+    snapshot = _checked_snapshot(name)
+    with _locks.hold_all():
+        _restore_memory(snapshot)
+        database_snapshots.restore(name)
+
+def delete_snapshot(name: str):
+    delete_memory_snapshot(name)
+    database_snapshots.delete(name)
+
+# ---------------- Mutations sans verrou ----------------
+# L'appelant garantit l'exclusion (verrous du compte, ou écrivain unique sous
+# exclusive()). Montants en unités mineures ; retournent (résultat, seq du
+# journal) sans attendre la durabilité. `tag` (dépôt, retrait) est journalisé
+# dans le champ destination, inutilisé pour ces opérations : il est rejoué
+# avec le mouvement lui-même (voir partition). `timestamp_ns` impose
+# l'horodatage de l'événement, déjà écrit en SQL (voir event_timestamp).
+
+def deposit_unlocked(account_id: str, minor: int, tag: str = "", timestamp_ns: int = None):
+    row = accounts.row_of(account_id)
+    if row is None:
+        row = accounts.add(account_id, minor, owner_id=1)
     else:
-        accounts[account_id] = MemoryAccount(id=account_id, balance=amount, owner_id=1)
-    return accounts[account_id]
+        accounts.balances[row] += minor
+    seq = _log(OP_DEPOSIT, account_id, minor, tag, timestamp_ns)
+    return accounts.view(row), seq
+
+def withdraw_unlocked(account_id: str, minor: int, tag: str = "", timestamp_ns: int = None):
+    row = accounts.row_of(account_id)
+    if row is None or accounts.balances[row] < minor:
+        return None, None
+    accounts.balances[row] -= minor
+    seq = _log(OP_WITHDRAW, account_id, minor, tag, timestamp_ns)
+    return accounts.view(row), seq
+
+def transfer_unlocked(origin_id: str, dest_id: str, minor: int, timestamp_ns: int = None):
+    origin_row = accounts.row_of(origin_id)
+    dest_row = accounts.row_of(dest_id)
+    if (origin_row is None or dest_row is None or
+        accounts.balances[origin_row] < minor):
+        return (None, None), None
+    accounts.balances[origin_row] -= minor
+    accounts.balances[dest_row] += minor
+    seq = _log(OP_TRANSFER, origin_id, minor, dest_id, timestamp_ns)
+    return (accounts.view(origin_row), accounts.view(dest_row)), seq
+
+_UNLOCKED_OPS = {
+    "deposit": lambda account_id, minor, dest_id, timestamp_ns:
+        deposit_unlocked(account_id, minor, timestamp_ns=timestamp_ns),
+    "withdraw": lambda account_id, minor, dest_id, timestamp_ns:
+        withdraw_unlocked(account_id, minor, timestamp_ns=timestamp_ns),
+    "transfer": lambda account_id, minor, dest_id, timestamp_ns:
+        transfer_unlocked(account_id, dest_id, minor, timestamp_ns),
+}
+
+def apply_unlocked(op: str, account_id: str, minor: int, dest_id: str = "",
+                   timestamp_ns: int = None):
+    """Applique l'opération `op` ("deposit", "withdraw" ou "transfer") sans verrou."""
+    return _UNLOCKED_OPS[op](account_id, minor, dest_id, timestamp_ns)
+
+def plan_unlocked(ops) -> list:
+    """Prévoit, sans rien muter, l'acceptation de chaque opération de `ops`.
+
+    `ops` : tuples (op, account_id, minor, dest_id[, timestamp_ns]) supposés appliqués dans
+    l'ordre. Retourne un booléen par opération, décidé comme le feraient les
+    mutations sans verrou : les appliquer ensuite, sous la même exclusion,
+    donne exactement ces acceptations.
+    """
+    pending = {}  # soldes prévus des comptes déjà touchés par `ops`
+
+    def balance(account_id):
+        if account_id in pending:
+            return pending[account_id]
+        row = accounts.row_of(account_id)
+        return None if row is None else int(accounts.balances[row])
+
+    accepted = []
+    for op, account_id, minor, dest_id, *_ in ops:
+        origin = balance(account_id)
+        if op == "deposit":
+            pending[account_id] = (origin or 0) + minor
+            accepted.append(True)
+            continue
+        dest = balance(dest_id) if op == "transfer" else 0
+        if origin is None or dest is None or origin < minor:
+            accepted.append(False)
+            continue
+        pending[account_id] = origin - minor
+        if op == "transfer":
+            pending[dest_id] = balance(dest_id) + minor
+        accepted.append(True)
+    return accepted
+
+def wait_durable(seq):
+    """Attend que l'événement `seq` du journal soit durable (si le journal l'exige)."""
+    _await_durable(seq)
+
+def create_or_update_account(account_id: str, amount: float, tag: str = ""):
+    """Crée ou met à jour un compte en mémoire avec un montant."""
+    minor = to_minor(amount)
+    with _locks.lock_for(account_id):
+        account, seq = deposit_unlocked(account_id, minor, tag)
+    _await_durable(seq)
+    return account
+
+def account_exists(account_id: str) -> bool:
+    """Indique si un compte existe en mémoire."""
+    return account_id in accounts
 
 def get_account_balance(account_id: str):
     """Récupère le solde d'un compte en mémoire."""
     account = accounts.get(account_id)
     return account.balance if account else None
 
-def withdraw_from_account(account_id: str, amount: float):
+def withdraw_from_account(account_id: str, amount: float, tag: str = ""):
     """Retire un montant d'un compte en mémoire si le solde est suffisant."""
-    if account_id in accounts and accounts[account_id].balance >= amount:
-        accounts[account_id].balance -= amount
-        return accounts[account_id]
-    return None
+    minor = to_minor(amount)
+    with _locks.lock_for(account_id):
+        account, seq = withdraw_unlocked(account_id, minor, tag)
+    _await_durable(seq)
+    return account
 
 def transfer_between_accounts(origin_id: str, dest_id: str, amount: float):
     """Transfère un montant entre deux comptes en mémoire si possible."""
-    if (origin_id in accounts and dest_id in accounts and 
-        accounts[origin_id].balance >= amount):
-        accounts[origin_id].balance -= amount
-        accounts[dest_id].balance += amount
-        return accounts[origin_id], accounts[dest_id]
-    return None, None
+    minor = to_minor(amount)
+    with _locks.hold(origin_id, dest_id):
+        (origin, dest), seq = transfer_unlocked(origin_id, dest_id, minor)
+    _await_durable(seq)
+    return origin, dest
 
 def process_transaction(data):
     """Traite une transaction (placeholder pour extension future)."""
@@ -68,20 +419,21 @@ class BankingCore:
     """Classe principale pour les opérations bancaires."""
     
     def __init__(self):
-        self.accounts = {}  # Nouveau dictionnaire par instance
+        self.accounts = AccountStore()  # Nouveau store par instance
+        self._locks = LockStripes()
     
     def create_account(self, account_id: str, initial_balance: float = 0.0):
         """Crée un nouveau compte bancaire."""
-        if account_id in self.accounts:
-            # Retourne le compte existant au lieu de lever une exception
-            return self.accounts[account_id]
-        
-        self.accounts[account_id] = MemoryAccount(
-            id=account_id, 
-            balance=initial_balance, 
-            owner_id=1
-        )
-        return self.accounts[account_id]
+        with self._locks.lock_for(account_id):
+            return self._create_account(account_id, initial_balance)
+    
+    def _create_account(self, account_id: str, initial_balance: float):
+        # Appelé avec le verrou du compte déjà acquis
+        row = self.accounts.row_of(account_id)
+        if row is None:
+            row = self.accounts.add(account_id, to_minor(initial_balance), owner_id=1)
+        # Retourne le compte existant au lieu de lever une exception
+        return self.accounts.view(row)
     
     def get_account(self, account_id: str):
         """Récupère un compte par son ID."""
@@ -96,39 +448,68 @@ class BankingCore:
     
     def deposit(self, account_id: str, amount: float):
         """Effectue un dépôt sur un compte."""
-        if account_id not in self.accounts:
-            # Crée le compte s'il n'existe pas
-            self.create_account(account_id, amount)
-        else:
-            self.accounts[account_id].balance += amount
-        return self.accounts[account_id]
+        with self._locks.lock_for(account_id):
+            row = self.accounts.row_of(account_id)
+            if row is None:
+                # Crée le compte s'il n'existe pas
+                return self._create_account(account_id, amount)
+            self.accounts.balances[row] += to_minor(amount)
+            return self.accounts.view(row)
     
     def withdraw(self, account_id: str, amount: float):
         """Effectue un retrait sur un compte."""
-        if account_id not in self.accounts:
-            return None
-        
-        account = self.accounts[account_id]
-        if account.balance < amount:
-            return None
-        
-        account.balance -= amount
-        return account
+        minor = to_minor(amount)
+        with self._locks.lock_for(account_id):
+            row = self.accounts.row_of(account_id)
+            if row is None:
+                return None
+            
+            if self.accounts.balances[row] < minor:
+                return None
+            
+            self.accounts.balances[row] -= minor
+            return self.accounts.view(row)
     
     def transfer(self, from_account: str, to_account: str, amount: float):
         """Effectue un transfert entre comptes."""
-        if (from_account not in self.accounts or 
-            to_account not in self.accounts or 
-            self.accounts[from_account].balance < amount):
-            return False
+        minor = to_minor(amount)
+        with self._locks.hold(from_account, to_account):
+            from_row = self.accounts.row_of(from_account)
+            to_row = self.accounts.row_of(to_account)
+            if (from_row is None or 
+                to_row is None or 
+                self.accounts.balances[from_row] < minor):
+                return False
+            
+            self.accounts.balances[from_row] -= minor
+            self.accounts.balances[to_row] += minor
+            return True
+    
+    def rows_for(self, account_ids):
+        """Retourne l'index (ligne) de chaque compte pour apply_batch ; -1 si absent."""
+        row_of = self.accounts.row_of
+        return np.fromiter(
+            (-1 if (row := row_of(account_id)) is None else row for account_id in account_ids),
+            dtype=np.int64, count=len(account_ids))
+    
+    def apply_batch(self, rows, amounts, ops, dests=None):
+        """Applique un lot colonnaire d'opérations (montants signés en unités mineures).
         
-        self.accounts[from_account].balance -= amount
-        self.accounts[to_account].balance += amount
-        return True
+        Voir batch.apply_ops pour le format des colonnes. Retourne un tableau
+        int8 de résultats : BATCH_APPLIED, BATCH_REJECTED ou BATCH_INVALID.
+        """
+        with self._locks.hold_all():
+            # Vue sans copie sur la colonne des soldes, libérée avant toute réallocation
+            balances = np.frombuffer(self.accounts.balances, dtype=np.int64)
+            try:
+                return apply_ops(balances, rows, amounts, ops, dests)
+            finally:
+                del balances
     
     def reset_state(self):
         """Réinitialise l'état pour les tests."""
-        self.accounts.clear()
+        with self._locks.hold_all():
+            self.accounts.clear()
 
 # Instance globale
 banking_core = BankingCore()
@@ -0,0 +1,53 @@
+# src/app/core/events.py
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+# Codes d'opération partagés par le journal et les abonnés du ledger
+OP_DEPOSIT = 1
+OP_WITHDRAW = 2
+OP_TRANSFER = 3
+# Marqueur journalisé sans effet sur les soldes (jamais notifié aux abonnés)
+OP_MARK = 4
+
+OP_NAMES = {OP_DEPOSIT: "deposit", OP_WITHDRAW: "withdraw", OP_TRANSFER: "transfer"}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def event_datetime(timestamp_ns: int) -> datetime:
+    """Horodatage d'un événement en datetime UTC (précision de la colonne created_at)."""
+    # Division entière : un flottant arrondirait parfois à la microseconde voisine
+    return _EPOCH + timedelta(microseconds=timestamp_ns // 1000)
+
+
+class LedgerEvent(NamedTuple):
+    """Mutation appliquée au ledger (montant en unités mineures)."""
+    timestamp_ns: int
+    op: int
+    account_id: str
+    dest_id: str
+    amount_minor: int
+
+
+class LedgerListener:
+    """Abonné aux mutations du ledger (voir core.add_listener).
+
+    `on_event` est appelé sous le verrou du ou des comptes concernés : il doit
+    être rapide et ne jamais bloquer. `on_reset` est appelé quand l'état est
+    réinitialisé, `on_restore` quand les comptes sont remplacés en bloc
+    (instantané, reconstruction), avec tous les verrous acquis.
+    """
+
+    def on_event(self, event: LedgerEvent):
+        pass
+
+    def on_reset(self):
+        pass
+
+    def on_restore(self, store):
+        """Les comptes viennent d'être remplacés par le contenu de `store`."""
+        self.on_reset()
+
+    def on_mark(self, event: LedgerEvent):
+        """Marqueur relu du journal (core.journal_mark), rejeu uniquement : `dest_id` porte son texte."""
+        pass
@@ -0,0 +1,182 @@
+# src/app/core/group_commit.py
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.app.metrics import get_or_create_metric
+from src.app.models.transaction import TransactionModel
+
+logger = logging.getLogger("fastapi-app")
+
+DEFAULT_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 256
+
+commit_counter = get_or_create_metric(
+    Counter, "group_commit_commits_total", "Commits SQL partagés par plusieurs requêtes")
+group_size = get_or_create_metric(
+    Histogram, "group_commit_group_size", "Requêtes couvertes par un même commit",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512))
+isolation_counter = get_or_create_metric(
+    Counter, "group_commit_isolated_total",
+    "Groupes rejoués requête par requête (savepoints) après une erreur")
+
+
+class CommitCoalescer:
+    """Regroupe les écritures de transactions concurrentes en un seul commit.
+
+    `submit` dépose les lignes d'une requête et retourne un Future. Un thread
+    dédié attend jusqu'à `window` secondes (ou `max_batch` requêtes) après la
+    première requête en attente, insère tout le groupe dans une seule
+    transaction SQL et commite une fois : un fsync et un aller-retour de commit
+    pour tout le groupe. Chaque Future reçoit ses propres lignes (avec id et
+    created_at) une fois le commit effectué.
+
+    Si l'insertion du groupe échoue, il est rejoué avec un savepoint par
+    requête : seules les requêtes fautives reçoivent l'erreur.
+    """
+
+    def __init__(self, session_factory, window: float = DEFAULT_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._io_lock = threading.Lock()
+        self._pending = []  # (lignes, Future)
+        self._stopping = False
+        self._thread = None
+
+    # ---------------- Soumission ----------------
+    def submit(self, transactions) -> Future:
+        """Dépose une liste de transactions (dicts type/amount/account_id) pour le prochain commit."""
+        future = Future()
+        with self._lock:
+            if self._stopping:
+                raise RuntimeError("Regroupement des commits arrêté")
+            self._pending.append((transactions, future))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._wake.notify()
+        return future
+
+    def create_transaction(self, transaction: dict) -> TransactionModel:
+        """Équivalent de crud.create_transaction, commit partagé avec les requêtes concurrentes."""
+        return self.submit([transaction]).result()[0]
+
+    def persist(self, transactions):
+        """Soumet puis attend le commit ; lève l'erreur si ces lignes n'ont pas été commitées."""
+        return self.submit(transactions).result()
+
+    # ---------------- Cycle de vie ----------------
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Commite les requêtes en attente puis arrête le thread."""
+        with self._lock:
+            self._stopping = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @contextmanager
+    def paused(self):
+        """Attend la fin du commit en cours puis n'en lance plus le temps du bloc.
+
+        Les requêtes soumises entre-temps attendent : elles sont commitées à la reprise.
+        """
+        with self._io_lock:
+            yield
+
+    # ---------------- Thread de commit ----------------
+    def _next_group(self):
+        with self._lock:
+            while not self._pending and not self._stopping:
+                self._wake.wait()
+            if not self._pending:
+                return None
+            # Fenêtre de regroupement ouverte par la première requête en attente
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_batch and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wake.wait(remaining)
+            group = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return group
+
+    def _run(self):
+        while True:
+            group = self._next_group()
+            if group is None:
+                return
+            try:
+                with self._io_lock:
+                    results = self._commit(group)
+            except Exception as e:
+                logger.error(f"Échec du commit groupé ({len(group)} requêtes) : {e}")
+                results = [e] * len(group)
+            commit_counter.inc()
+            group_size.observe(len(group))
+            for (_, future), result in zip(group, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _commit(self, group):
+        session = self.session_factory()
+        # Les lignes restent lisibles après le commit, sans relecture
+        session.expire_on_commit = False
+        try:
+            try:
+                results = [self._add(session, transactions) for transactions, _ in group]
+                session.flush()
+            except SQLAlchemyError:
+                session.rollback()
+                isolation_counter.inc()
+                results = self._add_isolated(session, group)
+            session.commit()
+            session.expunge_all()
+            return results
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def _add(session, transactions):
+        rows = []
+        for t in transactions:
+            row = TransactionModel(type=t.get("type"), amount=t.get("amount"),
+                                   account_id=t.get("account_id"))
+            # Sans created_at, la valeur par défaut de la colonne s'applique
+            if t.get("created_at") is not None:
+                row.created_at = t["created_at"]
+            rows.append(row)
+        session.add_all(rows)
+        return rows
+
+    def _add_isolated(self, session, group):
+        results = []
+        for transactions, _ in group:
+            try:
+                with session.begin_nested():
+                    rows = self._add(session, transactions)
+                    # Échec levé dans le bloc : le savepoint annulé retire ces lignes de la session
+                    session.flush()
+                results.append(rows)
+            except SQLAlchemyError as e:
+                results.append(e)
+        return results
+
@@ -0,0 +1,171 @@
+# src/app/core/history.py
+import itertools
+import threading
+from array import array
+from bisect import bisect_left
+
+from src.app.core.events import LedgerListener, OP_DEPOSIT, OP_NAMES, OP_TRANSFER
+from src.app.core.locking import LockStripes
+
+DEFAULT_CAPACITY = 100
+
+
+class _Ring:
+    """Historique borné d'un compte : colonnes `array` utilisées en tampon circulaire."""
+
+    __slots__ = ("seqs", "times", "amounts", "ops", "counterparties", "head", "evicted")
+
+    def __init__(self):
+        self.seqs = array("q")
+        self.times = array("q")  # horodatage en nanosecondes
+        self.amounts = array("q")  # variation signée du solde, unités mineures
+        self.ops = array("b")
+        self.counterparties = array("l")  # index dans la table des ids internés, -1 si aucun
+        self.head = 0  # prochaine case écrasée une fois le tampon plein
+        self.evicted = 0
+
+    def append(self, capacity, seq, timestamp_ns, amount, op, counterparty):
+        if capacity is None or len(self.seqs) < capacity:
+            self.seqs.append(seq)
+            self.times.append(timestamp_ns)
+            self.amounts.append(amount)
+            self.ops.append(op)
+            self.counterparties.append(counterparty)
+            return
+        i = self.head
+        self.seqs[i] = seq
+        self.times[i] = timestamp_ns
+        self.amounts[i] = amount
+        self.ops[i] = op
+        self.counterparties[i] = counterparty
+        self.head = (i + 1) % capacity
+        self.evicted += 1
+
+    def __len__(self):
+        return len(self.seqs)
+
+    def physical(self, logical: int) -> int:
+        # Ordre logique = chronologique ; la plus ancienne entrée est à `head` une fois plein
+        return (self.head + logical) % len(self.seqs)
+
+
+class _LogicalSeqs:
+    # Séquence ordonnée vue à travers le tampon circulaire, pour bisect
+    __slots__ = ("ring",)
+
+    def __init__(self, ring):
+        self.ring = ring
+
+    def __len__(self):
+        return len(self.ring)
+
+    def __getitem__(self, logical):
+        return self.ring.seqs[self.ring.physical(logical)]
+
+
+class AccountHistory(LedgerListener):
+    """Derniers mouvements de chaque compte, en mémoire et bornés par compte.
+
+    Chaque événement reçoit un numéro de séquence croissant qui sert de curseur :
+    `page` retourne les entrées antérieures à un curseur, de la plus récente à la
+    plus ancienne, par recherche dichotomique dans le tampon du compte. Au-delà
+    de `capacity` entrées, les plus anciennes sont écrasées ; la suite de
+    l'historique se lit alors en SQL (lignes écrites par la persistance différée
+    ou groupée). Sans persistance SQL, `evict` est faux : rien n'est écrasé et
+    l'historique croît avec le trafic plutôt que de perdre des mouvements.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, evict: bool = True):
+        self.capacity = capacity
+        self.evict = evict
+        self._rings = {}
+        self._locks = LockStripes()
+        self._seq = itertools.count(1)
+        # Ids de contreparties internés : une seule chaîne par compte
+        self._names = []
+        self._name_index = {}
+        self._intern_lock = threading.Lock()
+        # Comptes dont l'historique a commencé avant ce processus (rejeu du journal)
+        self._incomplete = set()
+
+    # ---------------- Abonné du ledger ----------------
+    def on_event(self, event):
+        seq = next(self._seq)
+        if event.op == OP_TRANSFER:
+            self._append(event.account_id, seq, event.timestamp_ns, -event.amount_minor,
+                         event.op, self._intern(event.dest_id))
+            self._append(event.dest_id, seq, event.timestamp_ns, event.amount_minor,
+                         event.op, self._intern(event.account_id))
+        else:
+            amount = event.amount_minor if event.op == OP_DEPOSIT else -event.amount_minor
+            self._append(event.account_id, seq, event.timestamp_ns, amount, event.op, -1)
+
+    def _append(self, account_id, seq, timestamp_ns, amount, op, counterparty):
+        with self._locks.lock_for(account_id):
+            ring = self._rings.get(account_id)
+            if ring is None:
+                ring = self._rings[account_id] = _Ring()
+            ring.append(self.capacity if self.evict else None, seq, timestamp_ns,
+                        amount, op, counterparty)
+
+    def _intern(self, account_id):
+        index = self._name_index.get(account_id)
+        if index is None:
+            with self._intern_lock:
+                index = self._name_index.get(account_id)
+                if index is None:
+                    index = len(self._names)
+                    self._names.append(account_id)
+                    self._name_index[account_id] = index
+        return index
+
+    def on_reset(self):
+        with self._locks.hold_all():
+            self._rings = {}
+            self._names = []
+            self._name_index = {}
+            self._incomplete = set()
+
+    def on_restore(self, store):
+        # Les mouvements antérieurs ne sont plus en mémoire (en SQL si persistés)
+        self.on_reset()
+        self.mark_incomplete(store)
+
+    def mark_incomplete(self, account_ids):
+        """Signale des comptes dont les mouvements antérieurs ne sont pas en mémoire."""
+        self._incomplete.update(account_ids)
+
+    # ---------------- Lecture ----------------
+    def page(self, account_id: str, before: int = None, limit: int = 50):
+        """Entrées de séquence < `before`, des plus récentes aux plus anciennes.
+
+        Retourne (entrées, complet) : `complet` est faux quand des entrées plus
+        anciennes que la dernière retournée peuvent exister hors mémoire.
+        """
+        with self._locks.lock_for(account_id):
+            ring = self._rings.get(account_id)
+            if ring is None:
+                return [], account_id not in self._incomplete
+            seqs = _LogicalSeqs(ring)
+            end = len(ring) if before is None else bisect_left(seqs, before)
+            entries = []
+            for logical in range(end - 1, max(end - limit, 0) - 1, -1):
+                i = ring.physical(logical)
+                counterparty = ring.counterparties[i]
+                entries.append({
+                    "seq": ring.seqs[i],
+                    "type": OP_NAMES[ring.ops[i]],
+                    "amount_minor": ring.amounts[i],
+                    "counterparty": self._names[counterparty] if counterparty >= 0 else None,
+                    "timestamp_ns": ring.times[i],
+                })
+            complete = ring.evicted == 0 and account_id not in self._incomplete
+            return entries, complete
+
+    def oldest_timestamp_ns(self, account_id: str):
+        """Horodatage de la plus ancienne entrée en mémoire pour ce compte, ou None."""
+        with self._locks.lock_for(account_id):
+            ring = self._rings.get(account_id)
+            if ring is None or not len(ring):
+                return None
+            return ring.times[ring.physical(0)]
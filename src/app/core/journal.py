@@ -0,0 +1,249 @@
+# src/app/core/journal.py
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import NamedTuple
+
+from src.app.core.events import OP_DEPOSIT, OP_WITHDRAW, OP_TRANSFER
+
+# En-tête d'enregistrement : longueur de la charge utile + CRC32
+_HEADER = struct.Struct("<II")
+# Charge utile fixe : seq, horodatage (ns), montant (unités mineures), op, tailles des ids
+_BODY = struct.Struct("<QqqBHH")
+
+DEFAULT_COMMIT_INTERVAL = 0.002
+DEFAULT_MAX_BATCH_BYTES = 1 << 20
+_READ_CHUNK = 1 << 20
+
+
+class JournalError(Exception):
+    """Erreur d'écriture du journal : l'événement n'est pas garanti durable."""
+
+
+class JournalRecord(NamedTuple):
+    seq: int
+    timestamp_ns: int
+    op: int
+    account_id: str
+    dest_id: str
+    amount_minor: int
+
+
+def encode_record(seq, timestamp_ns, op, account_id, dest_id, amount_minor) -> bytes:
+    """Sérialise un enregistrement (en-tête + charge utile)."""
+    account_bytes = account_id.encode()
+    dest_bytes = dest_id.encode()
+    payload = _BODY.pack(seq, timestamp_ns, amount_minor, op,
+                         len(account_bytes), len(dest_bytes)) + account_bytes + dest_bytes
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+class JournalReader:
+    """Itère sur les enregistrements valides d'un journal.
+
+    La lecture s'arrête au premier enregistrement tronqué ou corrompu : c'est
+    la queue d'une écriture interrompue par un arrêt brutal. Après itération,
+    `valid_end` contient l'offset de fin de la partie valide et `last_seq` le
+    dernier numéro de séquence lu.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.valid_end = 0
+        self.last_seq = 0
+
+    def __iter__(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            buffer = b""
+            base = 0  # offset dans le fichier du début de `buffer`
+            while True:
+                chunk = f.read(_READ_CHUNK)
+                if not chunk:
+                    return
+                buffer += chunk
+                pos = 0
+                while pos + _HEADER.size <= len(buffer):
+                    length, crc = _HEADER.unpack_from(buffer, pos)
+                    start = pos + _HEADER.size
+                    end = start + length
+                    if end > len(buffer):
+                        break
+                    if length < _BODY.size or zlib.crc32(buffer[start:end]) != crc:
+                        return
+                    seq, timestamp_ns, amount, op, account_len, dest_len = _BODY.unpack_from(buffer, start)
+                    ids_start = start + _BODY.size
+                    yield JournalRecord(
+                        seq, timestamp_ns, op,
+                        buffer[ids_start:ids_start + account_len].decode(),
+                        buffer[ids_start + account_len:end].decode(),
+                        amount,
+                    )
+                    pos = end
+                    self.valid_end = base + pos
+                    self.last_seq = seq
+                buffer = buffer[pos:]
+                base += pos
+
+
+class Journal:
+    """Journal binaire en ajout seul avec commit groupé.
+
+    `append` ne fait que copier l'enregistrement dans un tampon mémoire ; un
+    thread dédié écrit le tampon et appelle un seul fsync pour tous les
+    événements arrivés pendant la fenêtre `commit_interval` (ou dès que le
+    tampon dépasse `max_batch_bytes`). `wait` bloque jusqu'à ce qu'un
+    enregistrement donné soit durable.
+
+    Un échec d'écriture ou de fsync est définitif : le fichier est ramené à la
+    fin du dernier lot durable (pas d'enregistrement tronqué au rejeu), et
+    tout `append` ou `wait` ultérieur lève JournalError. Les séquences
+    perdues ne sont jamais déclarées durables par un lot suivant.
+    """
+
+    def __init__(self, path: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+                 max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES, wait_durable: bool = True,
+                 reader: JournalReader = None):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.max_batch_bytes = max_batch_bytes
+        self.wait_durable = wait_durable
+
+        if reader is None:
+            # Pas de relecture préalable : parcourt le journal pour trouver sa fin valide
+            reader = JournalReader(path)
+            for _ in reader:
+                pass
+        self.last_seq = reader.last_seq
+        # Sans tampon Python : un lot en échec ne peut pas être réécrit plus tard
+        self._file = open(path, "ab", buffering=0)
+        if self._file.tell() != reader.valid_end:
+            # Supprime une queue corrompue avant d'ajouter de nouveaux enregistrements
+            self._file.truncate(reader.valid_end)
+        self._valid_end = reader.valid_end  # fin du dernier lot durable
+
+        self._lock = threading.Lock()
+        self._pending = threading.Condition(self._lock)
+        self._durable = threading.Condition(self._lock)
+        self._io_lock = threading.Lock()
+        self._buffer = bytearray()
+        self._appended = self.last_seq
+        self._durable_seq = self.last_seq
+        self._error = None
+        self._closed = False
+        self._flush_requested = False
+        self.fsync_count = 0
+
+        self._thread = threading.Thread(target=self._run, name="ledger-journal", daemon=True)
+        self._thread.start()
+
+    # ---------------- Écriture ----------------
+    def append(self, op: int, account_id: str, amount_minor: int, dest_id: str = "",
+               timestamp_ns: int = None) -> int:
+        """Ajoute un enregistrement au tampon et retourne son numéro de séquence."""
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+        with self._lock:
+            if self._closed:
+                raise JournalError("Journal fermé")
+            if self._error is not None:
+                raise JournalError(f"Journal en échec : {self._error}")
+            self._appended += 1
+            seq = self._appended
+            was_empty = not self._buffer
+            self._buffer += encode_record(seq, timestamp_ns, op, account_id, dest_id, amount_minor)
+            if was_empty or len(self._buffer) >= self.max_batch_bytes:
+                self._pending.notify()
+            return seq
+
+    def wait(self, seq: int, timeout: float = None):
+        """Bloque jusqu'à ce que l'enregistrement `seq` soit sur disque."""
+        with self._lock:
+            if not self._durable.wait_for(
+                    lambda: self._durable_seq >= seq or self._error is not None, timeout):
+                raise JournalError(f"Délai dépassé en attendant la durabilité de {seq}")
+            if self._durable_seq < seq:
+                raise JournalError(f"Échec d'écriture du journal : {self._error}")
+
+    def flush(self):
+        """Force l'écriture immédiate de tout ce qui est en tampon."""
+        with self._lock:
+            target = self._appended
+            self._flush_requested = True
+            self._pending.notify()
+        self.wait(target)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._buffer and not self._closed:
+                    self._pending.wait()
+                if not self._buffer and self._closed:
+                    return
+                # Fenêtre de regroupement : laisse d'autres événements rejoindre ce commit
+                deadline = time.monotonic() + self.commit_interval
+                while (not self._closed and not self._flush_requested
+                       and len(self._buffer) < self.max_batch_bytes):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._pending.wait(remaining)
+                self._flush_requested = False
+                data = bytes(self._buffer)
+                self._buffer.clear()
+                upto = self._appended
+
+            try:
+                with self._io_lock:
+                    self._write(data)
+                    os.fsync(self._file.fileno())
+                    self._valid_end += len(data)
+                    self.fsync_count += 1
+            except OSError as e:
+                self._discard_torn_write()
+                with self._lock:
+                    self._error = e
+                    self._buffer.clear()
+                    self._durable.notify_all()
+                continue
+
+            with self._lock:
+                self._durable_seq = upto
+                self._durable.notify_all()
+
+    def _write(self, data: bytes):
+        # Écriture brute : un write peut être partiel
+        view = memoryview(data)
+        while view:
+            written = self._file.write(view)
+            view = view[written:]
+
+    def _discard_torn_write(self):
+        # Retire un lot partiellement écrit : le rejeu s'arrêterait sur lui
+        try:
+            with self._io_lock:
+                os.ftruncate(self._file.fileno(), self._valid_end)
+        except OSError:
+            pass  # la relecture ignorera de toute façon la queue invalide
+
+    # ---------------- Maintenance ----------------
+    def truncate(self):
+        """Vide le journal (utilisé par le reset de l'état)."""
+        self.flush()
+        with self._io_lock:
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self._valid_end = 0
+
+    def close(self):
+        """Écrit le tampon restant, arrête le thread et ferme le fichier."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._pending.notify()
+        self._thread.join()
+        self._file.close()
@@ -0,0 +1,82 @@
+# src/app/core/locking.py
+import threading
+from contextlib import contextmanager
+
+# Nombre de verrous par défaut : suffisant pour que deux comptes distincts
+# tombent rarement sur le même verrou, sans coûter un verrou par compte.
+DEFAULT_STRIPES = 64
+
+
+class LockStripes:
+    """Ensemble fixe de verrous répartis par hachage de l'identifiant de compte.
+
+    Deux opérations sur des comptes différents prennent (le plus souvent) des
+    verrous différents et avancent en parallèle ; deux opérations sur le même
+    compte se sérialisent. Les acquisitions multiples se font toujours dans
+    l'ordre croissant des indices, ce qui exclut tout interblocage.
+    """
+
+    def __init__(self, stripes: int = DEFAULT_STRIPES):
+        if stripes <= 0:
+            raise ValueError("Le nombre de verrous doit être positif")
+        self._locks = tuple(threading.Lock() for _ in range(stripes))
+
+    def __len__(self):
+        return len(self._locks)
+
+    def index_for(self, account_id: str) -> int:
+        """Retourne l'indice du verrou qui protège un compte."""
+        return hash(account_id) % len(self._locks)
+
+    def lock_for(self, account_id: str) -> threading.Lock:
+        """Retourne le verrou qui protège un compte (utilisable avec `with`)."""
+        return self._locks[self.index_for(account_id)]
+
+    @contextmanager
+    def hold(self, *account_ids: str):
+        """Acquiert, dans l'ordre canonique, les verrous de plusieurs comptes."""
+        indexes = sorted({self.index_for(account_id) for account_id in account_ids})
+        acquired = []
+        try:
+            for index in indexes:
+                self._locks[index].acquire()
+                acquired.append(self._locks[index])
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    @contextmanager
+    def hold_all(self):
+        """Acquiert tous les verrous (opérations globales comme le reset)."""
+        self.acquire_all()
+        try:
+            yield
+        finally:
+            self.release_all()
+
+    def acquire_all(self, blocking: bool = True) -> bool:
+        """Acquiert tous les verrous hors d'un bloc `with` (voir release_all).
+
+        Sans blocage, n'en garde aucun et retourne False si l'un est déjà pris.
+        """
+        acquired = []
+        try:
+            for lock in self._locks:
+                if not lock.acquire(blocking):
+                    break
+                acquired.append(lock)
+            else:
+                return True
+        except BaseException:
+            for lock in reversed(acquired):
+                lock.release()
+            raise
+        for lock in reversed(acquired):
+            lock.release()
+        return False
+
+    def release_all(self):
+        """Libère les verrous pris par acquire_all, éventuellement depuis un autre thread."""
+        for lock in reversed(self._locks):
+            lock.release()
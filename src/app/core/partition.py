@@ -0,0 +1,616 @@
+# src/app/core/partition.py
+"""Ledger partitionné par hachage de l'identifiant de compte.
+
+Chaque partition appartient à un processus propriétaire qui applique les
+opérations avec les fonctions de `core` (l'état en mémoire lui est propre).
+Les workers de requêtes s'adressent au propriétaire d'un compte par socket
+Unix (`multiprocessing.connection`) : plusieurs workers uvicorn partagent ainsi
+un état cohérent et le débit croît avec le nombre de partitions.
+
+Transfert entre deux partitions, coordonné par le client :
+1. `reserve` : l'origine débite le compte et garde le montant en séquestre ;
+2. `credit`  : la destination crédite, une seule fois par identifiant de transfert ;
+3. `commit`  : l'origine oublie le séquestre (`abort` : elle rembourse).
+Un séquestre resté sans suite (client interrompu entre deux étapes) est résolu
+par l'origine : elle clôt le transfert chez la destination, qui répond s'il a
+déjà été crédité (commit) ou refusera désormais tout crédit (remboursement).
+
+Avec un journal, chaque étape y est inscrite avec le mouvement qu'elle
+applique (réservation, crédit et remboursement marquent le retrait ou le dépôt
+correspondant ; clôture et commit sont des marqueurs) : après un redémarrage,
+le rejeu reconstruit séquestres, crédits et clôtures avec les soldes.
+
+Lancement : python -m src.app.core.partition serve --partitions 4 --socket-dir /run/ledger
+"""
+import argparse
+import logging
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import uuid
+import zlib
+from multiprocessing import AuthenticationError, get_context
+from multiprocessing.connection import Client, Listener
+from typing import NamedTuple
+
+from src.app.core import core
+from src.app.core.events import LedgerListener, OP_DEPOSIT, OP_WITHDRAW
+from src.app.core.snapshots import SnapshotError, UnknownSnapshot, check_name
+from src.app.core.shm import (
+    DEFAULT_CAPACITY, BalancePublisher, SharedBalanceReader, SharedBalanceTable,
+)
+from src.app.money import from_minor, to_minor
+
+logger = logging.getLogger("fastapi-app")
+
+DEFAULT_AUTHKEY = b"simple-banking-ledger"
+DEFAULT_ESCROW_TIMEOUT = 30.0
+# Un transfert crédité ou clos est mémorisé bien plus longtemps qu'un séquestre ne vit
+TXID_RETENTION_FACTOR = 20
+# Étapes d'un transfert entre partitions, inscrites au journal ("<étape> <txid> ...")
+_RESERVE, _CREDIT, _ABORT, _FENCE, _COMMIT = "reserve", "credit", "abort", "fence", "commit"
+
+
+def partition_for(account_id: str, partitions: int) -> int:
+    """Partition propriétaire d'un compte."""
+    # crc32 plutôt que hash() : identique dans tous les processus (PYTHONHASHSEED)
+    return zlib.crc32(account_id.encode()) % partitions
+
+
+def socket_path(socket_dir: str, index: int) -> str:
+    return os.path.join(socket_dir, f"ledger-{index}.sock")
+
+
+class PartitionError(Exception):
+    """Propriétaire de partition injoignable ou en erreur."""
+
+
+class AccountSnapshot(NamedTuple):
+    """Compte renvoyé par le client : identifiant et solde après l'opération."""
+    id: str
+    balance: float
+
+
+class LedgerClient:
+    """Client des propriétaires de partitions, avec l'interface des fonctions de `core`.
+
+    Utilisable depuis plusieurs threads : chaque appel emprunte une connexion
+    au pool de la partition visée (une connexion n'a qu'un appel en cours).
+    """
+
+    def __init__(self, socket_dir: str, partitions: int, authkey: bytes = DEFAULT_AUTHKEY):
+        self.socket_dir = socket_dir
+        self.partitions = partitions
+        self.authkey = authkey
+        self._pools = [queue.SimpleQueue() for _ in range(partitions)]
+
+    def partition_for(self, account_id: str) -> int:
+        return partition_for(account_id, self.partitions)
+
+    def call(self, index: int, *message):
+        """Envoie un message au propriétaire `index` et retourne sa réponse (statut, valeur)."""
+        pool = self._pools[index]
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            try:
+                conn = Client(socket_path(self.socket_dir, index), family="AF_UNIX",
+                              authkey=self.authkey)
+            except (OSError, AuthenticationError) as e:
+                raise PartitionError(f"Partition {index} injoignable : {e}") from e
+        try:
+            conn.send(message)
+            reply = conn.recv()
+        except (EOFError, OSError) as e:
+            conn.close()
+            raise PartitionError(f"Partition {index} injoignable : {e}") from e
+        pool.put(conn)
+        if reply[0] == "error":
+            raise PartitionError(f"Partition {index} : {reply[1]}")
+        return reply
+
+    def close(self):
+        for pool in self._pools:
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+
+    # ---------------- Interface de core ----------------
+    def create_or_update_account(self, account_id: str, amount: float):
+        _, balance = self.call(self.partition_for(account_id), "deposit", account_id, to_minor(amount))
+        return AccountSnapshot(account_id, from_minor(balance))
+
+    def withdraw_from_account(self, account_id: str, amount: float):
+        status, balance = self.call(self.partition_for(account_id), "withdraw", account_id,
+                                    to_minor(amount))
+        return AccountSnapshot(account_id, from_minor(balance)) if status == "ok" else None
+
+    def get_account_balance(self, account_id: str):
+        status, balance = self.call(self.partition_for(account_id), "balance", account_id)
+        return from_minor(balance) if status == "ok" else None
+
+    def account_exists(self, account_id: str) -> bool:
+        return self.get_account_balance(account_id) is not None
+
+    def transfer_between_accounts(self, origin_id: str, dest_id: str, amount: float):
+        minor = to_minor(amount)
+        origin_index, dest_index = self.partition_for(origin_id), self.partition_for(dest_id)
+        if origin_index == dest_index:
+            status, balances = self.call(origin_index, "transfer", origin_id, dest_id, minor)
+            if status != "ok":
+                return None, None
+            return (AccountSnapshot(origin_id, from_minor(balances[0])),
+                    AccountSnapshot(dest_id, from_minor(balances[1])))
+
+        txid = uuid.uuid4().hex
+        status, origin_balance = self.call(origin_index, "reserve", txid, origin_id, minor, dest_index)
+        if status != "ok":
+            return None, None
+        # Si la destination est injoignable, l'erreur remonte : l'origine résoudra le séquestre
+        status, dest_balance = self.call(dest_index, "credit", txid, dest_id, minor)
+        if status != "ok":
+            self.call(origin_index, "abort", txid)
+            return None, None
+        try:
+            self.call(origin_index, "commit", txid)
+        except PartitionError as e:
+            # Les fonds ont déjà changé de compte : le transfert a réussi. Le
+            # séquestre restant est clôturé puis commité par l'origine (fence)
+            logger.warning(f"Commit du transfert {txid} différé à la résolution du séquestre : {e}")
+        return (AccountSnapshot(origin_id, from_minor(origin_balance)),
+                AccountSnapshot(dest_id, from_minor(dest_balance)))
+
+    def reset_state(self):
+        """Vide toutes les partitions puis recrée les tables SQL."""
+        for index in range(self.partitions):
+            self.call(index, "reset")
+        core.reset_database()
+
+    def _snapshot_call(self, index: int, op: str, name: str):
+        # Refus d'un propriétaire : mêmes exceptions que les instantanés locaux (409, 404)
+        status, detail = self.call(index, op, name)
+        if status == "unknown":
+            raise UnknownSnapshot(name)
+        if status == "refused":
+            raise SnapshotError(f"Partition {index} : {detail}")
+
+    def save_snapshot(self, name: str):
+        """Instantané nommé de chaque partition et de la base SQL."""
+        check_name(name)
+        for index in range(self.partitions):
+            self._snapshot_call(index, "snapshot", name)
+        core.database_snapshots.save(name)
+
+    def restore_snapshot(self, name: str):
+        """Restaure chaque partition et la base SQL depuis l'instantané `name`."""
+        check_name(name)
+        for index in range(self.partitions):
+            self._snapshot_call(index, "restore", name)
+        core.database_snapshots.restore(name)
+
+    def delete_snapshot(self, name: str):
+        for index in range(self.partitions):
+            self._snapshot_call(index, "drop_snapshot", name)
+        core.database_snapshots.delete(name)
+
+    def snapshot_names(self) -> list:
+        # Chaque instantané complet inclut la base : elle fait foi pour la liste
+        return core.database_snapshots.names()
+
+
+class PartitionOwner(LedgerListener):
+    """Propriétaire d'une partition : sert les opérations sur ses comptes.
+
+    Chaque connexion cliente est servie par un thread ; les opérations passent
+    par les fonctions de `core`, qui verrouillent les comptes concernés.
+    Abonné du rejeu de son journal (open_journal) pour retrouver les
+    transferts entre partitions en cours.
+    """
+
+    def __init__(self, index: int, partitions: int, socket_dir: str,
+                 authkey: bytes = DEFAULT_AUTHKEY, escrow_timeout: float = DEFAULT_ESCROW_TIMEOUT):
+        self.index = index
+        self.partitions = partitions
+        self.address = socket_path(socket_dir, index)
+        self.authkey = authkey
+        self.escrow_timeout = escrow_timeout
+        self.retention = escrow_timeout * TXID_RETENTION_FACTOR
+
+        self._lock = threading.Lock()
+        self._escrow = {}  # txid -> (compte, montant, partition destination, instant)
+        self._credited = {}  # txid -> instant du crédit (None tant qu'il n'est pas durable)
+        self._fenced = {}  # txid -> instant de la clôture
+        self._peers = LedgerClient(socket_dir, partitions, authkey)
+        self._listener = None
+        self._closing = threading.Event()
+
+    # ---------------- Journal ----------------
+    def open_journal(self, path: str) -> int:
+        """Rejoue le journal de la partition (soldes et transferts en cours) puis l'active.
+
+        Les instants sont ceux du rejeu : un séquestre rejoué est résolu
+        `escrow_timeout` secondes après le redémarrage.
+        """
+        return core.open_journal(path, replay_to=[self])
+
+    def on_event(self, event):
+        # Rejeu : la réservation, le crédit et le remboursement sont portés par
+        # le retrait ou le dépôt qu'ils appliquent (champ destination)
+        if event.op not in (OP_DEPOSIT, OP_WITHDRAW) or not event.dest_id:
+            return
+        step, txid, *rest = event.dest_id.split(" ")
+        now = time.monotonic()
+        if step == _RESERVE:
+            self._escrow[txid] = (event.account_id, event.amount_minor, int(rest[0]), now)
+        elif step == _CREDIT:
+            self._credited[txid] = now
+        elif step == _ABORT:
+            self._escrow.pop(txid, None)
+
+    def on_mark(self, event):
+        step, txid = event.dest_id.split(" ")
+        if step == _FENCE:
+            self._fenced[txid] = time.monotonic()
+        elif step == _COMMIT:
+            self._escrow.pop(txid, None)
+
+    # ---------------- Service ----------------
+    def serve_forever(self):
+        if os.path.exists(self.address):
+            os.unlink(self.address)  # socket laissée par un propriétaire précédent
+        self._listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        threading.Thread(target=self._reap_loop, name=f"ledger-reaper-{self.index}",
+                         daemon=True).start()
+        logger.info(f"Partition {self.index}/{self.partitions} à l'écoute sur {self.address}")
+        while not self._closing.is_set():
+            try:
+                conn = self._listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def stop(self):
+        self._closing.set()
+        if self._listener is not None:
+            try:
+                # Réveille accept() pour que la boucle constate l'arrêt
+                Client(self.address, family="AF_UNIX", authkey=self.authkey).close()
+            except OSError:
+                pass
+            self._listener.close()
+        self._peers.close()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = self.handle(message)
+                except Exception as e:
+                    logger.error(f"Partition {self.index}: {message[0]} failed: {e}")
+                    reply = ("error", repr(e))
+                conn.send(reply)
+
+    def handle(self, message):
+        """Applique un message (opération, arguments...) et retourne (statut, valeur)."""
+        handler = getattr(self, f"_op_{message[0]}", None)
+        if handler is None:
+            return ("error", f"Opération inconnue : {message[0]}")
+        return handler(*message[1:])
+
+    # ---------------- Opérations simples ----------------
+    def _op_ping(self):
+        return ("ok", self.index)
+
+    def _op_deposit(self, account_id, minor):
+        account = core.create_or_update_account(account_id, from_minor(minor))
+        return ("ok", account.balance_minor)
+
+    def _op_withdraw(self, account_id, minor):
+        account = core.withdraw_from_account(account_id, from_minor(minor))
+        if account is None:
+            return ("failed", None)
+        return ("ok", account.balance_minor)
+
+    def _op_balance(self, account_id):
+        account = core.accounts.get(account_id)
+        if account is None:
+            return ("missing", None)
+        return ("ok", account.balance_minor)
+
+    def _op_transfer(self, origin_id, dest_id, minor):
+        origin, dest = core.transfer_between_accounts(origin_id, dest_id, from_minor(minor))
+        if origin is None:
+            return ("failed", None)
+        return ("ok", (origin.balance_minor, dest.balance_minor))
+
+    def _op_reset(self):
+        with self._lock:
+            self._escrow.clear()
+            self._credited.clear()
+            self._fenced.clear()
+        core.reset_memory()
+        return ("ok", None)
+
+    def _op_snapshot(self, name):
+        # Sous _lock, que _op_reserve tient du débit à l'inscription du séquestre
+        with self._lock:
+            # Un séquestre en cours : montant débité ici mais pas encore crédité ailleurs
+            if self._escrow:
+                return ("refused", "Transferts entre partitions en cours")
+            core.save_memory_snapshot(name)
+        return ("ok", None)
+
+    def _op_restore(self, name):
+        with self._lock:
+            try:
+                core.restore_memory_snapshot(name)
+            except UnknownSnapshot:
+                return ("unknown", name)
+            except SnapshotError as e:
+                return ("refused", str(e))  # journal actif
+            self._escrow.clear()
+            self._credited.clear()
+            self._fenced.clear()
+        return ("ok", None)
+
+    def _op_drop_snapshot(self, name):
+        core.delete_memory_snapshot(name)
+        return ("ok", None)
+
+    # ---------------- Transferts entre partitions ----------------
+    def _op_reserve(self, txid, account_id, minor, dest_index):
+        # Débit et séquestre sous le même verrou : un instantané ne voit jamais
+        # le débit sans le séquestre qui le justifie
+        with self._lock:
+            with core.holding(account_id):
+                account, seq = core.withdraw_unlocked(account_id, minor,
+                                                      tag=f"{_RESERVE} {txid} {dest_index}")
+            if account is None:
+                return ("failed", None)
+            self._escrow[txid] = (account_id, minor, dest_index, time.monotonic())
+        # Attente du fsync hors verrou
+        core.wait_durable(seq)
+        return ("ok", account.balance_minor)
+
+    def _op_credit(self, txid, account_id, minor):
+        with self._lock:
+            if txid in self._fenced:
+                return ("aborted", None)
+            if txid in self._credited:
+                # Nouvel essai d'un crédit déjà appliqué : idempotent
+                return ("ok", core.accounts[account_id].balance_minor)
+            if not core.account_exists(account_id):
+                return ("failed", None)
+            # Marqué avant d'appliquer : une clôture concurrente attend qu'il soit durable
+            self._credited[txid] = None
+        try:
+            account = core.create_or_update_account(account_id, from_minor(minor),
+                                                    tag=f"{_CREDIT} {txid}")
+        except Exception:
+            with self._lock:
+                self._credited.pop(txid, None)
+            raise
+        with self._lock:
+            self._credited[txid] = time.monotonic()
+        return ("ok", account.balance_minor)
+
+    def _op_commit(self, txid):
+        with self._lock:
+            entry = self._escrow.pop(txid, None)
+        if entry is not None:
+            core.journal_mark(f"{_COMMIT} {txid}")
+        return ("ok", None)
+
+    def _op_abort(self, txid):
+        with self._lock:
+            entry = self._escrow.pop(txid, None)
+        if entry is not None:
+            account_id, minor, _, _ = entry
+            core.create_or_update_account(account_id, from_minor(minor), tag=f"{_ABORT} {txid}")
+        return ("ok", None)
+
+    def _op_fence(self, txid):
+        with self._lock:
+            if txid in self._credited:
+                # Crédit en cours d'écriture : l'origine réessaiera
+                return ("pending" if self._credited[txid] is None else "credited", None)
+            self._fenced[txid] = time.monotonic()
+        # Durable avant de répondre : l'origine remboursera sur la foi de cette clôture
+        core.journal_mark(f"{_FENCE} {txid}")
+        return ("fenced", None)
+
+    # ---------------- Séquestres abandonnés ----------------
+    def _reap_loop(self):
+        while not self._closing.wait(self.escrow_timeout / 2):
+            try:
+                self.resolve_expired()
+            except Exception as e:
+                logger.error(f"Partition {self.index}: escrow resolution failed: {e}")
+
+    def resolve_expired(self, now: float = None) -> int:
+        """Résout les séquestres plus vieux que `escrow_timeout` ; retourne leur nombre."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [(txid, entry[2]) for txid, entry in self._escrow.items()
+                       if now - entry[3] >= self.escrow_timeout]
+            for table in (self._credited, self._fenced):
+                for txid in [txid for txid, since in table.items()
+                             if since is not None and now - since >= self.retention]:
+                    del table[txid]
+        resolved = 0
+        for txid, dest_index in expired:
+            try:
+                status, _ = self._peers.call(dest_index, "fence", txid)
+            except PartitionError:
+                continue  # destination injoignable : nouvel essai au prochain passage
+            if status == "pending":
+                continue
+            if status == "credited":
+                self._op_commit(txid)
+            else:
+                self._op_abort(txid)
+            resolved += 1
+        return resolved
+
+
+class PartitionedBalanceReader:
+    """Lit les soldes dans les tables partagées publiées par les propriétaires.
+
+    Le segment d'une partition est attaché à la première lecture : un
+    propriétaire démarré après le worker est pris en compte. Lève
+    TableUnavailable quand la table ne peut pas répondre.
+    """
+
+    def __init__(self, shm_name: str, partitions: int):
+        self.shm_name = shm_name
+        self.partitions = partitions
+        self._readers = [None] * partitions
+
+    def get_account_balance(self, account_id: str):
+        index = partition_for(account_id, self.partitions)
+        reader = self._readers[index]
+        if reader is None:
+            reader = self._readers[index] = SharedBalanceReader(f"{self.shm_name}-{index}")
+        return reader.get_account_balance(account_id)
+
+    def close(self):
+        for reader in self._readers:
+            if reader is not None:
+                reader.close()
+        self._readers = [None] * self.partitions
+
+
+# ---------------- Processus propriétaires ----------------
+def _run_owner(index, partitions, socket_dir, authkey, journal_dir, shm_name, shm_capacity,
+               escrow_timeout):
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    # terminate() envoie SIGTERM : sortie normale pour fermer journal et segment partagé
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    owner = PartitionOwner(index, partitions, socket_dir, authkey, escrow_timeout)
+    if journal_dir:
+        owner.open_journal(os.path.join(journal_dir, f"partition-{index}.wal"))
+    table = None
+    if shm_name:
+        table = SharedBalanceTable(f"{shm_name}-{index}", shm_capacity)
+        # Avant d'écouter : aucune mutation ne peut s'intercaler avant l'abonnement
+        table.publish_all(core.accounts)
+        core.add_listener(BalancePublisher(table, core.accounts))
+    try:
+        owner.serve_forever()
+    finally:
+        core.close_journal()
+        if table is not None:
+            table.close()
+
+
+def start_owners(partitions: int, socket_dir: str, authkey: bytes = DEFAULT_AUTHKEY,
+                 journal_dir: str = None, timeout: float = 30.0,
+                 shm_name: str = None, shm_capacity: int = DEFAULT_CAPACITY,
+                 escrow_timeout: float = DEFAULT_ESCROW_TIMEOUT):
+    """Démarre un processus par partition et attend qu'ils répondent tous.
+
+    Avec `shm_name`, chaque propriétaire publie ses soldes dans le segment
+    partagé `{shm_name}-{index}` (voir PartitionedBalanceReader). Avec
+    `journal_dir`, chaque propriétaire rejoue puis tient `partition-{index}.wal`.
+    """
+    os.makedirs(socket_dir, exist_ok=True)
+    if journal_dir:
+        os.makedirs(journal_dir, exist_ok=True)
+    # spawn : pas de fork d'un processus dont d'autres threads tiennent des verrous
+    context = get_context("spawn")
+    processes = [context.Process(target=_run_owner, name=f"ledger-partition-{index}",
+                                 args=(index, partitions, socket_dir, authkey, journal_dir,
+                                       shm_name, shm_capacity, escrow_timeout),
+                                 daemon=True)
+                 for index in range(partitions)]
+    for process in processes:
+        process.start()
+
+    client = LedgerClient(socket_dir, partitions, authkey)
+    deadline = time.monotonic() + timeout
+    try:
+        for index, process in enumerate(processes):
+            while True:
+                try:
+                    client.call(index, "ping")
+                    break
+                except PartitionError:
+                    if not process.is_alive() or time.monotonic() > deadline:
+                        stop_owners(processes)
+                        raise
+                    time.sleep(0.05)
+    finally:
+        client.close()
+    return processes
+
+
+def stop_owners(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+
+def client_from_env():
+    """LedgerClient configuré par LEDGER_SOCKET_DIR / LEDGER_PARTITIONS, ou None."""
+    socket_dir = os.getenv("LEDGER_SOCKET_DIR")
+    if not socket_dir:
+        return None
+    return LedgerClient(socket_dir, int(os.getenv("LEDGER_PARTITIONS", "1")), _authkey_from_env())
+
+
+def balance_reader_from_env():
+    """PartitionedBalanceReader configuré par LEDGER_SHM_NAME, ou None."""
+    shm_name = os.getenv("LEDGER_SHM_NAME")
+    if not shm_name or not os.getenv("LEDGER_SOCKET_DIR"):
+        return None
+    return PartitionedBalanceReader(shm_name, int(os.getenv("LEDGER_PARTITIONS", "1")))
+
+
+def _authkey_from_env() -> bytes:
+    value = os.getenv("LEDGER_AUTHKEY")
+    return value.encode() if value else DEFAULT_AUTHKEY
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Processus propriétaires du ledger partitionné")
+    parser.add_argument("command", choices=["serve"])
+    parser.add_argument("--partitions", type=int, default=int(os.getenv("LEDGER_PARTITIONS", "1")))
+    parser.add_argument("--socket-dir", default=os.getenv("LEDGER_SOCKET_DIR", "/tmp/ledger"))
+    parser.add_argument("--journal-dir", default=os.getenv("LEDGER_JOURNAL_DIR"))
+    parser.add_argument("--shm-name", default=os.getenv("LEDGER_SHM_NAME"),
+                        help="publie les soldes en mémoire partagée pour /balance")
+    parser.add_argument("--shm-capacity", type=int,
+                        default=int(os.getenv("LEDGER_SHM_CAPACITY", str(DEFAULT_CAPACITY))))
+    parser.add_argument("--escrow-timeout", type=float,
+                        default=float(os.getenv("LEDGER_ESCROW_TIMEOUT", str(DEFAULT_ESCROW_TIMEOUT))),
+                        help="secondes avant de résoudre un transfert entre partitions abandonné")
+    args = parser.parse_args()
+
+    processes = start_owners(args.partitions, args.socket_dir, _authkey_from_env(), args.journal_dir,
+                             shm_name=args.shm_name, shm_capacity=args.shm_capacity,
+                             escrow_timeout=args.escrow_timeout)
+    logger.info(f"{args.partitions} partitions prêtes dans {args.socket_dir}")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_owners(processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# src/app/core/rebuild.py
+"""Reconstruction des soldes en mémoire depuis la table `transactions`.
+
+Règle de repli par ligne : dépôt +montant, retrait −montant (stocké positif),
+transfert : montant déjà signé (une ligne par compte). Les lignes sont lues en
+flux (`yield_per`) et sommées par compte ; avec plusieurs workers, la table est
+découpée en plages de clé primaire traitées en parallèle par un pool de
+processus (chacun avec sa propre connexion), puis les sommes partielles sont
+fusionnées.
+
+Découpage par plages d'id plutôt que par hachage du compte (crc32(account_id)
+% n) : une plage est un parcours de la clé primaire, alors qu'un prédicat de
+hachage, non indexable, ferait lire toute la table à chaque worker (n
+parcours complets au lieu d'un seul). Le hachage n'est d'ailleurs pas portable
+entre SQLite et PostgreSQL. En contrepartie, un même compte apparaît dans
+plusieurs plages : les sommes partielles se chevauchent et la fusion les
+additionne, en O(comptes) par plage, négligeable devant la lecture des lignes.
+"""
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from prometheus_client import Gauge
+from sqlalchemy import BigInteger, create_engine, func, select, type_coerce
+
+from src.app.metrics import get_or_create_metric
+from src.app.models.transaction import TransactionModel
+
+logger = logging.getLogger("fastapi-app")
+
+DEFAULT_CHUNK_SIZE = 50_000
+# Plages par worker : des tâches plus petites équilibrent la charge et affinent la progression
+_TASKS_PER_WORKER = 4
+
+rows_gauge = get_or_create_metric(
+    Gauge, "ledger_rebuild_rows", "Lignes de transactions repliées par la reconstruction")
+progress_gauge = get_or_create_metric(
+    Gauge, "ledger_rebuild_progress_ratio", "Avancement de la reconstruction (0 à 1)")
+rate_gauge = get_or_create_metric(
+    Gauge, "ledger_rebuild_rows_per_second", "Débit de la reconstruction")
+
+
+def _statement(low=None, high=None):
+    # Montant brut en unités mineures : pas de conversion par MoneyColumn
+    amount = type_coerce(TransactionModel.amount, BigInteger)
+    statement = select(TransactionModel.account_id, TransactionModel.type, amount)
+    if low is not None:
+        statement = statement.where(TransactionModel.id >= low, TransactionModel.id < high)
+    return statement
+
+
+def fold_rows(rows, totals):
+    """Ajoute l'effet de chaque ligne (compte, type, montant) aux soldes de `totals`."""
+    for account_id, kind, amount in rows:
+        if kind == "withdraw":
+            totals[account_id] -= amount
+        else:
+            totals[account_id] += amount
+
+
+def fold_range(engine, low=None, high=None, chunk_size: int = DEFAULT_CHUNK_SIZE, on_chunk=None):
+    """Replie les transactions d'une plage d'id ; retourne (soldes, lignes lues).
+
+    `engine` est un Engine ou une URL (cas d'un worker du pool).
+    """
+    owned = isinstance(engine, str)
+    if owned:
+        engine = create_engine(engine)
+    totals = defaultdict(int)
+    rows = 0
+    try:
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+                _statement(low, high))
+            for chunk in result.partitions():
+                fold_rows(chunk, totals)
+                rows += len(chunk)
+                if on_chunk is not None:
+                    on_chunk(len(chunk))
+    finally:
+        if owned:
+            engine.dispose()
+    return dict(totals), rows
+
+
+class RebuildProgress:
+    """Avancement d'une reconstruction : lignes, débit et métriques Prometheus."""
+
+    def __init__(self, total_rows: int, log_every: float = 5.0):
+        self.total_rows = total_rows
+        self.rows = 0
+        self.started = time.perf_counter()
+        self.log_every = log_every
+        self._last_log = self.started
+
+    def advance(self, rows: int):
+        self.rows += rows
+        elapsed = time.perf_counter() - self.started
+        rows_gauge.set(self.rows)
+        progress_gauge.set(self.rows / self.total_rows if self.total_rows else 1.0)
+        rate_gauge.set(self.rate)
+        now = time.perf_counter()
+        if now - self._last_log >= self.log_every:
+            self._last_log = now
+            logger.info(f"Reconstruction : {self.rows:,}/{self.total_rows:,} lignes "
+                        f"({self.rate:,.0f}/s, {elapsed:.1f}s)")
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+def _id_ranges(low, high, parts):
+    step = max(1, -(-(high - low) // parts))
+    return [(start, min(start + step, high)) for start in range(low, high, step)]
+
+
+def rebuild_balances(engine, database_url: str = None, workers: int = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Recalcule le solde (unités mineures) de chaque compte depuis `transactions`.
+
+    Avec `workers` > 1 et une `database_url` accessible depuis d'autres
+    processus, les plages d'id sont repliées en parallèle ; sinon le flux est
+    replié dans le processus courant. Retourne (soldes, RebuildProgress).
+    """
+    workers = os.cpu_count() or 1 if workers is None else workers
+    with engine.connect() as conn:
+        low, high, total = conn.execute(select(
+            func.min(TransactionModel.id), func.max(TransactionModel.id), func.count())).one()
+    progress = RebuildProgress(total or 0)
+    if not total:
+        progress.advance(0)
+        return {}, progress
+
+    if workers <= 1 or database_url is None:
+        balances, _ = fold_range(engine, chunk_size=chunk_size, on_chunk=progress.advance)
+        return balances, progress
+
+    balances = defaultdict(int)
+    ranges = _id_ranges(low, high + 1, workers * _TASKS_PER_WORKER)
+    # spawn : les workers ne doivent pas hériter des threads (et verrous) du serveur
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = [pool.submit(fold_range, database_url, start, end, chunk_size)
+                   for start, end in ranges]
+        for future in as_completed(futures):
+            partial, rows = future.result()
+            for account_id, amount in partial.items():
+                balances[account_id] += amount
+            progress.advance(rows)
+    return dict(balances), progress
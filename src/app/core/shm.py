@@ -0,0 +1,256 @@
+# src/app/core/shm.py
+"""Table des soldes en mémoire partagée, pour des lectures sans verrou ni IPC.
+
+Le processus propriétaire (seul écrivain) publie chaque solde modifié dans un
+segment `multiprocessing.shared_memory` ; les workers lisent directement le
+segment. Disposition :
+
+- en-tête : magic, capacité, nombre de comptes, indicateur de débordement,
+  génération (impaire pendant une réinitialisation) ;
+- cases de 64 octets adressées par crc32(id) avec sondage linéaire :
+  séquence, hash, solde en unités mineures, longueur et octets de l'id.
+
+Chaque case est protégée par un seqlock : l'écrivain rend la séquence impaire,
+écrit, puis la rend paire ; un lecteur recommence si la séquence était impaire
+ou a changé pendant sa lecture. Les comptes ne sont jamais supprimés (sauf
+réinitialisation complète), le sondage s'arrête donc à la première case vide.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from multiprocessing.shared_memory import SharedMemory
+
+import _posixshmem
+
+from src.app.core.events import LedgerListener, OP_TRANSFER
+from src.app.money import from_minor
+
+MAGIC = b"LEDGSHM1"
+DEFAULT_CAPACITY = 1 << 18
+MAX_ID_BYTES = 39
+# Au-delà de ce remplissage, les nouveaux comptes ne sont plus publiés (sondages trop longs)
+MAX_LOAD = 0.75
+# Nombre d'essais d'un lecteur face à une écriture concurrente avant d'abandonner ;
+# après les premiers, le lecteur cède le processeur à l'écrivain interrompu
+_READ_RETRIES = 1000
+_SPINS = 8
+
+_HEADER = struct.Struct("<8sQQQQ")  # magic, capacité, comptes, débordement, génération
+_HEADER_SIZE = 64
+_COUNT_OFFSET = 16
+_OVERFLOW_OFFSET = 24
+_GENERATION_OFFSET = 32
+_SEQ = struct.Struct("<Q")
+_SLOT = struct.Struct(f"<QIqB{MAX_ID_BYTES}s4x")  # séquence, hash, solde, longueur, id
+_PAYLOAD = struct.Struct(f"<IqB{MAX_ID_BYTES}s")
+_BALANCE = struct.Struct("<q")
+_BALANCE_OFFSET = 12
+SLOT_SIZE = _SLOT.size
+# Marqueur interne : case lue pendant une écriture, la recherche doit recommencer
+_RETRY = object()
+
+
+class TableUnavailable(Exception):
+    """La table ne peut pas répondre (absente, débordée ou en cours d'écriture)."""
+
+
+def _key_hash(id_bytes: bytes) -> int:
+    return zlib.crc32(id_bytes)
+
+
+def _map_readonly(name: str) -> mmap.mmap:
+    """Projette un segment existant en lecture seule, sans passer par SharedMemory.
+
+    Avant Python 3.13, SharedMemory inscrit aussi auprès du resource tracker
+    les segments qu'il ne fait qu'ouvrir. Ce tracker est partagé avec les
+    propriétaires démarrés depuis ce processus : désinscrire le segment côté
+    lecteur retirait l'inscription de l'écrivain, et son unlink échouait
+    (KeyError). Seul l'écrivain qui a créé le segment le détruit.
+    """
+    fd = _posixshmem.shm_open("/" + name, os.O_RDONLY, 0)
+    try:
+        return mmap.mmap(fd, os.fstat(fd).st_size, prot=mmap.PROT_READ)
+    finally:
+        os.close(fd)
+
+
+class SharedBalanceTable:
+    """Côté écrivain : crée le segment et y publie les soldes.
+
+    Un seul processus écrit ; dans ce processus les publications sont
+    sérialisées par un verrou (les abonnés du ledger sont appelés depuis
+    plusieurs threads).
+    """
+
+    def __init__(self, name: str, capacity: int = DEFAULT_CAPACITY):
+        self.name = name
+        self.capacity = capacity
+        size = _HEADER_SIZE + capacity * SLOT_SIZE
+        try:
+            self._shm = SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Segment laissé par un écrivain précédent interrompu
+            stale = SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self._shm = SharedMemory(name=name, create=True, size=size)
+        self._buf = self._shm.buf
+        self._lock = threading.Lock()
+        self._slots = {}  # id -> case
+        self._used = set()  # cases occupées
+        self._overflow = False
+        _HEADER.pack_into(self._buf, 0, MAGIC, capacity, 0, 0, 0)
+
+    def publish(self, account_id: str, balance_minor: int):
+        """Publie le solde d'un compte (le crée dans la table au besoin)."""
+        with self._lock:
+            slot = self._slots.get(account_id)
+            if slot is not None:
+                offset = _HEADER_SIZE + slot * SLOT_SIZE
+                seq = _SEQ.unpack_from(self._buf, offset)[0]
+                _SEQ.pack_into(self._buf, offset, seq + 1)
+                _BALANCE.pack_into(self._buf, offset + _BALANCE_OFFSET, balance_minor)
+                _SEQ.pack_into(self._buf, offset, seq + 2)
+                return
+            id_bytes = account_id.encode()
+            if (not id_bytes or len(id_bytes) > MAX_ID_BYTES
+                    or len(self._slots) >= self.capacity * MAX_LOAD):
+                self._set_overflow()
+                return
+            key_hash = _key_hash(id_bytes)
+            slot = key_hash % self.capacity
+            while slot in self._used:
+                slot = (slot + 1) % self.capacity
+            offset = _HEADER_SIZE + slot * SLOT_SIZE
+            seq = _SEQ.unpack_from(self._buf, offset)[0]
+            _SEQ.pack_into(self._buf, offset, seq + 1)
+            _PAYLOAD.pack_into(self._buf, offset + 8, key_hash, balance_minor, len(id_bytes), id_bytes)
+            _SEQ.pack_into(self._buf, offset, seq + 2)
+            self._slots[account_id] = slot
+            self._used.add(slot)
+            _SEQ.pack_into(self._buf, _COUNT_OFFSET, len(self._slots))
+
+    def _set_overflow(self):
+        if not self._overflow:
+            self._overflow = True
+            _SEQ.pack_into(self._buf, _OVERFLOW_OFFSET, 1)
+
+    def publish_all(self, store):
+        """Publie tous les comptes d'un AccountStore (après rejeu du journal)."""
+        for row in range(len(store)):
+            self.publish(store.id_at(row), store.balances[row])
+
+    def clear(self):
+        """Vide la table ; les lecteurs concurrents recommencent ou se replient."""
+        with self._lock:
+            generation = _SEQ.unpack_from(self._buf, _GENERATION_OFFSET)[0]
+            _SEQ.pack_into(self._buf, _GENERATION_OFFSET, generation + 1)
+            self._buf[_HEADER_SIZE:] = bytes(len(self._buf) - _HEADER_SIZE)
+            self._slots = {}
+            self._used = set()
+            self._overflow = False
+            _SEQ.pack_into(self._buf, _COUNT_OFFSET, 0)
+            _SEQ.pack_into(self._buf, _OVERFLOW_OFFSET, 0)
+            _SEQ.pack_into(self._buf, _GENERATION_OFFSET, generation + 2)
+
+    def close(self, unlink: bool = True):
+        """Détache le segment ; `unlink` le détruit (l'écrivain qui l'a créé)."""
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+class SharedBalanceReader:
+    """Côté lecteur : projette le segment en lecture seule et lit les soldes sans verrou.
+
+    `close` détache seulement le segment, qui reste à l'écrivain.
+    """
+
+    def __init__(self, name: str):
+        try:
+            self._mapping = _map_readonly(name)
+        except FileNotFoundError as e:
+            raise TableUnavailable(f"Segment {name} absent") from e
+        except ValueError as e:  # segment vide : écrivain en cours de création
+            raise TableUnavailable(f"Segment {name} invalide") from e
+        self._buf = memoryview(self._mapping)
+        magic, self.capacity, _, _, _ = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            self.close()
+            raise TableUnavailable(f"Segment {name} invalide")
+
+    def read_minor(self, account_id: str):
+        """Solde en unités mineures, ou None si le compte n'existe pas.
+
+        Lève TableUnavailable si la table ne peut pas trancher.
+        """
+        buf = self._buf
+        id_bytes = account_id.encode()
+        key_hash = _key_hash(id_bytes)
+        for attempt in range(_READ_RETRIES):
+            if attempt >= _SPINS:
+                time.sleep(0)
+            generation = _SEQ.unpack_from(buf, _GENERATION_OFFSET)[0]
+            if generation & 1:
+                continue
+            result = self._probe(buf, id_bytes, key_hash)
+            if result is not _RETRY and _SEQ.unpack_from(buf, _GENERATION_OFFSET)[0] == generation:
+                if result is None and _SEQ.unpack_from(buf, _OVERFLOW_OFFSET)[0]:
+                    raise TableUnavailable(f"Compte {account_id} peut-être non publié")
+                return result
+        raise TableUnavailable("Écriture concurrente persistante")
+
+    def _probe(self, buf, id_bytes, key_hash):
+        slot = key_hash % self.capacity
+        for _ in range(self.capacity):
+            offset = _HEADER_SIZE + slot * SLOT_SIZE
+            seq, slot_hash, balance, length, raw = _SLOT.unpack_from(buf, offset)
+            if seq & 1 or _SEQ.unpack_from(buf, offset)[0] != seq:
+                return _RETRY
+            if length == 0:
+                return None
+            if slot_hash == key_hash and raw[:length] == id_bytes:
+                return balance
+            slot = (slot + 1) % self.capacity
+        return None
+
+    def get_account_balance(self, account_id: str):
+        minor = self.read_minor(account_id)
+        return None if minor is None else from_minor(minor)
+
+    def close(self):
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+        self._mapping.close()
+
+
+class BalancePublisher(LedgerListener):
+    """Abonné du ledger qui recopie les soldes modifiés dans une SharedBalanceTable."""
+
+    def __init__(self, table: SharedBalanceTable, store):
+        self.table = table
+        self.store = store
+
+    def on_event(self, event):
+        # Appelé sous le verrou du compte : le solde lu est celui de cette mutation
+        self._publish(event.account_id)
+        if event.op == OP_TRANSFER:
+            self._publish(event.dest_id)
+
+    def _publish(self, account_id):
+        row = self.store.row_of(account_id)
+        if row is not None:
+            self.table.publish(account_id, self.store.balances[row])
+
+    def on_reset(self):
+        self.table.clear()
+
+    def on_restore(self, store):
+        self.table.clear()
+        self.table.publish_all(store)
+
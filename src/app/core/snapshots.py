@@ -0,0 +1,214 @@
+# src/app/core/snapshots.py
+"""Instantanés nommés de la base SQL, pour restaurer un jeu de données sans le recharger.
+
+SQLite : l'API de sauvegarde en ligne copie les pages de la base vers une base
+SQLite privée (en mémoire, ou un fichier de `directory`), puis dans l'autre
+sens à la restauration : pas de DROP/CREATE ni de réinsertion, le coût est
+celui d'une copie de pages. PostgreSQL : chaque instantané est une base créée
+avec `CREATE DATABASE ... TEMPLATE`, et la restauration recrée la base depuis
+ce modèle (copie de fichiers côté serveur) ; les instantanés sont les bases
+préfixées `<base>__snapshot_`, visibles de tous les processus.
+
+Les écrivains SQL en arrière-plan (add_writer) sont suspendus le temps de la
+copie. Sous PostgreSQL, aucune autre connexion ne doit être ouverte sur la
+base : elle n'est pas coupée, l'instantané est refusé (SnapshotError).
+"""
+import os
+import re
+import sqlite3
+import threading
+from contextlib import ExitStack, contextmanager
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+
+# Noms utilisables tels quels dans un nom de fichier ou de base
+_NAME = re.compile(r"^[A-Za-z0-9_-]{1,40}$")
+
+
+class SnapshotError(Exception):
+    """Instantané impossible à prendre ou restaurer dans l'état actuel."""
+
+
+class UnknownSnapshot(SnapshotError):
+    """Aucun instantané de ce nom."""
+
+
+class InvalidSnapshotName(SnapshotError, ValueError):
+    """Nom hors de [A-Za-z0-9_-]{1,40}."""
+
+
+def check_name(name: str):
+    if not _NAME.match(name or ""):
+        raise InvalidSnapshotName(f"Nom d'instantané invalide : {name!r}")
+
+
+class DatabaseSnapshots:
+    """Instantanés nommés de la base d'un engine SQLAlchemy (SQLite ou PostgreSQL)."""
+
+    def __init__(self, engine, directory: str = None):
+        self.engine = engine
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._sqlite = {}  # nom -> connexion sqlite3 privée (instantanés en mémoire)
+        self._writers = []
+
+    @property
+    def dialect(self) -> str:
+        return self.engine.dialect.name
+
+    def add_writer(self, writer):
+        """Écrivain en arrière-plan (méthode `paused()`, gestionnaire de contexte)
+        suspendu pendant save et restore."""
+        self._writers.append(writer)
+
+    def remove_writer(self, writer):
+        if writer in self._writers:
+            self._writers.remove(writer)
+
+    @contextmanager
+    def _paused_writers(self):
+        with ExitStack() as stack:
+            for writer in list(self._writers):
+                stack.enter_context(writer.paused())
+            yield
+
+    def names(self) -> list:
+        with self._lock:
+            if self.dialect == "postgresql":
+                return self._postgres_names()
+            names = set(self._sqlite)
+            if self.directory and os.path.isdir(self.directory):
+                names.update(f[:-len(".sqlite")] for f in os.listdir(self.directory)
+                             if f.endswith(".sqlite"))
+            return sorted(names)
+
+    def save(self, name: str):
+        """Enregistre (ou remplace) l'instantané `name` de la base courante."""
+        check_name(name)
+        with self._lock, self._paused_writers():
+            if self.dialect == "sqlite":
+                self._save_sqlite(name)
+            elif self.dialect == "postgresql":
+                self._save_postgres(name)
+            else:
+                raise SnapshotError(f"Instantanés non pris en charge pour {self.dialect}")
+
+    def restore(self, name: str):
+        """Remplace le contenu de la base par l'instantané `name`."""
+        check_name(name)
+        with self._lock, self._paused_writers():
+            if self.dialect == "sqlite":
+                self._restore_sqlite(name)
+            elif self.dialect == "postgresql":
+                self._restore_postgres(name)
+            else:
+                raise SnapshotError(f"Instantanés non pris en charge pour {self.dialect}")
+
+    def delete(self, name: str):
+        check_name(name)
+        with self._lock:
+            if self.dialect == "postgresql":
+                with self._maintenance() as conn:
+                    conn.execute(text(f'DROP DATABASE IF EXISTS "{self._pg_name(name)}"'))
+                return
+            target = self._sqlite.pop(name, None)
+            if target is not None:
+                target.close()
+            path = self._path(name)
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    # ---------------- SQLite ----------------
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.sqlite") if self.directory else None
+
+    def _save_sqlite(self, name):
+        path = self._path(name)
+        if path:
+            os.makedirs(self.directory, exist_ok=True)
+            target = sqlite3.connect(path)
+        else:
+            target = self._sqlite.get(name) or sqlite3.connect(":memory:", check_same_thread=False)
+        raw = self.engine.raw_connection()
+        try:
+            # Lecture cohérente : la copie tient un verrou de lecture sur la source
+            raw.driver_connection.backup(target)
+        finally:
+            raw.close()
+        if path:
+            target.close()
+        else:
+            self._sqlite[name] = target
+
+    def _restore_sqlite(self, name):
+        path = self._path(name)
+        if name in self._sqlite:
+            source, owned = self._sqlite[name], False
+        elif path and os.path.exists(path):
+            source, owned = sqlite3.connect(path), True
+        else:
+            raise UnknownSnapshot(name)
+        raw = self.engine.raw_connection()
+        try:
+            raw.driver_connection.commit()  # aucune transaction ouverte pendant la copie
+            source.backup(raw.driver_connection)
+        finally:
+            raw.close()
+            if owned:
+                source.close()
+
+    # ---------------- PostgreSQL ----------------
+    def _pg_prefix(self):
+        return f"{self.engine.url.database}__snapshot_"
+
+    def _pg_name(self, name):
+        return f"{self._pg_prefix()}{name}"
+
+    def _postgres_names(self):
+        prefix = self._pg_prefix()
+        with self._maintenance() as conn:
+            # left() plutôt que LIKE : `_` y serait un joker
+            rows = conn.execute(text("SELECT datname FROM pg_database "
+                                     "WHERE left(datname, length(:prefix)) = :prefix"),
+                                {"prefix": prefix}).scalars()
+            return sorted(datname[len(prefix):] for datname in rows)
+
+    @contextmanager
+    def _maintenance(self):
+        # CREATE/DROP DATABASE : hors transaction, depuis la base d'administration
+        admin = create_engine(self.engine.url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+        try:
+            with admin.connect() as conn:
+                yield conn
+        finally:
+            admin.dispose()
+
+    def _save_postgres(self, name):
+        database = self.engine.url.database
+        # Une base modèle ne doit avoir aucune connexion ouverte : on rend les
+        # nôtres (écrivains suspendus), celles des autres processus font refuser
+        self.engine.dispose()
+        with self._maintenance() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{self._pg_name(name)}"'))
+            self._busy_guard(conn, f'CREATE DATABASE "{self._pg_name(name)}" TEMPLATE "{database}"')
+
+    def _restore_postgres(self, name):
+        if name not in self._postgres_names():
+            raise UnknownSnapshot(name)
+        database = self.engine.url.database
+        self.engine.dispose()
+        with self._maintenance() as conn:
+            # Sans FORCE : les connexions des autres workers ne sont pas coupées
+            self._busy_guard(conn, f'DROP DATABASE "{database}"')
+            conn.execute(text(f'CREATE DATABASE "{database}" TEMPLATE "{self._pg_name(name)}"'))
+
+    @staticmethod
+    def _busy_guard(conn, statement):
+        try:
+            conn.execute(text(statement))
+        except DBAPIError as e:
+            # 55006 (object_in_use) : d'autres sessions sont connectées à la base
+            if getattr(e.orig, "sqlstate", None) == "55006" or getattr(e.orig, "pgcode", None) == "55006":
+                raise SnapshotError("D'autres connexions sont ouvertes sur la base") from e
+            raise
@@ -0,0 +1,201 @@
+# src/app/core/store.py
+import threading
+import weakref
+from array import array
+from collections.abc import MutableMapping
+
+from src.app.money import from_minor, to_minor
+
+
+class AccountView:
+    """Vue légère sur une ligne du store, compatible avec MemoryAccount.
+
+    Les attributs `balance` et `owner_id` lisent et écrivent directement dans
+    les colonnes du store ; la vue ne porte aucune donnée propre.
+    """
+
+    __slots__ = ("_store", "_row", "id", "__weakref__")
+
+    def __init__(self, store, row: int, account_id: str):
+        self._store = store
+        self._row = row
+        self.id = account_id
+
+    def _checked_row(self):
+        if self._row < 0:
+            raise KeyError(f"Compte {self.id} supprimé du store")
+        return self._row
+
+    @property
+    def balance(self) -> float:
+        return from_minor(self._store.balances[self._checked_row()])
+
+    @balance.setter
+    def balance(self, value):
+        self._store.balances[self._checked_row()] = to_minor(value)
+
+    @property
+    def balance_minor(self) -> int:
+        return self._store.balances[self._checked_row()]
+
+    @property
+    def owner_id(self) -> int:
+        return self._store.owner_ids[self._checked_row()]
+
+    @owner_id.setter
+    def owner_id(self, value: int):
+        self._store.owner_ids[self._checked_row()] = value
+
+    def __repr__(self):
+        return f"AccountView(id={self.id!r}, balance={self.balance!r}, owner_id={self.owner_id!r})"
+
+
+class AccountStore(MutableMapping):
+    """Stockage colonnaire des comptes : index id → ligne + colonnes int64.
+
+    Remplace un dictionnaire d'objets MemoryAccount (un `__dict__` par compte)
+    par deux `array('q')` contigus. L'accès `store[id]` renvoie une AccountView ;
+    tant qu'une vue est référencée, les accès suivants renvoient la même instance.
+
+    Les colonnes d'une ligne existante sont protégées par le verrou du compte
+    (voir LockStripes) ; les changements de structure (création de ligne,
+    suppression, vidage, restauration) touchent l'index et les colonnes
+    partagés par tous les comptes et passent par un verrou interne.
+    """
+
+    def __init__(self):
+        self._index = {}  # id -> ligne
+        self._ids = []  # ligne -> id
+        self.balances = array("q")
+        self.owner_ids = array("q")
+        self._views = weakref.WeakValueDictionary()
+        self._structure = threading.Lock()
+
+    # ---------------- Accès par ligne ----------------
+    def row_of(self, account_id: str):
+        """Retourne la ligne d'un compte, ou None s'il n'existe pas."""
+        return self._index.get(account_id)
+
+    def id_at(self, row: int) -> str:
+        return self._ids[row]
+
+    def add(self, account_id: str, balance_minor: int = 0, owner_id: int = 1) -> int:
+        """Ajoute un compte (ou écrase ses colonnes) et retourne sa ligne."""
+        row = self._index.get(account_id)
+        if row is None:
+            with self._structure:
+                row = self._index.get(account_id)
+                if row is None:
+                    # Index publié en dernier : la ligne est complète dès qu'elle est visible
+                    row = len(self._ids)
+                    self._ids.append(account_id)
+                    self.balances.append(balance_minor)
+                    self.owner_ids.append(owner_id)
+                    self._index[account_id] = row
+                    return row
+        self.balances[row] = balance_minor
+        self.owner_ids[row] = owner_id
+        return row
+
+    def view(self, row: int) -> AccountView:
+        """Retourne la vue (internée tant qu'elle est référencée) d'une ligne."""
+        account_id = self._ids[row]
+        view = self._views.get(account_id)
+        if view is None:
+            view = AccountView(self, row, account_id)
+            self._views[account_id] = view
+        return view
+
+    # ---------------- Interface Mapping ----------------
+    def __getitem__(self, account_id: str) -> AccountView:
+        return self.view(self._index[account_id])
+
+    def __setitem__(self, account_id: str, account):
+        self.add(account_id, to_minor(account.balance), getattr(account, "owner_id", 1))
+
+    def __delitem__(self, account_id: str):
+        """Supprime un compte en y déplaçant la dernière ligne (colonnes denses).
+
+        Le compte déplacé change de ligne : l'appelant exclut toute mutation
+        concurrente, pas seulement celles du compte supprimé (core.exclusive()).
+        """
+        with self._structure:
+            row = self._index.pop(account_id)
+            last = len(self._ids) - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._ids[row] = moved_id
+                self.balances[row] = self.balances[last]
+                self.owner_ids[row] = self.owner_ids[last]
+                self._index[moved_id] = row
+                moved_view = self._views.get(moved_id)
+                if moved_view is not None:
+                    moved_view._row = row
+            self._ids.pop()
+            self.balances.pop()
+            self.owner_ids.pop()
+            view = self._views.pop(account_id, None)
+            if view is not None:
+                view._row = -1
+
+    def __contains__(self, account_id):
+        return account_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def get(self, account_id, default=None):
+        row = self._index.get(account_id)
+        return default if row is None else self.view(row)
+
+    def clear(self):
+        with self._structure:
+            self._detach_views()
+            self._index.clear()
+            self._ids.clear()
+            del self.balances[:]
+            del self.owner_ids[:]
+
+    def _detach_views(self):
+        for view in list(self._views.values()):
+            view._row = -1
+        self._views = weakref.WeakValueDictionary()
+
+    # ---------------- Instantanés ----------------
+    def snapshot(self) -> "StoreSnapshot":
+        """Copie figée du store : copies mémoire des colonnes et de l'index."""
+        with self._structure:
+            return StoreSnapshot(dict(self._index), list(self._ids),
+                                 array("q", self.balances), array("q", self.owner_ids))
+
+    def restore(self, snapshot: "StoreSnapshot"):
+        """Remplace le contenu par celui d'un instantané (qui reste réutilisable).
+
+        Les colonnes sont recopiées en place (memcpy) : les références au store
+        et à ses colonnes restent valides. Les vues existantes sont détachées.
+        """
+        with self._structure:
+            self._detach_views()
+            self._index.clear()
+            self._index.update(snapshot.index)
+            self._ids[:] = snapshot.ids
+            self.balances[:] = snapshot.balances
+            self.owner_ids[:] = snapshot.owner_ids
+
+
+class StoreSnapshot:
+    """Contenu figé d'un AccountStore (voir AccountStore.snapshot)."""
+
+    __slots__ = ("index", "ids", "balances", "owner_ids")
+
+    def __init__(self, index, ids, balances, owner_ids):
+        self.index = index
+        self.ids = ids
+        self.balances = balances
+        self.owner_ids = owner_ids
+
+    def __len__(self):
+        return len(self.ids)
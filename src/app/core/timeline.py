@@ -0,0 +1,151 @@
+# src/app/core/timeline.py
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+from src.app.core.events import LedgerListener, OP_TRANSFER
+from src.app.core.locking import LockStripes
+
+DEFAULT_MAX_POINTS = 100_000
+DEFAULT_MAX_TOTAL_POINTS = 10_000_000
+
+
+class HistoryTruncated(Exception):
+    """L'instant demandé est antérieur à l'historique conservé pour ce compte."""
+
+
+class _Timeline:
+    """Points (horodatage, solde après l'événement) d'un compte, triés par horodatage."""
+
+    __slots__ = ("times", "balances", "horizon")
+
+    def __init__(self):
+        self.times = array("q")
+        self.balances = array("q")
+        self.horizon = 0  # avant cet instant, l'historique a été élagué
+
+
+class BalanceTimeline(LedgerListener):
+    """Soldes passés de chaque compte, pour les requêtes « solde au instant T ».
+
+    Chaque mutation ajoute un point de contrôle (horodatage, solde après
+    mutation) lu dans le store sous le verrou du compte ; `balance_at` est une
+    recherche dichotomique, en O(log n) dans la longueur de l'historique.
+    Chaque point garde le solde complet plutôt qu'un delta à rejouer depuis un
+    point de contrôle périodique : un delta int64 occuperait autant de place,
+    et la lecture n'aurait plus à sommer de deltas.
+
+    Au-delà de `max_points` points pour un compte, la moitié la plus ancienne
+    est élaguée (coût amorti constant) et l'instant de coupure est mémorisé.
+    Au-delà de `max_total_points` points tous comptes confondus, la moitié la
+    plus ancienne de chaque historique est élaguée de la même façon (le
+    dernier point, solde courant, est toujours conservé) : la mémoire reste
+    bornée quel que soit le nombre de comptes actifs.
+    """
+
+    def __init__(self, store, max_points: int = DEFAULT_MAX_POINTS,
+                 max_total_points: int = DEFAULT_MAX_TOTAL_POINTS):
+        self.store = store
+        self.max_points = max_points
+        self.max_total_points = max_total_points
+        self._timelines = {}
+        self._locks = LockStripes()
+        self._count_lock = threading.Lock()
+        self._total = 0
+        self._compact_at = max_total_points  # seuil du prochain élagage global
+
+    # ---------------- Abonné du ledger ----------------
+    def on_event(self, event):
+        self._record(event.account_id, event.timestamp_ns)
+        if event.op == OP_TRANSFER:
+            self._record(event.dest_id, event.timestamp_ns)
+
+    def _record(self, account_id, timestamp_ns):
+        row = self.store.row_of(account_id)
+        if row is None:
+            return
+        balance = self.store.balances[row]
+        with self._locks.lock_for(account_id):
+            timeline = self._timelines.get(account_id)
+            if timeline is None:
+                timeline = self._timelines[account_id] = _Timeline()
+            elif timeline.times:
+                # Horloge murale : un recul de l'heure ne doit pas casser le tri
+                timestamp_ns = max(timestamp_ns, timeline.times[-1])
+            added = 1
+            if len(timeline.times) >= self.max_points:
+                added -= self._prune(timeline)
+            timeline.times.append(timestamp_ns)
+            timeline.balances.append(balance)
+        with self._count_lock:
+            self._total += added
+            over = self._total > self._compact_at
+        if over:
+            self._compact()
+
+    @staticmethod
+    def _prune(timeline) -> int:
+        # Élague la moitié la plus ancienne ; retourne le nombre de points retirés
+        half = len(timeline.times) // 2
+        if half:
+            del timeline.times[:half]
+            del timeline.balances[:half]
+            timeline.horizon = timeline.times[0]
+        return half
+
+    def _compact(self):
+        with self._locks.hold_all():
+            with self._count_lock:
+                if self._total <= self._compact_at:
+                    return  # élagage déjà fait par un autre thread
+            total = 0
+            for timeline in self._timelines.values():
+                self._prune(timeline)
+                total += len(timeline.times)
+            self._set_total(total)
+
+    def on_reset(self):
+        with self._locks.hold_all():
+            self._timelines = {}
+            self._set_total(0)
+
+    def _set_total(self, total: int):
+        # Au moins un point par compte : sans marge, chaque mutation relancerait
+        # l'élagage global une fois les comptes plus nombreux que le plafond
+        with self._count_lock:
+            self._total = total
+            self._compact_at = max(self.max_total_points, 2 * total)
+
+    def on_restore(self, store):
+        self.seed(time.time_ns())
+
+    def seed(self, timestamp_ns: int):
+        """Part des soldes actuels du store (après reconstruction) comme unique point.
+
+        L'historique antérieur est inconnu : `timestamp_ns` devient l'horizon.
+        """
+        with self._locks.hold_all():
+            self._timelines = {}
+            for row in range(len(self.store)):
+                timeline = self._timelines[self.store.id_at(row)] = _Timeline()
+                timeline.times.append(timestamp_ns)
+                timeline.balances.append(self.store.balances[row])
+                timeline.horizon = timestamp_ns
+            self._set_total(len(self._timelines))
+
+    # ---------------- Lecture ----------------
+    def balance_at(self, account_id: str, timestamp_ns: int):
+        """Solde (unités mineures) du compte à l'instant donné, inclus.
+
+        Retourne None si le compte n'existait pas encore ; lève HistoryTruncated
+        si l'instant précède l'historique conservé.
+        """
+        with self._locks.lock_for(account_id):
+            timeline = self._timelines.get(account_id)
+            if timeline is None:
+                return None
+            if timestamp_ns < timeline.horizon:
+                raise HistoryTruncated(account_id)
+            i = bisect_right(timeline.times, timestamp_ns)
+            return timeline.balances[i - 1] if i else None
@@ -0,0 +1,206 @@
+# src/app/core/write_behind.py
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import insert
+
+from src.app import crud
+from src.app.core.events import LedgerListener, OP_NAMES, OP_TRANSFER, event_datetime
+from src.app.metrics import get_or_create_metric
+from src.app.money import from_minor
+from src.app.models.transaction import TransactionModel
+
+logger = logging.getLogger("fastapi-app")
+
+DEFAULT_INTERVAL = 1.0
+DEFAULT_MAX_BATCH = 5_000
+DEFAULT_MAX_PENDING = 100_000
+
+pending_gauge = get_or_create_metric(
+    Gauge, "write_behind_pending_events", "Événements du ledger en attente d'écriture SQL")
+lag_gauge = get_or_create_metric(
+    Gauge, "write_behind_flush_lag_seconds", "Âge du plus ancien événement non écrit en SQL")
+flushed_counter = get_or_create_metric(
+    Counter, "write_behind_flushed_rows_total", "Lignes écrites par la persistance différée")
+failure_counter = get_or_create_metric(
+    Counter, "write_behind_flush_failures_total", "Échecs d'écriture de la persistance différée")
+flush_duration = get_or_create_metric(
+    Histogram, "write_behind_flush_duration_seconds", "Durée d'un lot d'écriture SQL")
+
+
+class WriteBehindFlusher(LedgerListener):
+    """Persistance différée du ledger en mémoire vers AccountModel/TransactionModel.
+
+    Les mutations sont accumulées en mémoire (comptes modifiés + lignes de
+    transaction) puis écrites par un thread dédié, en requêtes multi-lignes,
+    toutes les `interval` secondes ou dès que `max_batch` événements attendent.
+    Au-delà de `max_pending` événements en attente, `throttle` bloque les
+    producteurs jusqu'à ce que la base rattrape son retard.
+    """
+
+    def __init__(self, session_factory, store, interval: float = DEFAULT_INTERVAL,
+                 max_batch: int = DEFAULT_MAX_BATCH, max_pending: int = DEFAULT_MAX_PENDING):
+        self.session_factory = session_factory
+        self.store = store
+        self.interval = interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._io_lock = threading.Lock()
+        self._dirty = set()
+        self._rows = []
+        self._oldest = None  # instant (monotonic) du plus ancien événement en attente
+        self._generation = 0
+        self._stopping = False
+        self._thread = None
+
+    # ---------------- Abonné du ledger ----------------
+    def on_event(self, event):
+        name = OP_NAMES[event.op]
+        created_at = event_datetime(event.timestamp_ns)
+        with self._lock:
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._dirty.add(event.account_id)
+            if event.op == OP_TRANSFER:
+                # Un transfert produit une ligne signée par compte
+                self._dirty.add(event.dest_id)
+                self._rows.append((name, -event.amount_minor, event.account_id, created_at))
+                self._rows.append((name, event.amount_minor, event.dest_id, created_at))
+            else:
+                self._rows.append((name, event.amount_minor, event.account_id, created_at))
+            if len(self._rows) >= self.max_batch:
+                self._wake.notify()
+
+    def on_reset(self):
+        # Attend la fin d'une écriture en cours avant d'oublier ce qui est en attente
+        with self._io_lock, self._lock:
+            self._generation += 1
+            self._dirty = set()
+            self._rows = []
+            self._oldest = None
+            self._not_full.notify_all()
+
+    # ---------------- Contre-pression ----------------
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def lag(self) -> float:
+        """Âge en secondes du plus ancien événement non encore écrit."""
+        oldest = self._oldest
+        return 0.0 if oldest is None else time.monotonic() - oldest
+
+    def throttle(self, timeout: float = None) -> bool:
+        """Bloque tant que la file d'attente est pleine. Retourne False si délai dépassé."""
+        with self._lock:
+            return self._not_full.wait_for(
+                lambda: len(self._rows) < self.max_pending or self._stopping, timeout)
+
+    # ---------------- Cycle de vie ----------------
+    def start(self):
+        pending_gauge.set_function(lambda: self.pending)
+        lag_gauge.set_function(self.lag)
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête le thread après une dernière écriture.
+
+        À appeler avant de fermer l'engine des sessions (engine.dispose()) :
+        une écriture en cours utiliserait une connexion fermée.
+        """
+        with self._lock:
+            self._stopping = True
+            self._wake.notify()
+            self._not_full.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    @contextmanager
+    def paused(self):
+        """Écrit ce qui est en attente puis suspend les écritures le temps du bloc.
+
+        Utilisé par les instantanés de la base (voir DatabaseSnapshots.add_writer).
+        """
+        self.flush()
+        with self._io_lock:
+            yield
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._wake.wait_for(
+                    lambda: len(self._rows) >= self.max_batch or self._stopping, self.interval)
+                if self._stopping:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                # Le lot a été remis en file : nouvelle tentative au prochain intervalle
+                logger.error(f"Write-behind flush failed: {e}")
+
+    # ---------------- Écriture ----------------
+    def flush(self) -> int:
+        """Écrit immédiatement tout ce qui est en attente ; retourne le nombre de lignes."""
+        with self._io_lock:
+            with self._lock:
+                if not self._rows and not self._dirty:
+                    return 0
+                dirty, rows = self._dirty, self._rows
+                generation = self._generation
+                self._dirty, self._rows = set(), []
+                self._oldest = None
+                self._not_full.notify_all()
+
+            start = time.perf_counter()
+            try:
+                self._write(dirty, rows)
+            except Exception:
+                failure_counter.inc()
+                with self._lock:
+                    if generation == self._generation:
+                        self._dirty |= dirty
+                        self._rows[:0] = rows
+                        self._oldest = time.monotonic()
+                raise
+            flush_duration.observe(time.perf_counter() - start)
+            flushed_counter.inc(len(rows) + len(dirty))
+            return len(rows)
+
+    def _write(self, dirty, rows):
+        # Soldes lus au moment de l'écriture : ils incluent au moins tous les événements du lot.
+        # Le propriétaire vient du store ; l'upsert ne l'écrit que pour un compte
+        # nouveau, celui d'un compte existant en base est conservé.
+        balances = []
+        for account_id in dirty:
+            row = self.store.row_of(account_id)
+            if row is not None:
+                balances.append({"id": account_id,
+                                 "balance": from_minor(self.store.balances[row]),
+                                 "owner_id": self.store.owner_ids[row]})
+
+        session = self.session_factory()
+        try:
+            # Un seul INSERT ... ON CONFLICT au lieu d'un SELECT suivi d'UPDATE/INSERT
+            crud.upsert_account_balances(session, balances, commit=False)
+            if rows:
+                session.execute(insert(TransactionModel), [
+                    {"type": name, "amount": from_minor(amount),
+                     "account_id": account_id, "created_at": created_at}
+                    for name, amount, account_id, created_at in rows
+                ])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
@@ -1,7 +1,17 @@
+import csv
+import io
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from src.app.models import UserModel, AccountModel, TransactionModel
+from src.app.money import to_minor
 from schemas import UserCreate, AccountCreate
 
+# Taille des lots de paramètres IN (...) : reste sous la limite de variables de SQLite
+_IN_CHUNK = 500
+# Dialectes offrant INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
 def get_user(db: Session, user_id: int):
     return db.query(UserModel).filter(UserModel.id == user_id).first()
 
@@ -34,6 +44,25 @@ def get_transaction(db: Session, transaction_id: int):
 def get_transactions(db: Session, skip: int = 0, limit: int = 100):
     return db.query(TransactionModel).offset(skip).limit(limit).all()
 
+def get_account_transactions(db: Session, account_id: str, before_time=None, before_id=None,
+                             limit: int = 50):
+    """Transactions d'un compte, des plus récentes aux plus anciennes.
+
+    Pagination par clé (created_at, id) plutôt que par OFFSET : chaque page
+    repart de la dernière ligne lue via l'index du compte.
+    """
+    query = db.query(TransactionModel).filter(TransactionModel.account_id == account_id)
+    if before_time is not None:
+        if before_id is None:
+            query = query.filter(TransactionModel.created_at < before_time)
+        else:
+            query = query.filter(or_(
+                TransactionModel.created_at < before_time,
+                and_(TransactionModel.created_at == before_time, TransactionModel.id < before_id),
+            ))
+    order = (TransactionModel.created_at.desc(), TransactionModel.id.desc())
+    return query.order_by(*order).limit(limit).all()
+
 def create_transaction(db: Session, transaction: dict):
     # CORRECTION : utiliser account_id au lieu de origin/destination
     db_transaction = TransactionModel(
@@ -45,3 +74,112 @@ def create_transaction(db: Session, transaction: dict):
     db.commit()
     db.refresh(db_transaction)
     return db_transaction
+
+# ---------------- Écritures en masse ----------------
+# Une requête multi-lignes par page de paramètres et un seul commit par lot,
+# au lieu de add → commit → refresh (un SELECT et un fsync) par ligne
+
+def create_accounts_bulk(db: Session, accounts: list, commit: bool = True):
+    """Insère des comptes (AccountCreate) ; retourne les lignes (id, balance, owner_id).
+
+    Un identifiant déjà présent fait échouer tout le lot (IntegrityError).
+    """
+    if not accounts:
+        return []
+    statement = insert(AccountModel).returning(
+        AccountModel.id, AccountModel.balance, AccountModel.owner_id, sort_by_parameter_order=True)
+    rows = db.execute(statement, [
+        {"id": account.id, "balance": account.balance, "owner_id": account.user_id}
+        for account in accounts
+    ]).all()
+    if commit:
+        db.commit()
+    return rows
+
+def create_transactions_bulk(db: Session, transactions: list, commit: bool = True):
+    """Insère des transactions (dicts type/amount/account_id[/created_at]).
+
+    Retourne les lignes (id, created_at) générées par la base, dans l'ordre
+    des transactions, via RETURNING.
+    """
+    if not transactions:
+        return []
+    statement = insert(TransactionModel).returning(
+        TransactionModel.id, TransactionModel.created_at, sort_by_parameter_order=True)
+    rows = db.execute(statement, transactions).all()
+    if commit:
+        db.commit()
+    return rows
+
+def _copy_buffer(transactions: list, with_time: bool) -> io.StringIO:
+    # COPY contourne les types SQLAlchemy : montants convertis ici en unités mineures
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for transaction in transactions:
+        row = [transaction["type"], to_minor(transaction["amount"]), transaction["account_id"]]
+        if with_time:
+            row.append(transaction["created_at"].isoformat())
+        writer.writerow(row)
+    buffer.seek(0)
+    return buffer
+
+def copy_transactions(db: Session, transactions: list, commit: bool = True) -> int:
+    """Charge des transactions sans retourner d'identifiants ; retourne leur nombre.
+
+    Sur PostgreSQL (psycopg2), COPY ... FROM STDIN dans la transaction de la
+    session ; ailleurs, INSERT multi-lignes sans RETURNING.
+    """
+    if not transactions:
+        return 0
+    if db.get_bind().dialect.driver != "psycopg2":
+        db.execute(insert(TransactionModel), transactions)
+    else:
+        cursor = db.connection().connection.dbapi_connection.cursor()
+        try:
+            # Sans created_at, la valeur par défaut de la colonne s'applique
+            timed = [t for t in transactions if t.get("created_at") is not None]
+            untimed = [t for t in transactions if t.get("created_at") is None]
+            for batch, columns, with_time in (
+                    (timed, "type, amount, account_id, created_at", True),
+                    (untimed, "type, amount, account_id", False)):
+                if batch:
+                    cursor.copy_expert(
+                        f"COPY transactions ({columns}) FROM STDIN WITH (FORMAT csv)",
+                        _copy_buffer(batch, with_time))
+        finally:
+            cursor.close()
+    if commit:
+        db.commit()
+    return len(transactions)
+
+def upsert_account_balances(db: Session, balances: list, commit: bool = True) -> int:
+    """Crée ou met à jour des comptes (dicts id/balance[/owner_id]) ; retourne leur nombre.
+
+    Un compte existant ne voit changer que son solde. INSERT ... ON CONFLICT
+    DO UPDATE sur SQLite et PostgreSQL ; ailleurs, lecture des identifiants
+    existants puis UPDATE et INSERT multi-lignes.
+    """
+    if not balances:
+        return 0
+    make_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if make_insert is not None:
+        statement = make_insert(AccountModel)
+        statement = statement.on_conflict_do_update(
+            index_elements=[AccountModel.id], set_={"balance": statement.excluded.balance})
+        db.execute(statement, balances)
+    else:
+        ids = [item["id"] for item in balances]
+        existing = set()
+        for i in range(0, len(ids), _IN_CHUNK):
+            existing.update(db.scalars(
+                select(AccountModel.id).where(AccountModel.id.in_(ids[i:i + _IN_CHUNK]))))
+        updates = [{"id": item["id"], "balance": item["balance"]}
+                   for item in balances if item["id"] in existing]
+        inserts = [item for item in balances if item["id"] not in existing]
+        if updates:
+            db.execute(update(AccountModel), updates)
+        if inserts:
+            db.execute(insert(AccountModel), inserts)
+    if commit:
+        db.commit()
+    return len(balances)
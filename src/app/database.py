@@ -1,13 +1,14 @@
 import os
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
+from src.app.models.database import make_engine
 
 load_dotenv()  # Charge les variables depuis .env
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=True)
+# Pool et journalisation SQL réglés par les variables DB_* (voir engine_options)
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -0,0 +1,135 @@
+# src/app/idempotency.py
+import threading
+import time
+from collections import OrderedDict
+
+from prometheus_client import Counter, Gauge
+
+from src.app.metrics import get_or_create_metric
+
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_TTL = 24 * 3600.0
+# Attente maximale d'une requête dupliquée pendant que l'originale s'exécute
+DEFAULT_WAIT_TIMEOUT = 5.0
+
+hit_counter = get_or_create_metric(
+    Counter, "idempotency_hits_total", "Requêtes rejouées depuis le cache d'idempotence")
+miss_counter = get_or_create_metric(
+    Counter, "idempotency_misses_total", "Clés d'idempotence inconnues (requête exécutée)")
+eviction_counter = get_or_create_metric(
+    Counter, "idempotency_evictions_total", "Entrées retirées du cache d'idempotence",
+    labelnames=["reason"])
+entries_gauge = get_or_create_metric(
+    Gauge, "idempotency_cache_entries", "Entrées présentes dans le cache d'idempotence")
+
+
+class IdempotencyError(Exception):
+    """Clé d'idempotence inutilisable pour cette requête."""
+
+
+class KeyInUse(IdempotencyError):
+    """La requête originale est toujours en cours."""
+
+
+class KeyReused(IdempotencyError):
+    """La clé a déjà servi pour une requête différente."""
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "value", "expires_at", "done")
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.value = None
+        self.expires_at = None
+        self.done = threading.Event()
+
+
+class IdempotencyCache:
+    """Cache borné des résultats par clé d'idempotence (LRU + durée de vie).
+
+    `begin` réserve une clé inconnue pour l'appelant (retourne None) ou retourne
+    le résultat déjà mémorisé. L'appelant termine par `complete` (résultat à
+    rejouer) ou `release` (échec à ne pas mémoriser, un nouvel essai s'exécutera).
+    Une requête dupliquée arrivant pendant l'exécution de l'originale attend son
+    résultat. Toutes les opérations sont en O(1) (OrderedDict).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL,
+                 wait_timeout: float = DEFAULT_WAIT_TIMEOUT, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._done = OrderedDict()  # clé -> _Entry terminée, de la moins à la plus récemment utilisée
+        self._inflight = {}  # clé -> _Entry en cours d'exécution
+
+    def __len__(self):
+        return len(self._done)
+
+    def begin(self, key: str, fingerprint):
+        """Retourne le résultat mémorisé pour `key`, ou None si l'appelant doit exécuter."""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                entry = self._inflight.get(key)
+                if entry is None:
+                    miss_counter.inc()
+                    self._inflight[key] = _Entry(fingerprint)
+                    return None
+        if entry.fingerprint != fingerprint:
+            raise KeyReused(key)
+        if not entry.done.wait(self.wait_timeout) or entry.value is None:
+            # Toujours en cours, ou libérée sans résultat : le client doit réessayer
+            raise KeyInUse(key)
+        hit_counter.inc()
+        return entry.value
+
+    def _lookup(self, key):
+        # Appelé sous le verrou
+        entry = self._done.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            del self._done[key]
+            eviction_counter.labels(reason="expired").inc()
+            return None
+        self._done.move_to_end(key)
+        return entry
+
+    def complete(self, key: str, value):
+        """Mémorise le résultat de la requête réservée par `begin`."""
+        with self._lock:
+            entry = self._inflight.pop(key, None)
+            if entry is None:
+                return
+            entry.value = value
+            entry.expires_at = self._clock() + self.ttl
+            self._done[key] = entry
+            self._evict()
+        entry.done.set()
+
+    def release(self, key: str):
+        """Abandonne la réservation sans mémoriser de résultat."""
+        with self._lock:
+            entry = self._inflight.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    def _evict(self):
+        # Appelé sous le verrou : d'abord les entrées expirées en tête, puis la capacité
+        now = self._clock()
+        while self._done:
+            key, entry = next(iter(self._done.items()))
+            if entry.expires_at > now:
+                break
+            del self._done[key]
+            eviction_counter.labels(reason="expired").inc()
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+            eviction_counter.labels(reason="capacity").inc()
+
+    def clear(self):
+        with self._lock:
+            self._done.clear()
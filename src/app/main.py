@@ -1,30 +1,195 @@
-from fastapi import FastAPI, Request, HTTPException, Depends, Form
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, Response, HTTPException, Depends, Form, Header, Query
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
-from prometheus_client import Counter, REGISTRY
+from prometheus_client import Counter
 from prometheus_fastapi_instrumentator import Instrumentator
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+import asyncio
+import json
 import logging
 import os
+import threading
+from typing import List, Optional
 
-from src.app.schemas import TransactionResponse, TransactionCreate, AccountCreate, AccountSchema
-from src.app.models.database import SessionLocal, engine
+from src.app.schemas import (TransactionResponse, TransactionCreate, AccountCreate, AccountSchema,
+                             AccountTransaction, AccountTransactionPage, TransactionBatch,
+                             TransactionRecord)
+from src.app.models.database import (DATABASE_URL, AsyncSessionLocal, ReadSessionLocal, SessionLocal,
+                                     engine)
 from src.app.models.base import Base
 from src.app.models.user import UserModel  # CORRECTION : Import direct du modèle User
 from src.app.models.account import AccountModel
 from src.app.models.transaction import TransactionModel
-from src.app.core import core
-from src.app import crud
+from src.app.core import core, partition, rebuild
+from src.app.core.actor import LedgerActor
+from src.app.core.aggregates import LedgerAggregates
+from src.app.core.events import event_datetime
+from src.app.core.group_commit import CommitCoalescer
+from src.app.core.history import AccountHistory
+from src.app.core.shm import TableUnavailable
+from src.app.core.snapshots import InvalidSnapshotName, SnapshotError, UnknownSnapshot
+from src.app.core.timeline import BalanceTimeline, HistoryTruncated
+from src.app.core.write_behind import WriteBehindFlusher
+from src.app import async_crud, crud
+from src.app.metrics import get_or_create_metric
+from src.app.money import check_money_storage, from_minor, to_minor
+from src.app.idempotency import IdempotencyCache, KeyInUse, KeyReused, entries_gauge
+from src.app.serialization import FastJSONResponse, encode_balance
 # ---------------- Logging ----------------
 logging.basicConfig(level=logging.INFO,
                     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger("fastapi-app")
 
+# ---------------- Lifespan ----------------
+# Ledger utilisé par les endpoints : `core` en processus, ou le client des
+# partitions quand LEDGER_SOCKET_DIR est défini (état partagé entre workers)
+ledger = core
+# Lecture des soldes en mémoire partagée, publiée par les propriétaires (LEDGER_SHM_NAME)
+balance_reader = None
+# Derniers mouvements de chaque compte en mémoire (0 pour désactiver)
+ACCOUNT_HISTORY_CAPACITY = int(os.getenv("ACCOUNT_HISTORY_CAPACITY", "100"))
+account_history = AccountHistory(ACCOUNT_HISTORY_CAPACITY)
+if ACCOUNT_HISTORY_CAPACITY > 0:
+    core.add_listener(account_history)
+# Agrégats du ledger tenus à jour à chaque mutation (GET /stats)
+ledger_stats = LedgerAggregates()
+core.add_listener(ledger_stats)
+# Soldes passés de chaque compte pour GET /balance?as_of=... (0 pour désactiver)
+BALANCE_TIMELINE_MAX_POINTS = int(os.getenv("BALANCE_TIMELINE_MAX_POINTS", "100000"))
+BALANCE_TIMELINE_MAX_TOTAL_POINTS = int(os.getenv("BALANCE_TIMELINE_MAX_TOTAL_POINTS", "10000000"))
+balance_timeline = BalanceTimeline(core.accounts, BALANCE_TIMELINE_MAX_POINTS,
+                                   BALANCE_TIMELINE_MAX_TOTAL_POINTS)
+if BALANCE_TIMELINE_MAX_POINTS > 0:
+    core.add_listener(balance_timeline)
+# Écrivain unique sur la boucle asyncio pour /event (LEDGER_MODE=actor)
+ledger_actor = LedgerActor()
+# Levé tant que le ledger en mémoire n'est pas prêt (reconstruction au démarrage)
+ledger_ready = threading.Event()
+ledger_ready.set()
+# Persistance différée vers SQL (activée par WRITE_BEHIND=1)
+write_behind = None
+# Écriture synchrone des transactions, un commit partagé par groupe (SQL_GROUP_COMMIT=1)
+transaction_log = None
+WRITE_BEHIND_THROTTLE_TIMEOUT = float(os.getenv("WRITE_BEHIND_THROTTLE_TIMEOUT", "5"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global ledger, balance_reader, write_behind, transaction_log
+    client = partition.client_from_env()
+    if client is not None:
+        # Les soldes et le journal sont tenus par les processus propriétaires ;
+        # ils n'écrivent rien en SQL (pas de persistance différée ni groupée)
+        ledger = client
+        logger.info(f"Ledger partitionné : {client.partitions} partitions dans {client.socket_dir}")
+        balance_reader = partition.balance_reader_from_env()
+    journal_path = os.getenv("LEDGER_JOURNAL_PATH")
+    if journal_path and client is None:
+        replayed = core.open_journal(
+            journal_path,
+            replay_to=[balance_timeline] if BALANCE_TIMELINE_MAX_POINTS > 0 else [],
+            commit_interval=float(os.getenv("LEDGER_JOURNAL_COMMIT_MS", "2")) / 1000,
+            wait_durable=os.getenv("LEDGER_JOURNAL_WAIT", "1") == "1",
+        )
+        logger.info(f"Journal {journal_path} rejoué : {replayed} événements")
+        # Les mouvements rejoués ne sont pas dans l'historique en mémoire : suite en SQL
+        account_history.mark_incomplete(core.accounts)
+        ledger_stats.seed(core.accounts)
+    if os.getenv("WRITE_BEHIND", "0") == "1" and client is None:
+        write_behind = WriteBehindFlusher(
+            SessionLocal,
+            core.accounts,
+            interval=float(os.getenv("WRITE_BEHIND_INTERVAL_MS", "1000")) / 1000,
+            max_batch=int(os.getenv("WRITE_BEHIND_MAX_BATCH", "5000")),
+            max_pending=int(os.getenv("WRITE_BEHIND_MAX_PENDING", "100000")),
+        )
+        core.add_listener(write_behind)
+        core.database_snapshots.add_writer(write_behind)
+        write_behind.start()
+    if os.getenv("SQL_GROUP_COMMIT", "0") == "1" and client is None:
+        if write_behind is not None:
+            logger.warning("SQL_GROUP_COMMIT ignoré : WRITE_BEHIND persiste déjà les transactions")
+        else:
+            transaction_log = CommitCoalescer(
+                SessionLocal,
+                window=float(os.getenv("SQL_GROUP_COMMIT_WINDOW_MS", "2")) / 1000,
+                max_batch=int(os.getenv("SQL_GROUP_COMMIT_MAX_BATCH", "256")),
+            )
+            core.database_snapshots.add_writer(transaction_log)
+            transaction_log.start()
+    # Sans persistance SQL, les entrées écrasées ne se liraient nulle part
+    account_history.evict = write_behind is not None or transaction_log is not None
+    if ACCOUNT_HISTORY_CAPACITY > 0 and client is None and not account_history.evict:
+        logger.warning("Historique des comptes non borné : ni WRITE_BEHIND ni SQL_GROUP_COMMIT")
+    if os.getenv("LEDGER_REBUILD", "0") == "1" and client is None and not journal_path:
+        # Le journal fait déjà foi quand il est configuré ; sinon la table transactions
+        ledger_ready.clear()
+        threading.Thread(target=rebuild_ledger, name="ledger-rebuild", daemon=True).start()
+    if os.getenv("LEDGER_MODE", "threadpool") == "actor" and client is None:
+        # Avec le commit groupé, chaque lot est commité en SQL avant d'être appliqué
+        ledger_actor.persist = _persist_ops if transaction_log is not None else None
+        ledger_actor.start()
+        logger.info("Ledger en mode acteur : /event appliqué par un écrivain unique")
+    yield
+    await ledger_actor.stop()
+    ledger_actor.persist = None
+    if transaction_log is not None:
+        core.database_snapshots.remove_writer(transaction_log)
+        transaction_log.stop()
+        transaction_log = None
+    if write_behind is not None:
+        core.remove_listener(write_behind)
+        core.database_snapshots.remove_writer(write_behind)
+        write_behind.stop()
+        write_behind = None
+    core.close_journal()
+    if balance_reader is not None:
+        balance_reader.close()
+        balance_reader = None
+    if client is not None:
+        client.close()
+        ledger = core
+
+def rebuild_ledger():
+    """Recharge les soldes depuis la table transactions puis ouvre le trafic."""
+    # Une base en mémoire n'est pas visible des processus du pool
+    url = None if ":memory:" in DATABASE_URL else engine.url.render_as_string(hide_password=False)
+    workers = os.getenv("LEDGER_REBUILD_WORKERS")
+    try:
+        balances, progress = rebuild.rebuild_balances(
+            engine, url,
+            workers=int(workers) if workers else None,
+            chunk_size=int(os.getenv("LEDGER_REBUILD_CHUNK_SIZE", str(rebuild.DEFAULT_CHUNK_SIZE))),
+        )
+        # Agrégats, historique et points de contrôle repartent de ces soldes (on_restore)
+        core.load_balances(balances)
+        logger.info(f"Ledger reconstruit : {len(balances)} comptes, {progress.rows} transactions "
+                    f"({progress.rate:,.0f} lignes/s)")
+    except Exception:
+        # Le pod reste non prêt : la sonde de readiness le signale
+        logger.exception("Échec de la reconstruction du ledger")
+        return
+    ledger_ready.set()
+
+def require_ready():
+    if not ledger_ready.is_set():
+        raise HTTPException(status_code=503, detail="Ledger is rebuilding, retry later")
+
 # ---------------- FastAPI ----------------
-app = FastAPI(title="Simple Banking API", version="1.0.0")
+# Sérialisation rapide (opt-in) : orjson par défaut, et /event, /balance, /accounts/
+# encodés directement sans revalidation par response_model
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "0") == "1"
+app = FastAPI(title="Simple Banking API", version="1.0.0", lifespan=lifespan,
+              default_response_class=FastJSONResponse if FAST_SERIALIZATION else JSONResponse)
 Base.metadata.create_all(bind=engine)
+# Les tables existantes ne sont pas migrées : refuse une base aux montants en flottants
+check_money_storage(engine)
 templates = Jinja2Templates(directory="src/templates")  # CORRECTION : Chemin correct
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -38,11 +203,28 @@ def get_db():
     finally:
         db.close()
 
+def _get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Lectures SQL : pool en lecture seule s'il est configuré, sinon la session normale
+get_read_db = get_db if ReadSessionLocal is None else _get_read_db
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Avec DB_ASYNC=1, les endpoints SQL attendent le pilote asynchrone au lieu
+# d'occuper un thread du threadpool ; sinon session synchrone dans le threadpool
+get_session = get_db if AsyncSessionLocal is None else get_async_db
+get_read_session = get_read_db if AsyncSessionLocal is None else get_async_db
+
 # ---------------- Prometheus ----------------
 def get_or_create_counter(name: str, description: str):
-    if name in REGISTRY._names_to_collectors:
-        return REGISTRY._names_to_collectors[name]
-    return Counter(name, description)
+    return get_or_create_metric(Counter, name, description)
 
 user_created_counter = get_or_create_counter("user_created_total", "Nombre total d'utilisateurs créés")
 api_reset_counter = get_or_create_counter("api_reset_total", "Nombre de resets de l'API")
@@ -116,72 +298,595 @@ def create_user(email: str = Form(...), password: str = Form(...)):
 
 # ---------------- Accounts ----------------
 @app.post("/accounts/", response_model=AccountSchema)
-def create_account(account: AccountCreate, db: Session = Depends(get_db)):
-    return crud.create_account(db, account, user_id=account.user_id)
+async def create_account(account: AccountCreate, db=Depends(get_session)):
+    if isinstance(db, AsyncSession):
+        db_account = await async_crud.create_account(db, account, user_id=account.user_id)
+    else:
+        db_account = await run_in_threadpool(crud.create_account, db, account, account.user_id)
+    if FAST_SERIALIZATION:
+        return FastJSONResponse(db_account, model=AccountSchema)
+    return db_account
+
+# Chargements en masse (reprise de données) : écrits en SQL seulement, comme POST /accounts/
+def _bulk_write(db: Session, write, *args):
+    try:
+        return write(db, *args)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Bulk write conflicts with existing rows")
+
+@app.post("/accounts/bulk", status_code=201)
+def create_accounts_bulk(accounts: List[AccountCreate], db: Session = Depends(get_db)):
+    rows = _bulk_write(db, crud.create_accounts_bulk, accounts)
+    return {"created": len(rows)}
+
+@app.put("/accounts/balances")
+def upsert_account_balances(accounts: List[AccountSchema], db: Session = Depends(get_db)):
+    count = _bulk_write(db, crud.upsert_account_balances, [account.model_dump() for account in accounts])
+    return {"upserted": count}
+
+@app.post("/transactions/bulk", status_code=201)
+def create_transactions_bulk(transactions: List[TransactionRecord], returning: bool = False,
+                             db: Session = Depends(get_db)):
+    """Importe des lignes de transaction ; `returning=true` rend aussi les identifiants créés.
+
+    Sans identifiants à rendre, le chargement passe par COPY sur PostgreSQL.
+    """
+    rows = [transaction.model_dump(exclude_none=True) for transaction in transactions]
+    if not returning:
+        return {"created": _bulk_write(db, crud.copy_transactions, rows)}
+    created = _bulk_write(db, crud.create_transactions_bulk, rows)
+    return {"created": len(created), "ids": [row.id for row in created]}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _as_utc(value: datetime) -> datetime:
+    # Datetimes naïfs (SQLite, paramètres sans fuseau) : interprétés en UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _balance_as_of(account_id: str, as_of: datetime):
+    if ledger is not core or BALANCE_TIMELINE_MAX_POINTS <= 0:
+        raise HTTPException(status_code=501, detail="Point-in-time balances are not available")
+    as_of = _as_utc(as_of)
+    # Instant inclusif à la microseconde près
+    timestamp_ns = (as_of - _EPOCH) // timedelta(microseconds=1) * 1000 + 999
+    try:
+        minor = balance_timeline.balance_at(account_id, timestamp_ns)
+    except HistoryTruncated:
+        raise HTTPException(status_code=422, detail="as_of is older than the retained history")
+    if minor is None:
+        raise HTTPException(status_code=404, detail="Account not found at as_of")
+    return {"account_id": account_id, "balance": from_minor(minor), "as_of": as_of}
+
+@app.get("/ready")
+def readiness():
+    require_ready()
+    return {"status": "ready"}
 
 @app.get("/balance")
-def get_balance(account_id: str):
-    # CORRECTION : Utiliser la méthode core existante ou logique simplifiée
-    if account_id in core.accounts:
-        account = core.accounts[account_id]
-        return {"account_id": account_id, "balance": account.balance}
+async def get_balance(account_id: str, as_of: Optional[datetime] = None):
+    require_ready()
+    if as_of is not None:
+        return _balance_as_of(account_id, as_of)
+    if balance_reader is not None:
+        try:
+            # Lecture sans verrou ni aller-retour vers le propriétaire
+            balance = balance_reader.get_account_balance(account_id)
+        except TableUnavailable:
+            balance = await run_in_threadpool(ledger.get_account_balance, account_id)
+    elif ledger is core:
+        # Lecture directe en mémoire, sans passer par le threadpool
+        balance = core.get_account_balance(account_id)
     else:
+        balance = await run_in_threadpool(ledger.get_account_balance, account_id)
+    if balance is None:
         raise HTTPException(status_code=404, detail="Account not found")
+    if FAST_SERIALIZATION:
+        return FastJSONResponse(encode_balance(account_id, balance))
+    return {"account_id": account_id, "balance": balance}
+
+def _require_local_stats():
+    # Les agrégats suivent le ledger de ce processus : en mode partitionné, les
+    # mutations ont lieu chez les propriétaires et les agrégats resteraient vides
+    if ledger is not core:
+        raise HTTPException(status_code=501, detail="Ledger statistics are not available")
+
+@app.get("/accounts/{account_id}/stats")
+def get_account_stats(account_id: str):
+    _require_local_stats()
+    stats = ledger_stats.account(account_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return stats
+
+# Curseurs d'historique : "m<seq>" dans la mémoire, "s<created_at en µs>-<id>" en SQL
+def _sql_cursor(row) -> str:
+    micros = (_as_utc(row.created_at) - _EPOCH) // timedelta(microseconds=1)
+    return f"s{micros}-{row.id}"
+
+def _parse_cursor(cursor: str):
+    try:
+        if cursor.startswith("m"):
+            return int(cursor[1:]), None, None
+        if cursor.startswith("s"):
+            micros, row_id = cursor[1:].split("-")
+            return None, _EPOCH + timedelta(microseconds=int(micros)), int(row_id)
+    except ValueError:
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _memory_entry(entry) -> AccountTransaction:
+    return AccountTransaction(seq=entry["seq"], type=entry["type"],
+                              amount=from_minor(entry["amount_minor"]),
+                              counterparty=entry["counterparty"],
+                              timestamp=event_datetime(entry["timestamp_ns"]))
+
+def _sql_entry(row) -> AccountTransaction:
+    # En SQL un retrait est stocké positif, un transfert déjà signé
+    amount = -row.amount if row.type == "withdraw" else row.amount
+    return AccountTransaction(type=row.type, amount=amount, timestamp=_as_utc(row.created_at))
+
+async def _account_rows(db, account_id, before_time, before_id, limit):
+    if isinstance(db, AsyncSession):
+        return await async_crud.get_account_transactions(db, account_id, before_time, before_id, limit)
+    return await run_in_threadpool(crud.get_account_transactions, db, account_id, before_time,
+                                   before_id, limit)
+
+async def _account_exists(account_id: str) -> bool:
+    if ledger is core:
+        return core.account_exists(account_id)
+    return await run_in_threadpool(ledger.account_exists, account_id)
+
+@app.get("/accounts/{account_id}/transactions", response_model=AccountTransactionPage)
+async def list_account_transactions(account_id: str, cursor: Optional[str] = None,
+                                    limit: int = Query(50, ge=1, le=500),
+                                    db=Depends(get_read_session)):
+    """Mouvements d'un compte, du plus récent au plus ancien, paginés par curseur.
+
+    Les pages récentes viennent de l'historique en mémoire ; au-delà de sa
+    capacité, la suite est lue en SQL.
+    """
+    before_seq, before_time, before_id = _parse_cursor(cursor) if cursor else (None, None, None)
+    transactions = []
+    in_memory = ledger is core and ACCOUNT_HISTORY_CAPACITY > 0
+    if in_memory and before_time is None:
+        entries, complete = account_history.page(account_id, before_seq, limit)
+        transactions = [_memory_entry(entry) for entry in entries]
+        if len(entries) == limit:
+            return AccountTransactionPage(account_id=account_id, transactions=transactions,
+                                          next_cursor=f"m{entries[-1]['seq']}")
+        if complete:
+            if not transactions and cursor is None and not await _account_exists(account_id):
+                raise HTTPException(status_code=404, detail="Account not found")
+            return AccountTransactionPage(account_id=account_id, transactions=transactions)
+        # Historique en mémoire épuisé : les entrées plus anciennes sont en SQL
+        oldest = account_history.oldest_timestamp_ns(account_id)
+        if oldest is not None:
+            before_time = event_datetime(oldest)
+
+    remaining = limit - len(transactions)
+    rows = await _account_rows(db, account_id, before_time, before_id, remaining)
+    transactions += [_sql_entry(row) for row in rows]
+    if not transactions and cursor is None and not await _account_exists(account_id):
+        raise HTTPException(status_code=404, detail="Account not found")
+    next_cursor = _sql_cursor(rows[-1]) if rows and len(rows) == remaining else None
+    return AccountTransactionPage(account_id=account_id, transactions=transactions,
+                                  next_cursor=next_cursor)
+
+# Instantané restauré par /reset à la place du DROP/CREATE des tables (si défini)
+RESET_SNAPSHOT = os.getenv("RESET_SNAPSHOT")
+
+def _snapshot_call(method, name: str):
+    try:
+        method(name)
+    except InvalidSnapshotName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UnknownSnapshot:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    except SnapshotError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 @app.post("/reset")
-def reset_state():
-    core.reset_state()
+def reset_state(snapshot: Optional[str] = None):
+    snapshot = snapshot or RESET_SNAPSHOT
+    if snapshot:
+        _snapshot_call(ledger.restore_snapshot, snapshot)
+    else:
+        ledger.reset_state()
+    idempotency_cache.clear()
     api_reset_counter.inc()
-    return {"message": "API reset executed"}
+    return {"message": "API reset executed", "snapshot": snapshot}
+
+# ---------------- Instantanés ----------------
+@app.get("/snapshots")
+def list_snapshots():
+    return {"snapshots": ledger.snapshot_names()}
+
+@app.post("/snapshots/{name}", status_code=201)
+def save_snapshot(name: str):
+    """Fige les comptes en mémoire et la base sous ce nom (remplace un instantané existant)."""
+    _snapshot_call(ledger.save_snapshot, name)
+    return {"message": "Snapshot saved", "snapshot": name}
+
+@app.post("/snapshots/{name}/restore")
+def restore_snapshot(name: str):
+    _snapshot_call(ledger.restore_snapshot, name)
+    idempotency_cache.clear()
+    return {"message": "Snapshot restored", "snapshot": name}
+
+@app.delete("/snapshots/{name}")
+def delete_snapshot(name: str):
+    _snapshot_call(ledger.delete_snapshot, name)
+    return {"message": "Snapshot deleted", "snapshot": name}
 
 # ---------------- Transactions ----------------
-@app.post("/event", response_model=TransactionResponse)
-def process_transaction(transaction: TransactionCreate, db: Session = Depends(get_db)):
-    transaction_processed_counter.inc()
+# Nombre d'événements NDJSON appliqués par passage dans le threadpool
+EVENTS_CHUNK_SIZE = int(os.getenv("EVENTS_CHUNK_SIZE", "1000"))
 
-    try:
-        # CORRECTION : Utiliser account_id au lieu de origin/destination
-        if transaction.type == "deposit":
-            # Pour les dépôts, créer ou mettre à jour le compte
-            account = core.create_or_update_account(transaction.account_id, transaction.amount)
-            return TransactionResponse(
-                type="deposit",
-                account_id=account.id,
-                status="success"
-            )
+# Résultats de /event par en-tête Idempotency-Key : un client qui réessaie n'applique qu'une fois
+idempotency_cache = IdempotencyCache(
+    max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "100000")),
+    ttl=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")),
+)
+entries_gauge.set_function(lambda: len(idempotency_cache))
 
-        elif transaction.type == "withdraw":
-            # Pour les retraits, vérifier si le compte existe
-            if transaction.account_id not in core.accounts:
-                raise HTTPException(status_code=404, detail="Account not found")
-            
-            account = core.withdraw_from_account(transaction.account_id, transaction.amount)
-            if account:
-                return TransactionResponse(
-                    type="withdraw",
-                    account_id=account.id,
-                    status="success"
-                )
-            else:
-                raise HTTPException(status_code=403, detail="Insufficient balance")
-
-        elif transaction.type == "transfer":
-            # CORRECTION : Les transferts nécessitent deux comptes - désactivés temporairement
-            # car le schéma TransactionCreate n'a qu'un account_id
-            raise HTTPException(
-                status_code=400, 
-                detail="Transfer functionality requires two accounts. Current schema only supports single account operations."
+def _check_transaction(transaction: TransactionCreate):
+    """Refus possibles avant toute mutation (type, transfert mal formé)."""
+    if transaction.type == "transfer":
+        # account_id est le compte d'origine, destination le compte crédité
+        if not transaction.destination:
+            raise HTTPException(status_code=400, detail="Transfer requires a destination account")
+        if transaction.destination == transaction.account_id:
+            raise HTTPException(status_code=400, detail="Origin and destination must differ")
+    elif transaction.type not in ("deposit", "withdraw"):
+        raise HTTPException(status_code=400, detail="Invalid transaction type")
+
+def _transaction_response(transaction: TransactionCreate, result) -> TransactionResponse:
+    """Réponse à partir du résultat du ledger ; lève 404/403 en cas de refus.
+
+    Champs issus du ledger, déjà du bon type : construction sans validation.
+    L'horodatage est passé explicitement : avec `default_factory`,
+    `model_construct` inspecte la signature de la fabrique à chaque appel.
+    """
+    # CORRECTION : Utiliser account_id au lieu de origin/destination
+    if transaction.type == "deposit":
+        return TransactionResponse.model_construct(
+            type="deposit",
+            account_id=result.id,
+            status="success",
+            timestamp=datetime.now()
+        )
+
+    elif transaction.type == "withdraw":
+        if result:
+            return TransactionResponse.model_construct(
+                type="withdraw",
+                account_id=result.id,
+                status="success",
+                timestamp=datetime.now()
             )
+        # Refus : compte inexistant ou solde insuffisant
+        if not ledger.account_exists(transaction.account_id):
+            raise HTTPException(status_code=404, detail="Account not found")
+        raise HTTPException(status_code=403, detail="Insufficient balance")
+
+    origin, destination = result
+    if origin is None:
+        if not (ledger.account_exists(transaction.account_id)
+                and ledger.account_exists(transaction.destination)):
+            raise HTTPException(status_code=404, detail="Account not found")
+        raise HTTPException(status_code=403, detail="Insufficient balance")
+    return TransactionResponse.model_construct(
+        type="transfer",
+        account_id=origin.id,
+        destination=destination.id,
+        status="success",
+        timestamp=datetime.now()
+    )
+
+def _transaction_op(transaction: TransactionCreate) -> tuple:
+    """Opération du ledger (op, account_id, minor, dest_id) d'une transaction validée."""
+    return (transaction.type, transaction.account_id, to_minor(transaction.amount),
+            transaction.destination or "")
+
+def _op_rows(ops) -> list:
+    """Lignes SQL d'opérations acceptées (un transfert : une ligne signée par compte).
+
+    `ops` : tuples (op, account_id, minor, dest_id, timestamp_ns) ; created_at
+    reçoit l'horodatage de l'événement du ledger, comme en persistance différée.
+    """
+    rows = []
+    for op, account_id, minor, dest_id, timestamp_ns in ops:
+        amount = from_minor(minor)
+        created_at = event_datetime(timestamp_ns)
+        if op == "transfer":
+            rows.append({"type": "transfer", "amount": -amount, "account_id": account_id,
+                         "created_at": created_at})
+            rows.append({"type": "transfer", "amount": amount, "account_id": dest_id,
+                         "created_at": created_at})
+        else:
+            rows.append({"type": op, "amount": amount, "account_id": account_id,
+                         "created_at": created_at})
+    return rows
 
+def _persist_ops(ops):
+    """Future du commit groupé des lignes de `ops` (LedgerActor.persist)."""
+    return transaction_log.submit(_op_rows(ops))
+
+def _not_persisted():
+    return HTTPException(status_code=503, detail="Transaction not persisted, retry later")
+
+def _apply_persisted(transactions: list, hold) -> list:
+    """Mode SQL_GROUP_COMMIT : commite les lignes SQL avant de muter le ledger.
+
+    Sous `hold` (verrous des comptes, ou exclusive() pour un lot), les
+    transactions acceptables sont prévues sans mutation, leurs lignes commitées
+    en une soumission, puis appliquées. Si le commit échoue, le ledger reste
+    intact et la requête peut être réessayée (503). Retourne le résultat du
+    ledger de chaque transaction.
+    """
+    with hold:
+        # Horodatés sous les verrous : l'ordre des horodatages suit celui d'application
+        ops = [(*_transaction_op(transaction), core.event_timestamp())
+               for transaction in transactions]
+        accepted = [op for op, ok in zip(ops, core.plan_unlocked(ops)) if ok]
+        if accepted:
+            try:
+                transaction_log.persist(_op_rows(accepted))
+            except Exception as e:
+                logger.error(f"Transactions non persistées en SQL, ledger inchangé : {e}")
+                raise _not_persisted()
+        results, last_seq = [], None
+        for op in ops:
+            result, seq = core.apply_unlocked(*op)
+            results.append(result)
+            if seq is not None:
+                last_seq = seq
+    core.wait_durable(last_seq)
+    return results
+
+def _backlog_full():
+    return HTTPException(status_code=503, detail="Persistence backlog full, retry later")
+
+def apply_transaction(transaction: TransactionCreate) -> TransactionResponse:
+    """Applique une transaction validée au ledger ; lève HTTPException en cas de refus."""
+    require_ready()
+    if write_behind is not None and not write_behind.throttle(WRITE_BEHIND_THROTTLE_TIMEOUT):
+        # Contre-pression : la base ne suit plus, le client doit réessayer plus tard
+        raise _backlog_full()
+    _check_transaction(transaction)
+    if transaction_log is not None:
+        # Ledger muté seulement après le commit (partagé avec les requêtes concurrentes)
+        result = _apply_persisted([transaction], core.holding(
+            transaction.account_id, *([transaction.destination] if transaction.type == "transfer" else [])
+        ))[0]
+    elif transaction.type == "deposit":
+        # Pour les dépôts, créer ou mettre à jour le compte
+        result = ledger.create_or_update_account(transaction.account_id, transaction.amount)
+    elif transaction.type == "withdraw":
+        result = ledger.withdraw_from_account(transaction.account_id, transaction.amount)
+    else:
+        # Les verrous des deux comptes sont pris dans un ordre canonique (pas d'interblocage)
+        result = ledger.transfer_between_accounts(
+            transaction.account_id, transaction.destination, transaction.amount
+        )
+    return _transaction_response(transaction, result)
+
+async def apply_transaction_async(transaction: TransactionCreate) -> TransactionResponse:
+    """Variante de apply_transaction en mode acteur : l'écrivain unique applique l'opération."""
+    require_ready()
+    if write_behind is not None and not await run_in_threadpool(
+            write_behind.throttle, WRITE_BEHIND_THROTTLE_TIMEOUT):
+        raise _backlog_full()
+    _check_transaction(transaction)
+    if transaction.type == "deposit":
+        result = await ledger_actor.create_or_update_account(transaction.account_id, transaction.amount)
+    elif transaction.type == "withdraw":
+        result = await ledger_actor.withdraw_from_account(transaction.account_id, transaction.amount)
+    else:
+        result = await ledger_actor.transfer_between_accounts(
+            transaction.account_id, transaction.destination, transaction.amount
+        )
+    return _transaction_response(transaction, result)
+
+def apply_transaction_once(transaction: TransactionCreate, idempotency_key: str):
+    """Applique la transaction une seule fois par clé ; retourne (réponse, rejouée)."""
+    try:
+        cached = idempotency_cache.begin(idempotency_key, transaction.model_dump())
+    except KeyReused:
+        raise HTTPException(status_code=422, detail="Idempotency-Key already used with a different payload")
+    except KeyInUse:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is in progress")
+    if cached is not None:
+        if isinstance(cached, HTTPException):
+            raise HTTPException(status_code=cached.status_code, detail=cached.detail)
+        return cached, True
+
+    try:
+        response = apply_transaction(transaction)
+    except HTTPException as e:
+        # 503 : levé avant toute mutation (ledger non prêt, contre-pression,
+        # commit SQL échoué), la clé est libérée pour un nouvel essai. Toute
+        # autre réponse est définitive et rejouée.
+        if e.status_code == 503:
+            idempotency_cache.release(idempotency_key)
         else:
-            raise HTTPException(status_code=400, detail="Invalid transaction type")
+            idempotency_cache.complete(idempotency_key, e)
+        raise
+    except Exception as e:
+        # La transaction a pu être appliquée (ex. journal non durable) : un
+        # nouvel essai rejoue l'échec au lieu de l'appliquer une seconde fois
+        logger.error(f"Error processing transaction: {e}")
+        failure = HTTPException(status_code=500, detail="Internal server error")
+        idempotency_cache.complete(idempotency_key, failure)
+        raise failure
+    idempotency_cache.complete(idempotency_key, response)
+    return response, False
 
+@app.post("/event", response_model=TransactionResponse)
+async def process_transaction(transaction: TransactionCreate, response: Response,
+                              idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
+    transaction_processed_counter.inc()
+
+    try:
+        if idempotency_key is not None:
+            # Peut attendre la fin d'une requête de même clé : dans le threadpool
+            result, replayed = await run_in_threadpool(apply_transaction_once, transaction, idempotency_key)
+            if replayed:
+                response.headers["Idempotent-Replayed"] = "true"
+        elif ledger_actor.running and ledger is core:
+            result = await apply_transaction_async(transaction)
+        else:
+            result = await run_in_threadpool(apply_transaction, transaction)
+        if FAST_SERIALIZATION:
+            return FastJSONResponse(result, model=TransactionResponse, headers=response.headers)
+        return result
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error processing transaction: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def apply_events(items: list, first_index: int = 0) -> list:
+    """Valide puis applique, dans l'ordre, une liste d'événements bruts.
+
+    Retourne un résultat par événement ; un événement refusé n'interrompt pas le lot.
+    """
+    try:
+        # Cas nominal : tout le lot validé en un appel ; sinon validation
+        # individuelle pour rattacher chaque erreur à son événement
+        outcomes = TransactionBatch.validate_python(items)
+    except ValidationError:
+        outcomes = []
+        for item in items:
+            try:
+                outcomes.append(TransactionCreate.model_validate(item))
+            except ValidationError as e:
+                outcomes.append(e)
+    # Une seule attente de durabilité (journal, commit SQL groupé) par lot
+    with core.batch_durability():
+        if transaction_log is not None:
+            outcomes = _apply_events_persisted(outcomes)
+        else:
+            outcomes = [_apply_event(outcome) for outcome in outcomes]
+    results = [_event_result(index, outcome)
+               for index, outcome in enumerate(outcomes, start=first_index)]
+    transaction_processed_counter.inc(len(items))
+    return results
+
+def _apply_event(outcome):
+    # Réponse de la transaction, ou exception qui l'a refusée
+    if isinstance(outcome, Exception):
+        return outcome
+    try:
+        return apply_transaction(outcome)
+    except Exception as e:
+        return e
+
+def _apply_events_persisted(outcomes: list) -> list:
+    """Lot en mode SQL_GROUP_COMMIT : un commit SQL pour le lot, puis application au ledger."""
+    outcomes = list(outcomes)
+    valid = []
+    for position, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            continue
+        try:
+            require_ready()
+            _check_transaction(outcome)
+            valid.append(position)
+        except HTTPException as e:
+            outcomes[position] = e
+    if not valid:
+        return outcomes
+    try:
+        results = _apply_persisted([outcomes[position] for position in valid], core.exclusive())
+    except HTTPException as e:
+        for position in valid:
+            outcomes[position] = e
+        return outcomes
+    for position, result in zip(valid, results):
+        try:
+            outcomes[position] = _transaction_response(outcomes[position], result)
+        except HTTPException as e:
+            outcomes[position] = e
+    return outcomes
+
+def _event_result(index: int, outcome) -> dict:
+    if isinstance(outcome, ValidationError):
+        return {"index": index, "status_code": 422, "status": "failed",
+                "detail": outcome.errors(include_url=False, include_context=False)}
+    if isinstance(outcome, HTTPException):
+        return {"index": index, "status_code": outcome.status_code, "status": "failed",
+                "detail": outcome.detail}
+    if isinstance(outcome, Exception):
+        logger.error(f"Error processing event {index}: {outcome}")
+        return {"index": index, "status_code": 500, "status": "failed",
+                "detail": "Internal server error"}
+    return {"index": index, "status_code": 200, "status": outcome.status,
+            "type": outcome.type, "account_id": outcome.account_id}
+
+async def _iter_ndjson(request: Request):
+    # Découpe le corps en lignes au fil de la réception, sans le charger en entier
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+def _decode_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError:
+        # Laissé tel quel : la validation le signalera comme invalide
+        return line.decode(errors="replace")
+
+@app.post("/events")
+async def process_events(request: Request):
+    """Traite un lot d'événements (tableau JSON ou flux NDJSON) dans l'ordre."""
+    results = []
+    if "ndjson" in request.headers.get("content-type", ""):
+        chunk = []
+        async for line in _iter_ndjson(request):
+            chunk.append(_decode_line(line))
+            if len(chunk) >= EVENTS_CHUNK_SIZE:
+                results += await run_in_threadpool(apply_events, chunk, len(results))
+                chunk = []
+        if chunk:
+            results += await run_in_threadpool(apply_events, chunk, len(results))
+    else:
+        try:
+            items = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of events")
+        results = await run_in_threadpool(apply_events, items)
+
+    succeeded = sum(1 for result in results if result["status_code"] == 200)
+    return {"processed": len(results), "succeeded": succeeded,
+            "failed": len(results) - succeeded, "results": results}
+
+# ---------------- Stats ----------------
+@app.get("/stats")
+def get_stats():
+    """Agrégats globaux du ledger, maintenus à chaque mutation (O(1))."""
+    _require_local_stats()
+    return ledger_stats.snapshot()
+
+@app.get("/stats/verify")
+def verify_stats():
+    """Recalcule les agrégats depuis les soldes pour détecter une dérive (O(comptes))."""
+    _require_local_stats()
+    with core.exclusive():
+        report = ledger_stats.verify(core.accounts)
+    if not report["ok"]:
+        logger.warning(f"Ledger aggregates drift detected: {report}")
+    return report
+
 # ---------------- GitHub Webhook ----------------
 @app.post("/github-webhook/")
 async def github_webhook(request: Request):
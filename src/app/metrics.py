@@ -0,0 +1,13 @@
+# src/app/metrics.py
+from prometheus_client import REGISTRY
+
+
+def get_or_create_metric(metric_cls, name: str, description: str, **kwargs):
+    """Retourne la métrique déjà enregistrée sous ce nom, ou la crée.
+
+    Évite les erreurs de doublon quand un module est importé plusieurs fois
+    (rechargement en développement, tests).
+    """
+    if name in REGISTRY._names_to_collectors:
+        return REGISTRY._names_to_collectors[name]
+    return metric_cls(name, description, **kwargs)
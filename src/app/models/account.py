@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Float, Integer, ForeignKey
+from sqlalchemy import Column, String, Integer, ForeignKey
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel, Field
+from src.app.money import Money, MoneyColumn
 from .base import Base
 
 class AccountModel(Base):
@@ -8,7 +9,7 @@ class AccountModel(Base):
     __table_args__ = {'extend_existing': True}
 
     id = Column(String, primary_key=True, index=True)
-    balance = Column(Float, default=0.0)
+    balance = Column(MoneyColumn, default=0)  # unités mineures en base
     owner_id = Column(Integer, ForeignKey("users.id"))
 
     owner = relationship("UserModel", back_populates="accounts")
@@ -19,7 +20,7 @@ Account = AccountModel  # Alias pour les tests
 
 class AccountBase(BaseModel):
     id: str
-    balance: float = 0.0
+    balance: Money = 0.0
 
 class AccountCreate(AccountBase):
     user_id: int = Field(..., gt=0)
@@ -1,19 +1,251 @@
-# src/app/models/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from src.app.models.base import Base
-import os
-import tempfile
-
-# --- Choix du mode : test ou normal ---
-TESTING = os.getenv("TESTING", "0") == "1"
-
-if TESTING:
-    # ⚡ Base en mémoire (DB volatile et propre à chaque session de test)
-    DATABASE_URL = "sqlite:///:memory:"
-else:
-    DATABASE_URL = "sqlite:///./banking.db"
-
-# --- Création de l'engine ---
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# src/app/models/database.py
+from sqlalchemy import create_engine, event, exc, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from prometheus_client import Counter, Gauge, Histogram
+from src.app.metrics import get_or_create_metric
+from src.app.models.base import Base
+import os
+import tempfile
+import time
+
+# --- Choix du mode : test ou normal ---
+TESTING = os.getenv("TESTING", "0") == "1"
+
+if TESTING:
+    # ⚡ Base en mémoire (DB volatile et propre à chaque session de test)
+    DATABASE_URL = "sqlite:///:memory:"
+else:
+    DATABASE_URL = "sqlite:///./banking.db"
+
+# --- Pool de connexions ---
+pool_checked_out_gauge = get_or_create_metric(
+    Gauge, "db_pool_checked_out", "Connexions SQL prêtées par le pool", labelnames=["database"])
+pool_overflow_gauge = get_or_create_metric(
+    Gauge, "db_pool_overflow", "Connexions ouvertes au-delà de pool_size", labelnames=["database"])
+pool_waiting_gauge = get_or_create_metric(
+    Gauge, "db_pool_waiting", "Threads en attente d'une connexion du pool", labelnames=["database"])
+pool_wait_histogram = get_or_create_metric(
+    Histogram, "db_pool_wait_seconds", "Durée d'obtention d'une connexion du pool",
+    labelnames=["database"])
+pool_timeout_counter = get_or_create_metric(
+    Counter, "db_pool_timeouts_total", "Attentes de connexion ayant dépassé pool_timeout",
+    labelnames=["database"])
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui publie son occupation et ses temps d'attente dans Prometheus."""
+
+    label = "default"
+
+    def _do_get(self):
+        # Seul un pool épuisé (pool_size + max_overflow prêtées) fait attendre
+        exhausted = self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+        waiting = pool_waiting_gauge.labels(self.label)
+        if exhausted:
+            waiting.inc()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_timeout_counter.labels(self.label).inc()
+            raise
+        finally:
+            if exhausted:
+                waiting.dec()
+            pool_wait_histogram.labels(self.label).observe(time.perf_counter() - start)
+        self._publish()
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._publish()
+
+    def _publish(self):
+        pool_checked_out_gauge.labels(self.label).set(self.checkedout())
+        # overflow() vaut -pool_size tant que le pool n'est pas plein
+        pool_overflow_gauge.labels(self.label).set(max(self.overflow(), 0))
+
+    def recreate(self):
+        # engine.dispose() remplace le pool : le libellé des métriques suit
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """Variante pour les engines asynchrones (file d'attente compatible asyncio)."""
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+# --- SQLite haut débit ---
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "0") == "1"
+_SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+_TEMP_STORES = ("DEFAULT", "FILE", "MEMORY")
+
+
+def sqlite_pragmas() -> list:
+    """PRAGMA du mode haut débit, lus dans l'environnement.
+
+    WAL : les lecteurs ne bloquent plus l'écrivain ; avec synchronous=NORMAL
+    un commit n'attend plus de fsync (seuls les checkpoints synchronisent).
+    """
+    synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+    temp_store = os.getenv("SQLITE_TEMP_STORE", "MEMORY").upper()
+    if synchronous not in _SYNCHRONOUS_LEVELS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of {', '.join(_SYNCHRONOUS_LEVELS)}")
+    if temp_store not in _TEMP_STORES:
+        raise ValueError(f"SQLITE_TEMP_STORE must be one of {', '.join(_TEMP_STORES)}")
+    return [
+        ("journal_mode", "WAL"),
+        ("synchronous", synchronous),
+        ("mmap_size", _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+        # Négatif : taille en Kio plutôt qu'en pages
+        ("cache_size", _env_int("SQLITE_CACHE_SIZE", -64 * 1024)),
+        ("temp_store", temp_store),
+        ("busy_timeout", _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    ]
+
+
+def tune_sqlite(engine, pragmas, query_only: bool = False):
+    """Applique `pragmas` à chaque nouvelle connexion SQLite de l'engine."""
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas]
+    if query_only:
+        statements.append("PRAGMA query_only=1")
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+    return engine
+
+
+def _is_sqlite_file(url) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def engine_options(url) -> dict:
+    """Options de create_engine lues dans l'environnement.
+
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE et
+    DB_POOL_PRE_PING règlent le pool ; DB_STATEMENT_CACHE_SIZE la taille du
+    cache des requêtes compilées ; DB_ECHO journalise chaque requête (désactivé
+    par défaut : la journalisation est synchrone). SQLite en mémoire garde
+    son pool par thread, sans options de pool.
+    """
+    url = make_url(url)
+    options = {
+        "echo": os.getenv("DB_ECHO", "0") == "1",
+        "query_cache_size": _env_int("DB_STATEMENT_CACHE_SIZE", 500),
+    }
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=_env_int("DB_POOL_SIZE", 5),
+        max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=_env_int("DB_POOL_RECYCLE", -1),
+        pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "0") == "1",
+    )
+    return options
+
+
+def make_engine(url, label: str = None, **overrides):
+    """Crée l'engine de `url` avec les options de engine_options(), surchargeables.
+
+    `label` nomme le pool dans les métriques (par défaut : moteur/base). Un
+    fichier SQLite reçoit les PRAGMA de sqlite_pragmas() si SQLITE_TUNING=1.
+    """
+    engine = create_engine(url, **{**engine_options(url), **overrides})
+    return _instrument(engine, url, label)
+
+
+def _instrument(engine, url, label):
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        parsed = make_url(url)
+        engine.pool.label = label or f"{parsed.get_backend_name()}/{parsed.database}"
+    if SQLITE_TUNING and _is_sqlite_file(url):
+        tune_sqlite(engine, sqlite_pragmas())
+    return engine
+
+
+def make_read_engine(url, pool_size: int):
+    """Pool de connexions SQLite en lecture seule (PRAGMA query_only) sur le même fichier.
+
+    En WAL, ces lecteurs voient le dernier commit sans jamais attendre l'écrivain.
+    Sans SQLITE_TUNING, chaque connexion du pool active WAL elle-même (le mode est
+    enregistré dans le fichier, les nouvelles connexions de l'écrivain le suivent).
+    """
+    if not _is_sqlite_file(url):
+        raise ValueError("A read-only pool needs a SQLite database file")
+    parsed = make_url(url)
+    engine = make_engine(url, label=f"sqlite/{parsed.database}:read",
+                         pool_size=pool_size, max_overflow=0)
+    # Avec SQLITE_TUNING, les PRAGMA du mode haut débit sont déjà posés par make_engine
+    return tune_sqlite(engine, [] if SQLITE_TUNING else [("journal_mode", "WAL")],
+                       query_only=True)
+
+
+# --- Accès asynchrone ---
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_url(url):
+    """URL équivalente avec le pilote asynchrone du moteur (aiosqlite, asyncpg).
+
+    Avec asyncpg, DB_STATEMENT_CACHE_SIZE règle aussi le cache de requêtes
+    préparées côté pilote.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == "postgresql" and "prepared_statement_cache_size" not in url.query:
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(_env_int("DB_STATEMENT_CACHE_SIZE", 500))})
+    return url
+
+
+def make_async_engine(url, label: str = None, **overrides):
+    """AsyncEngine de `url` (pilote asynchrone), mêmes options que make_engine()."""
+    url = async_url(url)
+    options = engine_options(url)
+    if options.get("poolclass") is InstrumentedQueuePool:
+        options["poolclass"] = InstrumentedAsyncQueuePool
+    engine = create_async_engine(url, **{**options, **overrides})
+    _instrument(engine.sync_engine, url, label)
+    return engine
+
+
+# --- Création de l'engine ---
+engine = make_engine(DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Pool de lecture séparé, optionnel (SQLITE_READ_POOL_SIZE > 0, fichier SQLite)
+SQLITE_READ_POOL_SIZE = _env_int("SQLITE_READ_POOL_SIZE", 0)
+read_engine = (make_read_engine(DATABASE_URL, SQLITE_READ_POOL_SIZE)
+               if SQLITE_READ_POOL_SIZE > 0 and _is_sqlite_file(DATABASE_URL) else None)
+if read_engine is not None and not SQLITE_TUNING:
+    # Les lecteurs supposent WAL : l'écrivain le pose aussi sur chaque connexion
+    tune_sqlite(engine, [("journal_mode", "WAL")])
+ReadSessionLocal = (sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+                    if read_engine is not None else None)
+
+# Sessions asynchrones (DB_ASYNC=1) pour les endpoints async, sans thread du threadpool
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+async_engine = make_async_engine(DATABASE_URL) if DB_ASYNC else None
+AsyncSessionLocal = (async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+                     if async_engine is not None else None)
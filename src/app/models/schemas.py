@@ -1,7 +1,24 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from pydantic_core import core_schema
+from typing import Annotated, Optional, List
 from enum import Enum
 from datetime import datetime
+from src.app.money import Money
+
+TRANSACTION_TYPE_ERROR = "Value error, Type must be deposit, withdraw, or transfer"
+
+
+class TransactionTypeError:
+    """Remplace l'erreur native d'un type de transaction invalide par le message historique.
+
+    Contrainte exprimée dans le schéma pydantic-core (pas de validateur Python) :
+    la validation reste entièrement dans le cœur Rust.
+    """
+
+    def __get_pydantic_core_schema__(self, source, handler):
+        return core_schema.custom_error_schema(
+            handler(source), custom_error_type="transaction_type",
+            custom_error_message=TRANSACTION_TYPE_ERROR)
 
 class TransactionType(str, Enum):
     DEPOSIT = "deposit"
@@ -24,7 +41,7 @@ class User(UserBase):  # Renommé de UserModel à User pour correspondre aux tes
 
 class AccountBase(BaseModel):
     id: str
-    balance: float = 0.0  # Valeur par défaut
+    balance: Money = 0.0  # Valeur par défaut
 
 class AccountCreate(AccountBase):
     user_id: int = Field(..., gt=0)
@@ -36,25 +53,15 @@ class AccountSchema(AccountBase):
         from_attributes = True
 
 class TransactionCreate(BaseModel):
-    type: TransactionType
-    amount: float = Field(..., gt=0)
+    type: Annotated[TransactionType, TransactionTypeError()]
+    amount: Money = Field(..., gt=0)
     account_id: str  # CORRECTION : account_id au lieu de origin/destination
-
-    @validator('type')
-    def validate_type(cls, v):
-        if v not in ['deposit', 'withdraw', 'transfer']:
-            raise ValueError('Type must be deposit, withdraw, or transfer')
-        return v
-
-    @validator('amount')
-    def validate_amount(cls, v):
-        if v <= 0:
-            raise ValueError('Amount must be greater than 0')
-        return v
+    destination: Optional[str] = None  # Compte destinataire d'un transfer
 
 class TransactionResponse(BaseModel):
     type: str
     account_id: str  # CORRECTION : account_id au lieu de origin/destination
+    destination: Optional[str] = None
     status: str = "success"
     timestamp: datetime = Field(default_factory=datetime.now)
 
@@ -1,15 +1,20 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from src.app.money import MoneyColumn
 from .base import Base
 
 class TransactionModel(Base):
     __tablename__ = "transactions"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Historique d'un compte paginé par (created_at, id) décroissants
+        Index("ix_transactions_account_created", "account_id", "created_at", "id"),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     type = Column(String, nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(MoneyColumn, nullable=False)  # unités mineures en base
     account_id = Column(String, ForeignKey("accounts.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
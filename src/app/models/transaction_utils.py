@@ -1,27 +1,167 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from src.app.core.events import OP_NAMES
+from src.app.money import MINOR_UNITS, from_minor, to_minor
+
 INVALID_AMOUNT_MSG = "Montant invalide"
 INSUFFICIENT_BALANCE_MSG = "Solde insuffisant"
 
+# Frais de transfert en points de base (1 pb = 0,01 %)
+TRANSFER_FEE_BPS = 500
+BPS_DENOMINATOR = 10_000
+
+# ---------------- Barèmes de frais ----------------
+_OP_CODES = {name: op for op, name in OP_NAMES.items()}
+_VALID_CODES = np.array(sorted(OP_NAMES), dtype=np.int64)
+# Décalage par type pour une seule recherche dichotomique sur tous les barèmes :
+# les montants au-delà (9e13 unités majeures) tombent dans la dernière tranche,
+# qui doit donc commencer en deçà
+_TYPE_SPAN = 1 << 53
+# Montant maximal sans débordement de montant × points de base sur int64
+MAX_FEE_AMOUNT_MINOR = np.iinfo(np.int64).max // BPS_DENOMINATOR
+
+class FeeSchedule:
+    """Barème de frais par type d'opération, compilé en tableaux de recherche.
+
+    `rules` associe un type (deposit, withdraw, transfer) à un dict :
+    `brackets` liste de (borne inférieure en unités majeures, points de base),
+    la première borne valant 0 ; `progressive` (faux par défaut) applique le
+    taux de chaque tranche à la seule part du montant qui s'y trouve, sinon
+    tout le montant prend le taux de sa tranche ; `minimum` et `cap` bornent
+    les frais (unités majeures). Un type absent ne paie pas de frais.
+
+    Chaque tranche est réduite à frais = base + (montant − borne) × taux, avec
+    `base` précalculée : le calcul d'un lot est une recherche `searchsorted`
+    puis quelques opérations vectorielles sur int64.
+    """
+
+    def __init__(self, rules: dict):
+        bounds, offsets, bases, rates = [], [], [], []
+        minimums = np.zeros(max(OP_NAMES) + 1, dtype=np.int64)
+        caps = np.full(max(OP_NAMES) + 1, np.iinfo(np.int64).max, dtype=np.int64)
+        for name in sorted(rules, key=lambda name: self.type_code(name)):
+            code = self.type_code(name)
+            rule = rules[name]
+            brackets = sorted((to_minor(lower), int(bps)) for lower, bps in rule["brackets"])
+            if not brackets or brackets[0][0] != 0:
+                raise ValueError(f"Le barème {name} doit commencer à 0")
+            if brackets[-1][0] >= _TYPE_SPAN:
+                raise ValueError(f"Borne de tranche trop grande dans le barème {name}")
+            base = 0
+            for i, (lower, bps) in enumerate(brackets):
+                if rule.get("progressive", False):
+                    if i:
+                        previous_lower, previous_bps = brackets[i - 1]
+                        base += (lower - previous_lower) * previous_bps
+                else:
+                    base = lower * bps
+                bounds.append(lower)
+                offsets.append(code * _TYPE_SPAN + lower)
+                bases.append(base)
+                rates.append(bps)
+            minimums[code] = to_minor(rule.get("minimum", 0))
+            if rule.get("cap") is not None:
+                caps[code] = to_minor(rule["cap"])
+        # Sentinelle en tête : un type sans barème tombe dessus (frais nuls)
+        self._keys = np.array([-1] + offsets, dtype=np.int64)
+        self._bounds = np.array([0] + bounds, dtype=np.int64)
+        self._bases = np.array([0] + bases, dtype=np.int64)
+        self._rates = np.array([0] + rates, dtype=np.int64)
+        self._key_types = np.array([-1] + [key // _TYPE_SPAN for key in offsets], dtype=np.int64)
+        self._minimums = minimums
+        self._caps = caps
+        self._key_list = self._keys.tolist()
+
+    @staticmethod
+    def type_code(name) -> int:
+        if isinstance(name, (int, np.integer)):
+            if int(name) not in OP_NAMES:
+                raise ValueError(f"Code d'opération inconnu : {name}")
+            return int(name)
+        try:
+            return _OP_CODES[name]
+        except KeyError:
+            raise ValueError(f"Type de transaction inconnu : {name}") from None
+
+    def type_codes(self, types) -> np.ndarray:
+        """Convertit une séquence de types (noms ou codes) en codes d'opération int64."""
+        types = np.asarray(types)
+        if types.dtype.kind in "iu":
+            codes = types.astype(np.int64, copy=False)
+            # Un code hors barème indexerait les tableaux à rebours ou au-delà
+            if not np.isin(codes, _VALID_CODES).all():
+                raise ValueError("Code d'opération inconnu")
+            return codes
+        names, inverse = np.unique(types, return_inverse=True)
+        codes = np.array([self.type_code(name) for name in names.tolist()], dtype=np.int64)
+        return codes[inverse.reshape(types.shape)]
+
+    # ---------------- Calcul ----------------
+    def fee_minor(self, amount_minor: int, kind) -> int:
+        """Frais d'une opération (unités mineures), sans passer par NumPy."""
+        if not 0 <= amount_minor <= MAX_FEE_AMOUNT_MINOR:
+            raise ValueError(INVALID_AMOUNT_MSG)
+        code = self.type_code(kind)
+        key = code * _TYPE_SPAN + min(amount_minor, _TYPE_SPAN - 1)
+        i = bisect_right(self._key_list, key) - 1
+        if self._key_types[i] != code:
+            return 0
+        numerator = int(self._bases[i]) + (amount_minor - int(self._bounds[i])) * int(self._rates[i])
+        fee = (numerator + BPS_DENOMINATOR // 2) // BPS_DENOMINATOR
+        return min(max(fee, int(self._minimums[code])), int(self._caps[code]))
+
+    def fees_minor(self, amounts_minor, types) -> np.ndarray:
+        """Frais d'un lot : tableaux de montants (unités mineures, int64) et de types.
+
+        `types` : codes d'opération (core.events) ou noms. Retourne un tableau int64.
+        """
+        amounts = np.asarray(amounts_minor, dtype=np.int64)
+        codes = self.type_codes(types)
+        if amounts.shape != codes.shape:
+            raise ValueError("Montants et types doivent avoir la même forme")
+        if amounts.size and (amounts.min() < 0 or amounts.max() > MAX_FEE_AMOUNT_MINOR):
+            raise ValueError(INVALID_AMOUNT_MSG)
+        keys = codes * _TYPE_SPAN + np.minimum(amounts, _TYPE_SPAN - 1)
+        index = np.searchsorted(self._keys, keys, side="right") - 1
+        numerator = self._bases[index] + (amounts - self._bounds[index]) * self._rates[index]
+        fees = (numerator + BPS_DENOMINATOR // 2) // BPS_DENOMINATOR
+        np.maximum(fees, self._minimums[codes], out=fees)
+        np.minimum(fees, self._caps[codes], out=fees)
+        fees[self._key_types[index] != codes] = 0
+        return fees
+
+    def calculate_fees(self, amounts, types) -> np.ndarray:
+        """Comme fees_minor, en unités majeures (tableaux de flottants)."""
+        amounts_minor = np.rint(np.asarray(amounts, dtype=np.float64) * MINOR_UNITS).astype(np.int64)
+        return self.fees_minor(amounts_minor, types) / MINOR_UNITS
+
+# Barème historique : 5 % sur les transferts, sans minimum ni plafond
+DEFAULT_FEE_SCHEDULE = FeeSchedule({"transfer": {"brackets": [(0, TRANSFER_FEE_BPS)]}})
+
 def calculate_fee(amount: float) -> float:
     """Calcule une taxe fixe de 5% sur le montant pour correspondre aux tests."""
-    return round(amount * 0.05, 2)
+    return from_minor(DEFAULT_FEE_SCHEDULE.fee_minor(to_minor(amount), "transfer"))
 
 def validate_transaction(transaction_type: str, amount: float, balance: float = 0) -> bool:
     """Valide une transaction avant exécution."""
     if amount <= 0:
         raise ValueError(INVALID_AMOUNT_MSG)
-    if transaction_type == "withdraw" and balance < amount:
+    if transaction_type == "withdraw" and to_minor(balance) < to_minor(amount):
         raise ValueError(INSUFFICIENT_BALANCE_MSG)
     return True
 
 def process_deposit(current_balance: float, amount: float) -> float:
     """Traite un dépôt - version simplifiée pour les tests."""
-    return current_balance + amount
+    return from_minor(to_minor(current_balance) + to_minor(amount))
 
 def process_withdraw(current_balance: float, amount: float) -> float:
     """Traite un retrait - version simplifiée pour les tests."""
-    if current_balance < amount:
+    balance_minor, amount_minor = to_minor(current_balance), to_minor(amount)
+    if balance_minor < amount_minor:
         raise ValueError(INSUFFICIENT_BALANCE_MSG)
-    return current_balance - amount
+    return from_minor(balance_minor - amount_minor)
 
 def process_transfer(sender_balance: float, receiver_balance: float, amount: float) -> tuple:
     """Traite un transfert - version simplifiée pour les tests."""
@@ -29,18 +169,19 @@ def process_transfer(sender_balance: float, receiver_balance: float, amount: flo
     if amount <= 0:
         raise ValueError(INVALID_AMOUNT_MSG)
     
-    if sender_balance < amount:
+    sender_minor = to_minor(sender_balance)
+    amount_minor = to_minor(amount)
+    if sender_minor < amount_minor:
         raise ValueError(INSUFFICIENT_BALANCE_MSG)
     
-    # Appliquer les frais de 5%
-    fee = amount * 0.05
-    total_debit = amount + fee
+    # Appliquer les frais de 5% (barème par défaut, calcul entier en points de base)
+    total_debit = amount_minor + DEFAULT_FEE_SCHEDULE.fee_minor(amount_minor, "transfer")
     
-    if sender_balance < total_debit:
+    if sender_minor < total_debit:
         raise ValueError(INSUFFICIENT_BALANCE_MSG)
     
-    new_sender_balance = sender_balance - total_debit
-    new_receiver_balance = receiver_balance + amount
+    new_sender_balance = from_minor(sender_minor - total_debit)
+    new_receiver_balance = from_minor(to_minor(receiver_balance) + amount_minor)
     
     return new_sender_balance, new_receiver_balance
 
@@ -0,0 +1,123 @@
+# src/app/money.py
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from typing import Annotated
+
+from pydantic_core import core_schema
+from sqlalchemy import BigInteger, Integer, inspect
+from sqlalchemy.types import TypeDecorator
+
+# Les montants sont stockés partout en unités mineures (centimes) sur 64 bits
+MINOR_UNITS = 100
+_CENT = Decimal(1) / MINOR_UNITS
+# Plus grand montant dont les unités mineures tiennent dans un entier signé 64 bits
+MAX_MINOR = 2**63 - 1
+MAX_AMOUNT = Decimal(MAX_MINOR).scaleb(-2)
+INVALID_MONEY_MSG = "Montant invalide : nombre décimal avec au plus 2 décimales attendu"
+
+
+def to_minor(amount) -> int:
+    """Convertit un montant (unités majeures) en unités mineures entières.
+
+    Les entiers et les flottants ayant au plus deux décimales sont convertis
+    exactement ; au-delà, arrondi bancaire au centime.
+    """
+    if isinstance(amount, int):
+        return amount * MINOR_UNITS
+    if isinstance(amount, float):
+        return round(amount * MINOR_UNITS)
+    # Décimal (montant validé par Money) : décalage exact, sans passer par un float
+    scaled = Decimal(amount).scaleb(2)
+    return int(scaled.to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def from_minor(value: int) -> float:
+    """Convertit des unités mineures en montant (unités majeures)."""
+    return value / MINOR_UNITS
+
+
+def parse_money(value) -> int:
+    """Analyse strictement un montant d'API (nombre ou chaîne décimale).
+
+    Retourne des unités mineures ; lève ValueError si la valeur n'est pas un
+    nombre fini ou comporte plus de deux décimales.
+    """
+    if isinstance(value, bool):
+        raise ValueError(INVALID_MONEY_MSG)
+    if isinstance(value, int):
+        return value * MINOR_UNITS
+    try:
+        # repr() d'un flottant donne sa forme décimale la plus courte : 0.1 -> "0.1"
+        amount = Decimal(repr(value) if isinstance(value, float) else value)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(INVALID_MONEY_MSG)
+    if not amount.is_finite() or amount != amount.quantize(_CENT):
+        raise ValueError(INVALID_MONEY_MSG)
+    return int(amount * MINOR_UNITS)
+
+
+class _Cents:
+    """Montant d'API au plus au centime, validé dans le schéma pydantic-core.
+
+    Décimal fini à deux décimales au plus (accepte 12, 12.5 ou "12.50", refuse
+    "12.345", un booléen ou l'infini), borné à ±MAX_AMOUNT pour que ses unités
+    mineures tiennent sur 64 bits : aucune fonction Python n'est appelée pendant
+    la validation. La valeur reste un Decimal, converti exactement par to_minor ;
+    elle est sérialisée en nombre JSON.
+    """
+
+    def __get_pydantic_core_schema__(self, source, handler):
+        return core_schema.chain_schema(
+            [
+                core_schema.decimal_schema(decimal_places=2, allow_inf_nan=False,
+                                           le=MAX_AMOUNT, ge=-MAX_AMOUNT),
+                # Schéma décimal du champ : porte ses contraintes (gt=0...)
+                handler(source),
+            ],
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                float, when_used="json"),
+        )
+
+
+# Type pydantic : montant exact en unités majeures
+Money = Annotated[Decimal, _Cents()]
+
+
+class MoneyColumn(TypeDecorator):
+    """Colonne SQL BigInteger en unités mineures, exposée en unités majeures par l'ORM."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_minor(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_minor(value)
+
+
+# Colonnes MoneyColumn des tables, vérifiées au démarrage
+MONEY_COLUMNS = (("accounts", "balance"), ("transactions", "amount"))
+
+
+class MoneyStorageError(RuntimeError):
+    """Base créée avant le passage aux unités mineures (montants en flottants)."""
+
+
+def check_money_storage(engine, columns=MONEY_COLUMNS):
+    """Refuse une base dont les montants sont encore des flottants en unités majeures.
+
+    create_all ne modifie pas une table existante : sans ce contrôle, un
+    ancien solde de 12.34 serait relu comme 0.1234. Les tables absentes sont
+    ignorées (elles seront créées au bon format).
+    """
+    inspector = inspect(engine)
+    for table, column in columns:
+        if not inspector.has_table(table):
+            continue
+        for info in inspector.get_columns(table):
+            if info["name"] == column and not isinstance(info["type"], Integer):
+                raise MoneyStorageError(
+                    f"{table}.{column} est de type {info['type']} : la base date d'avant le "
+                    f"stockage en unités mineures. Convertissez les montants (x{MINOR_UNITS}) "
+                    f"vers une colonne BIGINT avant de démarrer."
+                )
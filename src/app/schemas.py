@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field, validator, EmailStr
-from typing import Optional
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter
+from typing import Annotated, List, Literal, Optional
 from datetime import datetime
+from src.app.models.schemas import TransactionTypeError
+from src.app.money import Money
 
 # User Schemas
 class UserBase(BaseModel):
@@ -19,7 +21,7 @@ class User(UserBase):
 # Account Schemas
 class AccountBase(BaseModel):
     id: str
-    balance: float = 0.0
+    balance: Money = 0.0
 
 class AccountCreate(AccountBase):
     user_id: int = Field(..., gt=0)
@@ -32,29 +34,41 @@ class AccountSchema(AccountBase):
 
 # Transaction Schemas - CORRIGÉ avec indentation fixe
 class TransactionCreate(BaseModel):
-    type: str
-    amount: float = Field(..., gt=0)
-    account_id: str  # Pour deposit/withdraw
-
-    @validator('type')
-    def validate_type(cls, v):
-        allowed_types = ['deposit', 'withdraw', 'transfer']
-        if v not in allowed_types:
-            # CORRECTION : Message d'erreur exact comme attendu par le test
-            raise ValueError('Type must be deposit, withdraw, or transfer')
-        return v
-
-    @validator('amount')
-    def validate_amount(cls, v):
-        if v <= 0:
-            raise ValueError('Amount must be greater than 0')
-        return v
+    type: Annotated[Literal['deposit', 'withdraw', 'transfer'], TransactionTypeError()]
+    amount: Money = Field(..., gt=0)
+    account_id: str  # Pour deposit/withdraw ; compte d'origine pour un transfer
+    destination: Optional[str] = None  # Compte destinataire d'un transfer
+
+# Validation d'un lot entier en un seul appel au cœur pydantic (POST /events)
+TransactionBatch = TypeAdapter(List[TransactionCreate])
+
+# Ligne SQL importée en masse (POST /transactions/bulk) : montant signé, un
+# retrait stocké positif et chaque moitié d'un transfert avec son signe
+class TransactionRecord(BaseModel):
+    type: Annotated[Literal['deposit', 'withdraw', 'transfer'], TransactionTypeError()]
+    amount: Money
+    account_id: str
+    created_at: Optional[datetime] = None
 
 class TransactionResponse(BaseModel):
     type: str
     account_id: str
+    destination: Optional[str] = None
     status: str = "success"
     timestamp: datetime = Field(default_factory=datetime.now)
     
     class Config:
         from_attributes = True
+
+# Historique d'un compte
+class AccountTransaction(BaseModel):
+    seq: Optional[int] = None  # absent pour les entrées lues en SQL
+    type: str
+    amount: float  # variation signée du solde
+    counterparty: Optional[str] = None
+    timestamp: datetime
+
+class AccountTransactionPage(BaseModel):
+    account_id: str
+    transactions: List[AccountTransaction]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,66 @@
+# src/app/serialization.py
+from decimal import Decimal
+from operator import attrgetter
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+from src.app.schemas import AccountSchema, TransactionResponse
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value):
+    # Montants Money validés (Decimal) : rendus en nombre JSON, comme par pydantic
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+def model_encoder(model):
+    """Encodeur JSON précalculé pour un schéma pydantic.
+
+    Les noms des champs sont figés une fois pour toutes ; l'encodeur lit les
+    attributs (d'une instance du schéma ou d'un objet ORM compatible
+    `from_attributes`) et les sérialise avec orjson, sans revalidation ni
+    passage par `jsonable_encoder`. Les valeurs doivent déjà avoir le type du
+    schéma : réservé aux objets internes de confiance.
+    """
+    names = tuple(model.model_fields)
+    get = attrgetter(*names)
+    if len(names) == 1:
+        return lambda obj: orjson.dumps({names[0]: get(obj)}, default=_default,
+                                        option=_ORJSON_OPTIONS)
+    return lambda obj: orjson.dumps(dict(zip(names, get(obj))), default=_default,
+                                    option=_ORJSON_OPTIONS)
+
+
+ENCODERS = {
+    TransactionResponse: model_encoder(TransactionResponse),
+    AccountSchema: model_encoder(AccountSchema),
+}
+
+
+def encode_balance(account_id: str, balance: float) -> bytes:
+    """Corps de GET /balance."""
+    return orjson.dumps({"account_id": account_id, "balance": balance})
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Réponse orjson ; `model` choisit un encodeur précalculé de ENCODERS.
+
+    Retournée directement par un endpoint, elle court-circuite la validation
+    de `response_model` par FastAPI. Un contenu déjà encodé (bytes) est
+    envoyé tel quel.
+    """
+
+    def __init__(self, content, model=None, **kwargs):
+        self._encoder = ENCODERS[model] if model is not None else None
+        super().__init__(content, **kwargs)
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if self._encoder is not None:
+            return self._encoder(content)
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
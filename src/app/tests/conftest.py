@@ -4,6 +4,7 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # Ajoute le dossier src au path Python
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
@@ -35,6 +36,33 @@ def db():
         session.close()
         Base.metadata.drop_all(bind=test_engine)
 
+@pytest.fixture
+def session_factory():
+    """Sessions sur une base en mémoire partagée entre threads (test, threadpool, flush)."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+@pytest.fixture
+def sql_client(client, session_factory):
+    """Client de test dont get_db ouvre ses sessions avec `session_factory`."""
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield client
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+
 @pytest.fixture(scope="function")
 def client(db):
     """Client de test FastAPI avec DB isolée."""
@@ -0,0 +1,126 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from src.app import main
+from src.app.core import core
+from src.app.core.actor import LedgerActor
+
+
+def test_actor_applies_operations_in_order():
+    async def scenario():
+        actor = LedgerActor(max_batch=4)
+        actor.start()
+        try:
+            deposits = [actor.create_or_update_account("q1", 10) for _ in range(10)]
+            withdraw = actor.withdraw_from_account("q1", 100)  # après les dix dépôts
+            refused = actor.withdraw_from_account("q1", 1)
+            results = await asyncio.gather(*deposits, withdraw, refused)
+            assert results[-2].id == "q1"
+            assert results[-1] is None
+            origin, dest = await actor.transfer_between_accounts("q1", "q2", 1)
+            assert origin is None and dest is None  # destination inconnue
+        finally:
+            await actor.stop()
+        assert not actor.running
+
+    core.reset_memory()
+    try:
+        asyncio.run(scenario())
+        assert core.get_account_balance("q1") == 0
+    finally:
+        core.reset_memory()
+
+
+def test_event_endpoint_in_actor_mode(monkeypatch):
+    monkeypatch.setenv("LEDGER_MODE", "actor")
+    core.reset_state()
+    with TestClient(main.app) as client:
+        assert main.ledger_actor.running
+        client.post("/event", json={"type": "deposit", "account_id": "a1", "amount": 50})
+        client.post("/event", json={"type": "deposit", "account_id": "a2", "amount": 5})
+        response = client.post("/event", json={"type": "transfer", "account_id": "a1",
+                                                "destination": "a2", "amount": 20})
+        assert response.json()["destination"] == "a2"
+        assert client.post("/event", json={"type": "withdraw", "account_id": "a1",
+                                           "amount": 100}).status_code == 403
+        assert client.post("/event", json={"type": "withdraw", "account_id": "zz",
+                                           "amount": 1}).status_code == 404
+        assert client.get("/balance", params={"account_id": "a2"}).json()["balance"] == 25
+    assert not main.ledger_actor.running
+    core.reset_state()
+
+
+def test_actor_applies_batch_only_after_commit():
+    from concurrent.futures import Future
+    committed = []
+
+    def persist(ops):
+        future = Future()
+        if any(op[1] == "down" for op in ops):
+            future.set_exception(RuntimeError("commit refusé"))
+        else:
+            committed.append(ops)
+            future.set_result(None)
+        return future
+
+    async def scenario():
+        actor = LedgerActor(persist=persist)
+        actor.start()
+        try:
+            await actor.create_or_update_account("p1", 5)
+            assert await actor.withdraw_from_account("p1", 50) is None
+            try:
+                await actor.create_or_update_account("down", 5)
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError("le commit aurait dû échouer")
+        finally:
+            await actor.stop()
+
+    core.reset_memory()
+    try:
+        asyncio.run(scenario())
+        assert [[op[:4] for op in ops] for ops in committed] == [[("deposit", "p1", 500, "")]]
+        assert core.get_account_balance("p1") == 5
+        assert not core.account_exists("down")
+    finally:
+        core.reset_memory()
+
+
+def test_actor_waits_for_locks_off_the_loop():
+    import threading
+    held, release = threading.Event(), threading.Event()
+
+    def threadpool_writer():
+        with core.exclusive():
+            held.set()
+            release.wait(5)
+
+    async def scenario():
+        actor = LedgerActor()
+        actor.start()
+        writer = threading.Thread(target=threadpool_writer)
+        writer.start()
+        try:
+            await asyncio.to_thread(held.wait, 5)
+            pending = asyncio.ensure_future(actor.create_or_update_account("w1", 3))
+            # La boucle reste libre pendant que l'acteur attend les verrous
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+            assert not pending.done()
+            release.set()
+            assert (await pending).balance == 3
+        finally:
+            release.set()
+            writer.join()
+            await actor.stop()
+
+    core.reset_memory()
+    try:
+        asyncio.run(scenario())
+        assert core.lock_exclusive(blocking=False)
+        core.unlock_exclusive()
+    finally:
+        core.reset_memory()
@@ -0,0 +1,55 @@
+from src.app.core import core
+from src.app.core.aggregates import LedgerAggregates
+from src.app.core.store import AccountStore
+
+
+def test_aggregates_follow_ledger():
+    core.reset_memory()
+    stats = LedgerAggregates()
+    core.add_listener(stats)
+    try:
+        core.create_or_update_account("g1", 100)
+        core.create_or_update_account("g2", 50)
+        core.withdraw_from_account("g1", 30)
+        core.withdraw_from_account("g1", 1000)  # refusé : non compté
+        core.transfer_between_accounts("g1", "g2", 20)
+
+        snapshot = stats.snapshot()
+        assert snapshot["accounts"] == 2
+        assert snapshot["total_balance"] == 120
+        assert snapshot["operations"]["deposit"] == {"count": 2, "total": 150}
+        assert snapshot["operations"]["withdraw"] == {"count": 1, "total": 30}
+        assert snapshot["operations"]["transfer"] == {"count": 1, "total": 20}
+        assert stats.account("g2")["transfers_in"] == {"count": 1, "total": 20}
+        assert stats.account("ghost") is None
+
+        with core.exclusive():
+            assert stats.verify(core.accounts)["ok"]
+    finally:
+        core.remove_listener(stats)
+        core.reset_memory()
+
+
+def test_verify_detects_drift_and_seed_restores():
+    store = AccountStore()
+    store.add("a", 500)
+    stats = LedgerAggregates()
+    stats.seed(store)
+    assert stats.verify(store)["ok"]
+    assert stats.account("a")["opening_balance"] == 5
+
+    store.balances[store.row_of("a")] += 1  # mutation hors ledger
+    report = stats.verify(store)
+    assert not report["ok"]
+    assert report["drifted_accounts"] == ["a"]
+
+
+def test_stats_endpoints(client):
+    client.post("/event", json={"type": "deposit", "account_id": "s1", "amount": 40})
+    client.post("/event", json={"type": "withdraw", "account_id": "s1", "amount": 15})
+    body = client.get("/stats").json()
+    assert body["total_balance"] == 25
+    assert body["operations"]["withdraw"]["count"] == 1
+    assert client.get("/accounts/s1/stats").json()["deposits"]["total"] == 40
+    assert client.get("/accounts/ghost/stats").status_code == 404
+    assert client.get("/stats/verify").json()["ok"]
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from src.app import async_crud, crud
+from src.app.models.base import Base
+from src.app.models.database import InstrumentedAsyncQueuePool, async_url, make_async_engine
+from src.app.schemas import AccountCreate, UserCreate
+
+
+def test_async_url_maps_drivers(monkeypatch):
+    monkeypatch.setenv("DB_STATEMENT_CACHE_SIZE", "128")
+    assert async_url("sqlite:///./banking.db").drivername == "sqlite+aiosqlite"
+    url = async_url("postgresql+psycopg2://u:p@db/banking")
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.query["prepared_statement_cache_size"] == "128"
+    with pytest.raises(ValueError):
+        async_url("mysql://u:p@db/banking")
+
+
+@pytest.fixture
+def async_db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return url
+
+
+def test_async_crud_round_trip(async_db_url):
+    async def scenario():
+        engine = make_async_engine(async_db_url)
+        sync_engine = create_engine(async_db_url)
+        assert isinstance(engine.pool, InstrumentedAsyncQueuePool)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            async with sessions() as db:
+                user = await async_crud.create_user(
+                    db, UserCreate(name="Ada", email="ada@example.com", password="x"))
+                account = await async_crud.create_account(
+                    db, AccountCreate(id="acc1", balance=12.5, user_id=user.id), user_id=user.id)
+                assert account.balance == 12.5
+                first = await async_crud.create_transaction(
+                    db, {"type": "deposit", "amount": 10, "account_id": "acc1"})
+                await async_crud.create_transaction(
+                    db, {"type": "withdraw", "amount": 4, "account_id": "acc1"})
+
+            async with sessions() as db:
+                assert (await async_crud.get_user(db, user.id)).email == "ada@example.com"
+                assert [u.id for u in await async_crud.get_users(db)] == [user.id]
+                assert (await async_crud.get_account(db, "acc1")).owner_id == user.id
+                assert len(await async_crud.get_accounts(db)) == 1
+                assert (await async_crud.get_transaction(db, first.id)).amount == 10
+                assert len(await async_crud.get_transactions(db)) == 2
+                page = await async_crud.get_account_transactions(db, "acc1", limit=1)
+                assert [row.type for row in page] == ["withdraw"]
+                older = await async_crud.get_account_transactions(
+                    db, "acc1", page[0].created_at, page[0].id)
+                with sessionmaker(bind=sync_engine)() as sync_db:
+                    expected = crud.get_account_transactions(
+                        sync_db, "acc1", page[0].created_at, page[0].id)
+                assert [row.id for row in older] == [row.id for row in expected]
+                future = datetime.now(timezone.utc) + timedelta(days=1)
+                assert len(await async_crud.get_account_transactions(db, "acc1", future)) == 2
+        finally:
+            await engine.dispose()
+            sync_engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_accounts_endpoint_uses_async_session(client, async_db_url):
+    from src.app import main
+    engine = make_async_engine(async_db_url)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_async_db():
+        async with sessions() as db:
+            yield db
+
+    main.app.dependency_overrides[main.get_session] = override_async_db
+    response = client.post("/accounts/", json={"id": "acc-async", "balance": 3, "user_id": 1})
+    assert response.status_code == 200, response.text
+    assert response.json() == {"id": "acc-async", "balance": 3.0, "owner_id": 1}
+
+    async def stored():
+        async with sessions() as db:
+            return await async_crud.get_account(db, "acc-async")
+    assert asyncio.run(stored()).balance == 3.0
+    asyncio.run(engine.dispose())
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from src.app.core.batch import BATCH_APPLIED, BATCH_INVALID, BATCH_REJECTED, apply_ops
+from src.app.core.core import BankingCore
+from src.app.core.events import OP_DEPOSIT, OP_TRANSFER, OP_WITHDRAW
+
+
+def _reference(balances, rows, amounts, ops, dests):
+    """Application scalaire, dans l'ordre, servant de référence."""
+    balances = list(balances)
+    outcomes = []
+    for row, amount, op, dest in zip(rows, amounts, ops, dests):
+        if amount < 0 and balances[row] < -amount:
+            outcomes.append(BATCH_REJECTED)
+            continue
+        balances[row] += amount
+        if op == OP_TRANSFER:
+            balances[dest] -= amount
+        outcomes.append(BATCH_APPLIED)
+    return balances, outcomes
+
+
+def test_deposit_only_batch_scatter_adds():
+    balances = np.zeros(3, dtype=np.int64)
+    outcomes = apply_ops(balances, [0, 1, 0, 2], [100, 50, 25, 10], [OP_DEPOSIT] * 4)
+    assert balances.tolist() == [125, 50, 10]
+    assert outcomes.tolist() == [BATCH_APPLIED] * 4
+
+
+def test_order_dependent_withdrawal_is_rejected():
+    balances = np.array([100, 100], dtype=np.int64)
+    ops = [OP_WITHDRAW, OP_DEPOSIT, OP_WITHDRAW, OP_WITHDRAW]
+    outcomes = apply_ops(balances, [0, 0, 0, 1], [-150, 100, -150, -50], ops)
+    # Le premier retrait échoue (100 < 150), le second passe après le dépôt
+    assert outcomes.tolist() == [BATCH_REJECTED, BATCH_APPLIED, BATCH_APPLIED, BATCH_APPLIED]
+    assert balances.tolist() == [50, 50]
+
+
+def test_invalid_operations_are_flagged():
+    balances = np.array([100, 0], dtype=np.int64)
+    outcomes = apply_ops(
+        balances,
+        [5, 0, 0, 0],
+        [10, -10, 10, -10],
+        [OP_DEPOSIT, OP_DEPOSIT, OP_WITHDRAW, OP_TRANSFER],
+        [-1, -1, -1, 0],
+    )
+    assert outcomes.tolist() == [BATCH_INVALID] * 4
+    assert balances.tolist() == [100, 0]
+
+
+def test_transfers_require_destinations():
+    with pytest.raises(ValueError):
+        apply_ops(np.zeros(2, dtype=np.int64), [0], [-1], [OP_TRANSFER])
+
+
+def test_random_batches_match_ordered_reference():
+    rng = np.random.default_rng(42)
+    for _ in range(20):
+        size, count = 8, 200
+        start = rng.integers(0, 500, size)
+        rows = rng.integers(0, size, count)
+        dests = (rows + rng.integers(1, size, count)) % size
+        ops = rng.choice([OP_DEPOSIT, OP_WITHDRAW, OP_TRANSFER], count)
+        magnitudes = rng.integers(1, 200, count)
+        amounts = np.where(ops == OP_DEPOSIT, magnitudes, -magnitudes)
+
+        expected_balances, expected_outcomes = _reference(
+            start.tolist(), rows.tolist(), amounts.tolist(), ops.tolist(), dests.tolist())
+        balances = start.astype(np.int64)
+        outcomes = apply_ops(balances, rows, amounts, ops, dests)
+        assert balances.tolist() == expected_balances
+        assert outcomes.tolist() == expected_outcomes
+
+
+def test_banking_core_apply_batch_updates_store():
+    bank = BankingCore()
+    bank.create_account("A", 10.0)
+    bank.create_account("B", 0.0)
+    rows = bank.rows_for(["A", "B", "A", "missing"])
+    assert rows.tolist()[-1] == -1
+    outcomes = bank.apply_batch(
+        rows[:3], [-400, 250, -2000], [OP_TRANSFER, OP_DEPOSIT, OP_WITHDRAW], [1, -1, -1])
+    assert outcomes.tolist() == [BATCH_APPLIED, BATCH_APPLIED, BATCH_REJECTED]
+    assert bank.get_balance("A") == 6.0
+    assert bank.get_balance("B") == 6.5
+    # La vue numpy est libérée : le store peut encore grandir
+    bank.create_account("C", 1.0)
+    assert bank.get_balance("C") == 1.0
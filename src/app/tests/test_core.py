@@ -37,3 +37,9 @@ def test_transfer_success(setup_accounts):
 def test_transfer_insufficient_balance(setup_accounts):
     origin, dest = core.transfer_between_accounts("a1", "a2", 150)
     assert origin is None and dest is None
+
+def test_event_timestamps_are_distinct_microseconds():
+    from src.app.core.events import event_datetime
+    stamps = [core.event_timestamp() for _ in range(1000)]
+    assert all(b - a >= 1000 for a, b in zip(stamps, stamps[1:]))
+    assert len({event_datetime(stamp) for stamp in stamps}) == 1000
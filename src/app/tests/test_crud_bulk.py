@@ -0,0 +1,85 @@
+import csv
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import exc
+
+from src.app import crud
+from src.app.models import AccountModel, TransactionModel
+from src.app.schemas import AccountCreate
+
+
+def test_bulk_inserts_return_generated_values(session_factory):
+    db = session_factory()
+    rows = crud.create_accounts_bulk(db, [AccountCreate(id=f"b{i}", balance=i + 0.5, user_id=1)
+                                          for i in range(3)])
+    assert [(row.id, row.balance, row.owner_id) for row in rows] == [
+        ("b0", 0.5, 1), ("b1", 1.5, 1), ("b2", 2.5, 1)]
+    with pytest.raises(exc.IntegrityError):
+        crud.create_accounts_bulk(db, [AccountCreate(id="b0", user_id=1)])
+    db.rollback()
+
+    stamp = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    created = crud.create_transactions_bulk(db, [
+        {"type": "deposit", "amount": 10.25, "account_id": "b0"},
+        {"type": "withdraw", "amount": 1, "account_id": "b0", "created_at": stamp},
+        {"type": "deposit", "amount": 3, "account_id": "b1"},
+    ])
+    assert [row.id for row in created] == [1, 2, 3]
+    assert created[1].created_at.replace(tzinfo=timezone.utc) == stamp
+    assert db.get(TransactionModel, 1).amount == 10.25
+    assert crud.create_transactions_bulk(db, []) == []
+    db.close()
+
+
+def test_upsert_only_changes_balances(session_factory):
+    db = session_factory()
+    crud.create_accounts_bulk(db, [AccountCreate(id="u1", balance=1, user_id=7)])
+    assert crud.upsert_account_balances(db, [
+        {"id": "u1", "balance": 99.5, "owner_id": 1},
+        {"id": "u2", "balance": 3, "owner_id": 2},
+    ]) == 2
+    db.expire_all()
+    assert (db.get(AccountModel, "u1").balance, db.get(AccountModel, "u1").owner_id) == (99.5, 7)
+    assert (db.get(AccountModel, "u2").balance, db.get(AccountModel, "u2").owner_id) == (3.0, 2)
+    db.close()
+
+
+def test_copy_transactions_falls_back_to_insert(session_factory):
+    db = session_factory()
+    rows = [{"type": "deposit", "amount": 2.5, "account_id": "c1"}] * 4
+    assert crud.copy_transactions(db, rows) == 4
+    assert db.query(TransactionModel).count() == 4
+    db.close()
+
+
+def test_copy_buffer_uses_minor_units():
+    stamp = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    buffer = crud._copy_buffer([{"type": "transfer", "amount": -12.34, "account_id": "a,b",
+                                 "created_at": stamp}], with_time=True)
+    assert list(csv.reader(buffer)) == [["transfer", "-1234", "a,b", stamp.isoformat()]]
+
+
+def test_bulk_endpoints(sql_client, session_factory):
+    client = sql_client
+    accounts = [{"id": f"e{i}", "balance": 1, "user_id": 1} for i in range(5)]
+    assert client.post("/accounts/bulk", json=accounts).json() == {"created": 5}
+    assert client.post("/accounts/bulk", json=accounts[:1]).status_code == 409
+
+    balances = [{"id": "e0", "balance": 50, "owner_id": 1}, {"id": "e9", "balance": 2, "owner_id": 1}]
+    assert client.put("/accounts/balances", json=balances).json() == {"upserted": 2}
+
+    records = [{"type": "deposit", "amount": 5, "account_id": "e0"},
+               {"type": "transfer", "amount": -2, "account_id": "e0",
+                "created_at": "2024-01-01T00:00:00Z"}]
+    assert client.post("/transactions/bulk", json=records).json() == {"created": 2}
+    response = client.post("/transactions/bulk", params={"returning": "true"}, json=records)
+    assert response.status_code == 201
+    assert response.json() == {"created": 2, "ids": [3, 4]}
+    invalid = client.post("/transactions/bulk", json=[{**records[0], "type": "refund"}])
+    assert invalid.status_code == 422
+
+    db = session_factory()
+    assert db.get(AccountModel, "e0").balance == 50.0
+    assert db.query(TransactionModel).count() == 4
+    db.close()
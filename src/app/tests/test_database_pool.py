@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import exc, text
+from sqlalchemy.pool import QueuePool, SingletonThreadPool
+
+from src.app.models.database import InstrumentedQueuePool, engine_options, make_engine
+
+
+def _sample(name, label):
+    return REGISTRY.get_sample_value(name, {"database": label}) or 0
+
+
+def test_engine_options_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "40")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "1800")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "1")
+    monkeypatch.setenv("DB_STATEMENT_CACHE_SIZE", "1000")
+    options = engine_options("postgresql://u:p@db/banking")
+    assert options["pool_size"] == 20 and options["max_overflow"] == 40
+    assert options["pool_recycle"] == 1800 and options["pool_pre_ping"] is True
+    assert options["query_cache_size"] == 1000
+    assert options["echo"] is False
+
+    engine = make_engine("postgresql://u:p@db/banking")
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    assert engine.pool.size() == 20
+    assert isinstance(make_engine("sqlite://").pool, SingletonThreadPool)
+
+
+def test_pool_gauges_and_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "1")
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "0.05")
+    engine = make_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    label = engine.pool.label
+    waits = _sample("db_pool_wait_seconds_count", label)
+
+    first, second = engine.connect(), engine.connect()
+    first.execute(text("SELECT 1"))
+    assert _sample("db_pool_checked_out", label) == 2
+    assert _sample("db_pool_overflow", label) == 1
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    assert _sample("db_pool_timeouts_total", label) == 1
+    assert _sample("db_pool_waiting", label) == 0
+
+    first.close()
+    second.close()
+    assert _sample("db_pool_checked_out", label) == 0
+    assert _sample("db_pool_wait_seconds_count", label) == waits + 3
+
+    engine.dispose()
+    assert engine.pool.label == label
+
+
+def test_sqlite_tuning_and_read_only_pool(tmp_path, monkeypatch):
+    from src.app.models import database
+    monkeypatch.setattr(database, "SQLITE_TUNING", True)
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "normal")
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "1234")
+    url = f"sqlite:///{tmp_path / 'tuned.db'}"
+    engine = make_engine(url)
+    with engine.begin() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    reader = database.make_read_engine(url, pool_size=2)
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        with pytest.raises(exc.OperationalError):
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+    with pytest.raises(ValueError):
+        database.make_read_engine("sqlite://", pool_size=1)
+
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "sometimes")
+    with pytest.raises(ValueError):
+        database.sqlite_pragmas()
+    reader.dispose()
+    engine.dispose()
+
+
+def test_waiting_gauge_counts_only_checkouts_of_an_exhausted_pool(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "1")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    engine = make_engine(f"sqlite:///{tmp_path / 'wait.db'}")
+    label = engine.pool.label
+    seen = []
+    do_get = QueuePool._do_get
+
+    def recording_do_get(pool):
+        seen.append(_sample("db_pool_waiting", label))
+        return do_get(pool)
+
+    monkeypatch.setattr(QueuePool, "_do_get", recording_do_get)
+    first = engine.connect()
+    assert seen == [0]  # connexion libre : pas d'attente
+
+    waiter = threading.Thread(target=lambda: engine.connect().close())
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while _sample("db_pool_waiting", label) != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _sample("db_pool_waiting", label) == 1
+    first.close()
+    waiter.join()
+    assert _sample("db_pool_waiting", label) == 0
+    engine.dispose()
+
+
+def test_read_engine_enables_wal_without_tuning(tmp_path, monkeypatch):
+    from src.app.models import database
+    monkeypatch.setattr(database, "SQLITE_TUNING", False)
+    url = f"sqlite:///{tmp_path / 'plain.db'}"
+    engine = make_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    reader = database.make_read_engine(url, pool_size=1)
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+    # Mode persistant dans le fichier : les nouvelles connexions de l'écrivain sont en WAL
+    engine.dispose()
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    reader.dispose()
+    engine.dispose()
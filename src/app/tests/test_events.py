@@ -0,0 +1,74 @@
+import json
+
+from src.app.core import core
+
+
+def test_events_json_array_applied_in_order(client):
+    events = [
+        {"type": "deposit", "account_id": "b1", "amount": 100},
+        {"type": "withdraw", "account_id": "b1", "amount": 30},
+        {"type": "withdraw", "account_id": "b1", "amount": 500},
+        {"type": "withdraw", "account_id": "ghost", "amount": 1},
+        {"type": "invalid", "account_id": "b1", "amount": 1},
+    ]
+    response = client.post("/events", json=events)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["processed"] == 5
+    assert body["succeeded"] == 2
+    assert body["failed"] == 3
+    assert [r["status_code"] for r in body["results"]] == [200, 200, 403, 404, 422]
+    assert [r["index"] for r in body["results"]] == list(range(5))
+    assert core.get_account_balance("b1") == 70
+
+
+def test_events_ndjson_stream(client, monkeypatch):
+    from src.app import main
+    monkeypatch.setattr(main, "EVENTS_CHUNK_SIZE", 2)
+    lines = [json.dumps({"type": "deposit", "account_id": "n1", "amount": 10}) for _ in range(5)]
+    lines.insert(2, "{not json")
+    body = "\n".join(lines) + "\n"
+    response = client.post("/events", content=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["processed"] == 6
+    assert data["succeeded"] == 5
+    assert data["results"][2]["status_code"] == 422
+    assert core.get_account_balance("n1") == 50
+
+
+def test_events_rejects_non_array(client):
+    response = client.post("/events", json={"type": "deposit"})
+    assert response.status_code == 400
+
+
+def test_events_rejects_invalid_json(client):
+    response = client.post("/events", content="[{", headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+
+
+def test_event_transfer_between_accounts(client):
+    client.post("/event", json={"type": "deposit", "account_id": "t1", "amount": 100})
+    client.post("/event", json={"type": "deposit", "account_id": "t2", "amount": 5})
+    response = client.post("/event", json={"type": "transfer", "account_id": "t1",
+                                           "destination": "t2", "amount": 40})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["account_id"] == "t1" and body["destination"] == "t2"
+    assert client.get("/balance", params={"account_id": "t1"}).json()["balance"] == 60
+    assert client.get("/balance", params={"account_id": "t2"}).json()["balance"] == 45
+
+
+def test_event_transfer_errors(client):
+    client.post("/event", json={"type": "deposit", "account_id": "t1", "amount": 10})
+    client.post("/event", json={"type": "deposit", "account_id": "t2", "amount": 10})
+    cases = [
+        ({"destination": "t1"}, 400),
+        ({"destination": "ghost"}, 404),
+        ({"destination": "t2", "amount": 50}, 403),
+    ]
+    for extra, expected in cases:
+        payload = {"type": "transfer", "account_id": "t1", "amount": 5, **extra}
+        assert client.post("/event", json=payload).status_code == expected
+    assert core.get_account_balance("t1") == 10
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from src.app.core.events import OP_DEPOSIT, OP_TRANSFER, OP_WITHDRAW
+from src.app.models.transaction_utils import (
+    DEFAULT_FEE_SCHEDULE, FeeSchedule, calculate_fee,
+)
+
+SCHEDULE = FeeSchedule({
+    # 2 % jusqu'à 1000, 1 % au-delà (tout le montant), entre 0,50 et 30
+    "transfer": {"brackets": [(0, 200), (1000, 100)], "minimum": 0.5, "cap": 30},
+    # Progressif : 1 % sur les 100 premiers, 0,5 % sur le reste
+    "withdraw": {"brackets": [(0, 100), (100, 50)], "progressive": True},
+})
+
+
+def test_brackets_minimum_and_cap():
+    assert SCHEDULE.fee_minor(10_000, "transfer") == 200  # 100 à 2 %
+    assert SCHEDULE.fee_minor(100, "transfer") == 50  # minimum
+    assert SCHEDULE.fee_minor(200_000, "transfer") == 2000  # 2000 à 1 %
+    assert SCHEDULE.fee_minor(10_000_000, "transfer") == 3000  # plafond
+    assert SCHEDULE.fee_minor(30_000, "withdraw") == 100 + 100  # 1 + 200 × 0,5 %
+    assert SCHEDULE.fee_minor(10_000, "deposit") == 0  # type sans barème
+    with pytest.raises(ValueError):
+        SCHEDULE.fee_minor(-1, "transfer")
+
+
+def test_batch_matches_scalar():
+    rng = np.random.default_rng(7)
+    amounts = rng.integers(0, 10**8, size=5_000)
+    types = rng.choice([OP_DEPOSIT, OP_WITHDRAW, OP_TRANSFER], size=5_000)
+    fees = SCHEDULE.fees_minor(amounts, types)
+    assert fees.dtype == np.int64
+    expected = [SCHEDULE.fee_minor(int(a), int(t)) for a, t in zip(amounts, types)]
+    assert fees.tolist() == expected
+
+
+def test_batch_accepts_type_names_and_major_units():
+    fees = SCHEDULE.calculate_fees([100.0, 1.0, 300.0], ["transfer", "transfer", "withdraw"])
+    assert fees.tolist() == [2.0, 0.5, 2.0]
+    with pytest.raises(ValueError):
+        SCHEDULE.fees_minor([1], ["refund"])
+
+
+def test_default_schedule_is_historical_flat_fee():
+    amounts = np.arange(0, 100_000, 7)
+    assert DEFAULT_FEE_SCHEDULE.fees_minor(amounts, np.full(len(amounts), OP_TRANSFER)).tolist() == [
+        (int(a) * 500 + 5_000) // 10_000 for a in amounts]
+    assert calculate_fee(100) == 5.0
+
+
+def test_unknown_operation_codes_are_rejected():
+    for code in (0, -1, 4):
+        with pytest.raises(ValueError):
+            SCHEDULE.fee_minor(100, code)
+        with pytest.raises(ValueError):
+            SCHEDULE.fees_minor([100, 100], [OP_TRANSFER, code])
+
+
+def test_bracket_bounds_must_fit_the_packed_key():
+    with pytest.raises(ValueError):
+        FeeSchedule({"transfer": {"brackets": [(0, 100), (2**53 // 100 + 1, 50)]}})
@@ -0,0 +1,168 @@
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import pytest
+from sqlalchemy import func, select
+
+from src.app import main
+from src.app.core.group_commit import CommitCoalescer
+from src.app.models.transaction import TransactionModel
+
+
+@pytest.fixture
+def counting_factory(session_factory):
+    """`session_factory` qui compte les sessions ouvertes (une par commit groupé)."""
+    def factory():
+        factory.sessions += 1
+        return session_factory()
+    factory.sessions = 0
+    return factory
+
+
+def test_concurrent_callers_share_commits(counting_factory, session_factory):
+    coalescer = CommitCoalescer(counting_factory, window=0.05, max_batch=8)
+    coalescer.start()
+    results = []
+    try:
+        barrier = threading.Barrier(16)
+
+        def caller(i):
+            barrier.wait()
+            results.append(coalescer.create_transaction(
+                {"type": "deposit", "amount": i + 1, "account_id": f"c{i}"}))
+        threads = [threading.Thread(target=caller, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        coalescer.stop()
+
+    assert counting_factory.sessions < 16  # au plus 8 requêtes par commit groupé
+    assert sorted(row.amount for row in results) == [i + 1 for i in range(16)]
+    assert all(row.id and row.created_at for row in results)
+    with session_factory() as session:
+        assert session.scalar(select(func.count()).select_from(TransactionModel)) == 16
+
+
+def test_paused_coalescer_commits_on_resume(session_factory):
+    coalescer = CommitCoalescer(session_factory, window=0.001)
+    coalescer.start()
+    try:
+        with coalescer.paused():
+            future = coalescer.submit([{"type": "deposit", "amount": 1, "account_id": "z"}])
+            with pytest.raises(FutureTimeout):
+                future.result(timeout=0.1)
+        assert future.result(timeout=5)[0].id
+    finally:
+        coalescer.stop()
+
+
+def test_failing_request_is_isolated(session_factory):
+    coalescer = CommitCoalescer(session_factory, window=0.05)
+    coalescer.start()
+    try:
+        good = coalescer.submit([{"type": "deposit", "amount": 1, "account_id": "a"}])
+        bad = coalescer.submit([{"type": None, "amount": 1, "account_id": "a"}])
+        after = coalescer.submit([{"type": "withdraw", "amount": 1, "account_id": "a"}])
+        assert good.result()[0].id
+        assert bad.exception() is not None
+        assert after.result()[0].type == "withdraw"
+    finally:
+        coalescer.stop()
+    with session_factory() as session:
+        assert session.scalar(select(func.count()).select_from(TransactionModel)) == 2
+
+
+def test_event_endpoint_waits_for_group_commit(client, session_factory):
+    main.transaction_log = CommitCoalescer(session_factory, window=0.001)
+    main.transaction_log.start()
+    try:
+        client.post("/event", json={"type": "deposit", "account_id": "x", "amount": 10})
+        client.post("/event", json={"type": "deposit", "account_id": "y", "amount": 1})
+        client.post("/event", json={"type": "transfer", "account_id": "x",
+                                    "destination": "y", "amount": 4})
+        client.post("/events", json=[{"type": "withdraw", "account_id": "y", "amount": 2}])
+    finally:
+        main.transaction_log.stop()
+        main.transaction_log = None
+    with session_factory() as session:
+        rows = session.execute(select(TransactionModel.account_id, TransactionModel.amount)
+                               .order_by(TransactionModel.id)).all()
+    assert [(account, float(amount)) for account, amount in rows] == [
+        ("x", 10), ("y", 1), ("x", -4), ("y", 4), ("y", 2)]
+
+
+def _failing_factory():
+    raise RuntimeError("base indisponible")
+
+
+def test_failed_commit_leaves_ledger_unchanged(client):
+    main.transaction_log = CommitCoalescer(_failing_factory, window=0.001)
+    main.transaction_log.start()
+    try:
+        event = {"type": "deposit", "account_id": "lost", "amount": 10}
+        headers = {"Idempotency-Key": "commit-down"}
+        assert client.post("/event", json=event, headers=headers).status_code == 503
+        assert client.post("/event", json=event, headers=headers).status_code == 503
+        batch = client.post("/events", json=[event, {**event, "type": "refund"}]).json()
+        assert [r["status_code"] for r in batch["results"]] == [503, 422]
+    finally:
+        main.transaction_log.stop()
+        main.transaction_log = None
+    assert client.get("/balance", params={"account_id": "lost"}).status_code == 404
+    assert main.ledger_stats.snapshot()["accounts"] == 0
+
+
+def test_batch_commits_only_accepted_events(client, counting_factory, session_factory):
+    main.transaction_log = CommitCoalescer(counting_factory, window=0.001)
+    main.transaction_log.start()
+    try:
+        results = client.post("/events", json=[
+            {"type": "deposit", "account_id": "b", "amount": 3},
+            {"type": "withdraw", "account_id": "b", "amount": 5},
+            {"type": "transfer", "account_id": "b", "destination": "nobody", "amount": 1},
+            {"type": "withdraw", "account_id": "b", "amount": 3},
+        ]).json()["results"]
+    finally:
+        main.transaction_log.stop()
+        main.transaction_log = None
+    assert [r["status_code"] for r in results] == [200, 403, 404, 200]
+    assert counting_factory.sessions == 1
+    with session_factory() as session:
+        rows = session.execute(select(TransactionModel.type, TransactionModel.amount)
+                               .order_by(TransactionModel.id)).all()
+    assert [(kind, float(amount)) for kind, amount in rows] == [("deposit", 3), ("withdraw", 3)]
+    assert client.get("/balance", params={"account_id": "b"}).json()["balance"] == 0
+
+
+def test_history_pages_from_memory_into_group_commit_rows(sql_client, session_factory,
+                                                         monkeypatch):
+    from src.app.core import core
+    from src.app.core.history import AccountHistory
+    client = sql_client
+    history = AccountHistory(capacity=3)
+    monkeypatch.setattr(main, "account_history", history)
+    core.add_listener(history)
+    main.transaction_log = CommitCoalescer(session_factory, window=0.001)
+    main.transaction_log.start()
+    try:
+        # Même seconde : seul l'horodatage de l'événement départage les lignes SQL
+        for amount in range(1, 9):
+            client.post("/event", json={"type": "deposit", "account_id": "p", "amount": amount})
+        amounts, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/accounts/p/transactions", params=params).json()
+            amounts += [t["amount"] for t in page["transactions"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+    finally:
+        main.transaction_log.stop()
+        main.transaction_log = None
+        core.remove_listener(history)
+    assert amounts == [8, 7, 6, 5, 4, 3, 2, 1]
+    with session_factory() as session:
+        stamps = session.scalars(select(TransactionModel.created_at)).all()
+    assert len(set(stamps)) == 8
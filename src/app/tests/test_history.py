@@ -0,0 +1,96 @@
+from src.app.core import core
+from src.app.core.events import LedgerEvent, OP_DEPOSIT, OP_TRANSFER, OP_WITHDRAW
+from src.app.core.history import AccountHistory
+from src.app.core.write_behind import WriteBehindFlusher
+
+
+def _event(op, account_id, amount, dest_id="", ts=0):
+    return LedgerEvent(ts, op, account_id, dest_id, amount)
+
+
+def test_page_is_newest_first_with_cursor():
+    history = AccountHistory(capacity=10)
+    for i in range(1, 6):
+        history.on_event(_event(OP_DEPOSIT, "a", i * 100, ts=i))
+    entries, complete = history.page("a", limit=2)
+    assert [e["amount_minor"] for e in entries] == [500, 400]
+    assert complete
+    entries, _ = history.page("a", before=entries[-1]["seq"], limit=10)
+    assert [e["amount_minor"] for e in entries] == [300, 200, 100]
+
+
+def test_ring_overwrites_oldest_entries():
+    history = AccountHistory(capacity=3)
+    for i in range(1, 8):
+        history.on_event(_event(OP_WITHDRAW if i % 2 else OP_DEPOSIT, "a", i, ts=i))
+    entries, complete = history.page("a", limit=10)
+    assert [e["amount_minor"] for e in entries] == [-7, 6, -5]
+    assert not complete
+    assert history.oldest_timestamp_ns("a") == 5
+    # Curseur au milieu du tampon circulaire
+    entries, _ = history.page("a", before=entries[1]["seq"], limit=10)
+    assert [e["amount_minor"] for e in entries] == [-5]
+
+
+def test_history_without_sql_persistence_keeps_every_entry():
+    history = AccountHistory(capacity=3, evict=False)
+    for i in range(1, 8):
+        history.on_event(_event(OP_DEPOSIT, "a", i, ts=i))
+    entries, complete = history.page("a", limit=10)
+    assert [e["amount_minor"] for e in entries] == [7, 6, 5, 4, 3, 2, 1]
+    assert complete
+    assert history.oldest_timestamp_ns("a") == 1
+
+
+def test_transfer_recorded_on_both_accounts():
+    history = AccountHistory()
+    history.on_event(_event(OP_TRANSFER, "a", 250, dest_id="b"))
+    (origin,), _ = history.page("a")
+    (dest,), _ = history.page("b")
+    assert (origin["amount_minor"], origin["counterparty"]) == (-250, "b")
+    assert (dest["amount_minor"], dest["counterparty"]) == (250, "a")
+    history.on_reset()
+    assert history.page("a") == ([], True)
+
+
+def test_endpoint_pages_from_memory(client):
+    for amount in (10, 20, 30):
+        client.post("/event", json={"type": "deposit", "account_id": "h1", "amount": amount})
+    client.post("/event", json={"type": "withdraw", "account_id": "h1", "amount": 5})
+
+    first = client.get("/accounts/h1/transactions", params={"limit": 3}).json()
+    assert [t["amount"] for t in first["transactions"]] == [-5, 30, 20]
+    second = client.get("/accounts/h1/transactions",
+                        params={"limit": 3, "cursor": first["next_cursor"]}).json()
+    assert [t["amount"] for t in second["transactions"]] == [10]
+    assert second["next_cursor"] is None
+
+    assert client.get("/accounts/ghost/transactions").status_code == 404
+    assert client.get("/accounts/h1/transactions", params={"cursor": "zz"}).status_code == 400
+
+
+def test_endpoint_continues_in_sql_beyond_capacity(sql_client, session_factory, monkeypatch):
+    from src.app import main
+    client = sql_client
+    history = AccountHistory(capacity=3)
+    flusher = WriteBehindFlusher(session_factory, core.accounts)
+    monkeypatch.setattr(main, "account_history", history)
+    core.add_listener(history)
+    core.add_listener(flusher)
+    try:
+        for amount in range(1, 8):
+            client.post("/event", json={"type": "deposit", "account_id": "h2", "amount": amount})
+        flusher.flush()
+
+        amounts, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/accounts/h2/transactions", params=params).json()
+            amounts += [t["amount"] for t in page["transactions"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert amounts == [7, 6, 5, 4, 3, 2, 1]
+    finally:
+        core.remove_listener(flusher)
+        core.remove_listener(history)
@@ -0,0 +1,111 @@
+import threading
+import uuid
+
+import pytest
+
+from src.app.core import core
+from src.app.idempotency import IdempotencyCache, KeyInUse, KeyReused
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_begin_reserves_then_replays():
+    cache = IdempotencyCache()
+    assert cache.begin("k", "payload") is None
+    cache.complete("k", "result")
+    assert cache.begin("k", "payload") == "result"
+    with pytest.raises(KeyReused):
+        cache.begin("k", "other payload")
+
+
+def test_released_key_runs_again():
+    cache = IdempotencyCache(wait_timeout=0)
+    assert cache.begin("k", 1) is None
+    with pytest.raises(KeyInUse):
+        cache.begin("k", 1)
+    cache.release("k")
+    assert cache.begin("k", 1) is None
+
+
+def test_duplicate_waits_for_original():
+    cache = IdempotencyCache(wait_timeout=5)
+    assert cache.begin("k", 1) is None
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(cache.begin("k", 1)))
+    waiter.start()
+    cache.complete("k", "done")
+    waiter.join()
+    assert results == ["done"]
+
+
+def test_lru_and_ttl_eviction():
+    clock = FakeClock()
+    cache = IdempotencyCache(max_entries=2, ttl=10, clock=clock)
+    for key in ("a", "b"):
+        cache.begin(key, key)
+        cache.complete(key, key.upper())
+    assert cache.begin("a", "a") == "A"  # "a" devient le plus récent
+    cache.begin("c", "c")
+    cache.complete("c", "C")
+    assert len(cache) == 2
+    assert cache.begin("b", "b") is None  # évincé par capacité
+    cache.release("b")
+
+    clock.now = 11
+    assert cache.begin("a", "a") is None  # expiré
+
+
+def test_event_with_idempotency_key_applies_once(client):
+    key = uuid.uuid4().hex
+    payload = {"type": "deposit", "account_id": "idem-1", "amount": 100}
+    first = client.post("/event", json=payload, headers={"Idempotency-Key": key})
+    second = client.post("/event", json=payload, headers={"Idempotency-Key": key})
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert second.headers.get("Idempotent-Replayed") == "true"
+    assert core.get_account_balance("idem-1") == 100
+
+    other = client.post("/event", json={**payload, "amount": 5}, headers={"Idempotency-Key": key})
+    assert other.status_code == 422
+
+
+def test_event_replays_refusals(client):
+    key = uuid.uuid4().hex
+    payload = {"type": "withdraw", "account_id": "idem-ghost", "amount": 1}
+    assert client.post("/event", json=payload, headers={"Idempotency-Key": key}).status_code == 404
+    client.post("/event", json={"type": "deposit", "account_id": "idem-ghost", "amount": 10})
+    # Même clé : la réponse d'origine est rejouée, le retrait n'est pas exécuté
+    assert client.post("/event", json=payload, headers={"Idempotency-Key": key}).status_code == 404
+    assert core.get_account_balance("idem-ghost") == 10
+
+
+def test_failure_after_mutation_is_replayed(client, monkeypatch):
+    from src.app import main
+    applied = core.create_or_update_account
+
+    def durable_failure(account_id, amount):
+        applied(account_id, amount)
+        raise OSError("fsync du journal échoué")
+    monkeypatch.setattr(core, "create_or_update_account", durable_failure)
+    key = uuid.uuid4().hex
+    payload = {"type": "deposit", "account_id": "idem-fsync", "amount": 10}
+    assert client.post("/event", json=payload, headers={"Idempotency-Key": key}).status_code == 500
+    # Déjà appliquée : le nouvel essai rejoue l'échec sans déposer une seconde fois
+    assert client.post("/event", json=payload, headers={"Idempotency-Key": key}).status_code == 500
+    assert core.get_account_balance("idem-fsync") == 10
+
+    # 503 levé avant toute mutation : la clé est libérée
+    main.ledger_ready.clear()
+    try:
+        retry = {**payload, "account_id": "idem-ready"}
+        assert client.post("/event", json=retry, headers={"Idempotency-Key": "r"}).status_code == 503
+    finally:
+        main.ledger_ready.set()
+    monkeypatch.undo()
+    assert client.post("/event", json=retry, headers={"Idempotency-Key": "r"}).status_code == 200
@@ -0,0 +1,129 @@
+import threading
+
+import pytest
+
+from src.app.core import core
+from src.app.core.journal import (
+    Journal, JournalReader, OP_DEPOSIT, OP_TRANSFER, OP_WITHDRAW,
+)
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "ledger.wal")
+
+
+@pytest.fixture
+def clean_core():
+    core.close_journal()
+    core.accounts.clear()
+    yield
+    core.close_journal()
+    core.accounts.clear()
+
+
+def test_append_and_read_back(journal_path):
+    journal = Journal(journal_path, commit_interval=0)
+    journal.wait(journal.append(OP_DEPOSIT, "a1", 1000))
+    journal.wait(journal.append(OP_TRANSFER, "a1", 250, "a2"))
+    journal.close()
+
+    records = list(JournalReader(journal_path))
+    assert [(r.seq, r.op, r.account_id, r.dest_id, r.amount_minor) for r in records] == [
+        (1, OP_DEPOSIT, "a1", "", 1000),
+        (2, OP_TRANSFER, "a1", "a2", 250),
+    ]
+
+
+def test_write_failure_is_sticky_and_leaves_no_torn_record(journal_path):
+    import os
+    from src.app.core.journal import JournalError
+    journal = Journal(journal_path, commit_interval=0)
+    journal.wait(journal.append(OP_DEPOSIT, "a1", 1000))
+    write = journal._write
+
+    def torn_write(data):
+        write(data[:5])  # disque plein au milieu d'un enregistrement
+        raise OSError(28, "No space left on device")
+
+    journal._write = torn_write
+    lost = journal.append(OP_DEPOSIT, "a1", 500)
+    with pytest.raises(JournalError):
+        journal.wait(lost)
+    journal._write = write
+    # Aucun lot ultérieur ne peut déclarer `lost` durable
+    with pytest.raises(JournalError):
+        journal.append(OP_DEPOSIT, "a1", 1)
+    with pytest.raises(JournalError):
+        journal.wait(lost)
+    journal.close()
+
+    reader = JournalReader(journal_path)
+    assert [r.amount_minor for r in reader] == [1000]
+    assert reader.valid_end == os.path.getsize(journal_path)
+
+
+def test_group_commit_shares_fsync(journal_path):
+    journal = Journal(journal_path, commit_interval=0.05)
+    seqs = []
+
+    def writer():
+        for _ in range(50):
+            seqs.append(journal.append(OP_DEPOSIT, "hot", 1))
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.wait(max(seqs))
+    assert journal.fsync_count < len(seqs)
+    journal.close()
+    assert len(list(JournalReader(journal_path))) == 200
+
+
+def test_torn_tail_is_truncated(journal_path):
+    journal = Journal(journal_path, commit_interval=0)
+    journal.wait(journal.append(OP_DEPOSIT, "a1", 100))
+    journal.close()
+    with open(journal_path, "ab") as f:
+        f.write(b"\x20\x00\x00\x00garbage")
+
+    reopened = Journal(journal_path, commit_interval=0)
+    assert reopened.last_seq == 1
+    reopened.wait(reopened.append(OP_WITHDRAW, "a1", 40))
+    reopened.close()
+    assert [r.seq for r in JournalReader(journal_path)] == [1, 2]
+
+
+def test_core_replays_journal_on_open(journal_path, clean_core):
+    core.open_journal(journal_path, commit_interval=0)
+    core.create_or_update_account("a1", 100)
+    core.create_or_update_account("a2", 10)
+    core.withdraw_from_account("a1", 30)
+    core.transfer_between_accounts("a1", "a2", 20)
+    core.withdraw_from_account("a2", 1000)  # refusé : non journalisé
+    core.close_journal()
+
+    core.accounts.clear()
+    assert core.open_journal(journal_path, commit_interval=0) == 4
+    assert core.get_account_balance("a1") == 50
+    assert core.get_account_balance("a2") == 30
+
+
+def test_reset_truncates_journal(journal_path, clean_core):
+    core.open_journal(journal_path, commit_interval=0)
+    core.create_or_update_account("a1", 100)
+    core.reset_state()
+    core.close_journal()
+    assert list(JournalReader(journal_path)) == []
+
+
+def test_batch_durability_waits_once(journal_path, clean_core):
+    core.open_journal(journal_path, commit_interval=0.05)
+    with core.batch_durability():
+        for _ in range(20):
+            core.create_or_update_account("a1", 1)
+    assert core._journal.fsync_count < 20
+    core.close_journal()
+    assert len(list(JournalReader(journal_path))) == 20
@@ -0,0 +1,109 @@
+import sys
+import threading
+
+import pytest
+
+from src.app.core import core
+from src.app.core.core import BankingCore
+from src.app.core.locking import LockStripes
+
+
+@pytest.fixture
+def fast_switch():
+    """Force des bascules fréquentes du GIL pour provoquer les entrelacements."""
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(previous)
+
+
+def _run_threads(*targets, count=8):
+    # Cibles réparties à tour de rôle entre les threads
+    threads = [threading.Thread(target=targets[i % len(targets)]) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_lock_for_is_stable():
+    stripes = LockStripes(8)
+    assert stripes.lock_for("acc1") is stripes.lock_for("acc1")
+    assert 0 <= stripes.index_for("acc1") < len(stripes)
+
+
+def test_invalid_stripe_count():
+    with pytest.raises(ValueError):
+        LockStripes(0)
+
+
+def test_hold_same_stripe_twice_does_not_deadlock():
+    stripes = LockStripes(1)
+    with stripes.hold("a", "b"):
+        assert stripes.lock_for("a").locked()
+    assert not stripes.lock_for("a").locked()
+
+
+def test_hold_all_releases_every_lock():
+    stripes = LockStripes(4)
+    with stripes.hold_all():
+        assert all(stripes.lock_for(str(i)).locked() for i in range(16))
+    assert not any(stripes.lock_for(str(i)).locked() for i in range(16))
+
+
+def test_concurrent_deposits_no_lost_update(fast_switch):
+    core.accounts.clear()
+
+    def deposit():
+        for _ in range(2000):
+            core.create_or_update_account("hot", 1)
+
+    _run_threads(deposit)
+    assert core.accounts["hot"].balance == 8 * 2000
+    core.accounts.clear()
+
+
+def test_concurrent_withdrawals_never_overdraw(fast_switch):
+    core.accounts.clear()
+    core.create_or_update_account("hot", 1000)
+    succeeded = []
+
+    def withdraw():
+        for _ in range(500):
+            if core.withdraw_from_account("hot", 1) is not None:
+                succeeded.append(1)
+
+    _run_threads(withdraw)
+    assert len(succeeded) == 1000
+    assert core.accounts["hot"].balance == 0
+    core.accounts.clear()
+
+
+def test_opposite_transfers_preserve_total(fast_switch):
+    bank = BankingCore()
+    bank.create_account("A", 1000)
+    bank.create_account("B", 1000)
+
+    def a_to_b():
+        for _ in range(1000):
+            bank.transfer("A", "B", 1)
+
+    def b_to_a():
+        for _ in range(1000):
+            bank.transfer("B", "A", 1)
+
+    _run_threads(a_to_b, b_to_a)
+    assert bank.get_balance("A") + bank.get_balance("B") == 2000
+
+
+def test_acquire_all_without_blocking_keeps_nothing_when_busy():
+    stripes = LockStripes(4)
+    with stripes.hold("a"):
+        assert not stripes.acquire_all(blocking=False)
+    assert stripes.acquire_all(blocking=False)
+    # Libérables depuis un autre thread que celui qui les a pris
+    releaser = threading.Thread(target=stripes.release_all)
+    releaser.start()
+    releaser.join()
+    with stripes.hold_all():
+        pass
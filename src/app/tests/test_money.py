@@ -0,0 +1,119 @@
+import pytest
+from decimal import Decimal
+from pydantic import ValidationError
+from sqlalchemy import create_engine, text
+
+from src.app.models import AccountModel, TransactionModel, UserModel
+from src.app.models.transaction_utils import DEFAULT_FEE_SCHEDULE, calculate_fee
+from src.app.money import (MAX_AMOUNT, MoneyStorageError, check_money_storage, from_minor,
+                           parse_money, to_minor)
+from src.app.schemas import TransactionCreate
+
+
+def test_to_minor_is_exact_for_cents():
+    assert to_minor(19.99) == 1999
+    assert to_minor(0.1) + to_minor(0.2) == to_minor(0.3)
+    assert to_minor(7) == 700
+    assert to_minor(Decimal("1.005")) == 100  # arrondi bancaire
+
+
+def test_parse_money_accepts_decimal_strings():
+    assert parse_money("12.34") == 1234
+    assert parse_money(" 5 ") == 500
+    assert parse_money(999999999.99) == 99999999999
+
+
+@pytest.mark.parametrize("value", ["12.345", "abc", "NaN", "Infinity", True, None, 0.001])
+def test_parse_money_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        parse_money(value)
+
+
+def test_schema_parses_string_amount():
+    transaction = TransactionCreate(type="deposit", amount="10.50", account_id="a1")
+    assert transaction.amount == 10.5
+    with pytest.raises(ValidationError):
+        TransactionCreate(type="deposit", amount="10.505", account_id="a1")
+
+
+@pytest.mark.parametrize("value", ["NaN", "Infinity", True, 0.001, 0, -1])
+def test_schema_rejects_invalid_amounts(value):
+    with pytest.raises(ValidationError):
+        TransactionCreate(type="deposit", amount=value, account_id="a1")
+
+
+def _validator_types(schema):
+    # Types des schémas de validation (la sérialisation JSON est exclue)
+    if isinstance(schema, dict):
+        if isinstance(schema.get("type"), str):
+            yield schema["type"]
+        for key, value in schema.items():
+            if key not in ("serialization", "metadata"):
+                yield from _validator_types(value)
+    elif isinstance(schema, list):
+        for item in schema:
+            yield from _validator_types(item)
+
+
+def test_money_schema_runs_without_python_validators():
+    types = set(_validator_types(TransactionCreate.__pydantic_core_schema__))
+    assert "decimal" in types
+    assert not any(kind.startswith("function-") for kind in types)
+
+
+def test_schema_converts_amounts_to_exact_minor_units():
+    transaction = TransactionCreate(type="deposit", amount="123456789012345.67", account_id="a1")
+    assert to_minor(transaction.amount) == 12345678901234567
+    assert transaction.model_dump(mode="json")["amount"] == 123456789012345.67
+    largest = TransactionCreate(type="deposit", amount=str(MAX_AMOUNT), account_id="a1")
+    assert to_minor(largest.amount) == 2**63 - 1
+    with pytest.raises(ValidationError):
+        TransactionCreate(type="deposit", amount=100000000000000000, account_id="a1")
+
+
+def test_oversized_amount_is_rejected_with_422(client):
+    response = client.post("/event", json={"type": "deposit", "account_id": "big",
+                                           "amount": 100000000000000000})
+    assert response.status_code == 422
+    response = client.post("/event", json={"type": "deposit", "account_id": "big",
+                                           "amount": "123456789012345.67"})
+    assert response.status_code == 200
+    balance = client.get("/balance", params={"account_id": "big"}).json()["balance"]
+    assert balance == 123456789012345.67
+
+
+def test_fee_in_basis_points():
+    assert DEFAULT_FEE_SCHEDULE.fee_minor(10_000, "transfer") == 500
+    assert DEFAULT_FEE_SCHEDULE.fee_minor(1, "transfer") == 0
+    assert DEFAULT_FEE_SCHEDULE.fee_minor(10, "transfer") == 1  # 0,5 centime arrondi vers le haut
+    assert calculate_fee(19.99) == 1.0
+
+
+def test_sql_columns_store_minor_units(db):
+    user = UserModel(name="m", email="m@example.com", password="x")
+    db.add(user)
+    db.commit()
+    db.add(AccountModel(id="m1", balance=12.34, owner_id=user.id))
+    db.add(TransactionModel(type="deposit", amount=0.1, account_id="m1"))
+    db.commit()
+
+    raw_balance = db.execute(text("SELECT balance FROM accounts WHERE id = 'm1'")).scalar()
+    raw_amount = db.execute(text("SELECT amount FROM transactions")).scalar()
+    assert raw_balance == 1234
+    assert raw_amount == 10
+    db.expire_all()
+    assert db.get(AccountModel, "m1").balance == 12.34
+    assert from_minor(raw_amount) == 0.1
+
+
+def test_startup_refuses_float_money_columns(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    check_money_storage(engine)  # base vide : rien à vérifier
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE accounts (id VARCHAR PRIMARY KEY, balance BIGINT)"))
+    check_money_storage(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE transactions (id INTEGER PRIMARY KEY, amount FLOAT)"))
+    with pytest.raises(MoneyStorageError, match="transactions.amount"):
+        check_money_storage(engine)
+    engine.dispose()
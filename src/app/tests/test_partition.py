@@ -0,0 +1,266 @@
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+import pytest
+
+from src.app.core import core
+from src.app.core.partition import (
+    LedgerClient, PartitionError, PartitionOwner, partition_for, start_owners, stop_owners,
+)
+from src.app.core.snapshots import SnapshotError, UnknownSnapshot
+from src.app.money import to_minor
+
+
+def _ids_in_partitions(partitions, count=2):
+    # Un identifiant par partition, pour forcer des transferts inter-partitions
+    found = {}
+    i = 0
+    while len(found) < count:
+        account_id = f"acc-{i}"
+        found.setdefault(partition_for(account_id, partitions), account_id)
+        i += 1
+    return [found[index] for index in sorted(found)][:count]
+
+
+@pytest.fixture
+def socket_dir():
+    # Chemin court : les sockets Unix sont limitées à ~108 caractères
+    path = tempfile.mkdtemp(prefix="ledger-")
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def owners(socket_dir):
+    """Deux propriétaires servis par des threads du processus de test."""
+    core.reset_memory()
+    owners = [PartitionOwner(index, 2, socket_dir, escrow_timeout=60) for index in range(2)]
+    threads = [threading.Thread(target=owner.serve_forever, daemon=True) for owner in owners]
+    for thread in threads:
+        thread.start()
+    client = LedgerClient(socket_dir, 2)
+    for index in range(2):
+        for _ in range(100):
+            try:
+                client.call(index, "ping")
+                break
+            except Exception:
+                time.sleep(0.01)
+    yield owners, client
+    client.close()
+    for owner in owners:
+        owner.stop()
+    core.reset_memory()
+
+
+def test_partition_for_is_stable_and_spread():
+    assert partition_for("abc", 8) == partition_for("abc", 8)
+    assert {partition_for(f"a{i}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_client_basic_operations(owners):
+    _, client = owners
+    assert client.create_or_update_account("c1", 100).balance == 100
+    assert client.withdraw_from_account("c1", 30).balance == 70
+    assert client.withdraw_from_account("c1", 500) is None
+    assert client.withdraw_from_account("ghost", 1) is None
+    assert client.get_account_balance("c1") == 70
+    assert client.get_account_balance("ghost") is None
+    assert client.account_exists("c1") and not client.account_exists("ghost")
+
+
+def test_cross_partition_transfer(owners):
+    _, client = owners
+    a, b = _ids_in_partitions(2)
+    client.create_or_update_account(a, 100)
+    client.create_or_update_account(b, 10)
+
+    origin, dest = client.transfer_between_accounts(a, b, 40)
+    assert (origin.balance, dest.balance) == (60, 50)
+    assert client.transfer_between_accounts(a, b, 1000) == (None, None)
+    # Destination absente : le séquestre est remboursé
+    ghost = next(f"g{i}" for i in range(100) if partition_for(f"g{i}", 2) != partition_for(a, 2))
+    assert client.transfer_between_accounts(a, ghost, 10) == (None, None)
+    assert client.get_account_balance(a) == 60
+    assert client.get_account_balance(b) == 50
+
+
+def test_snapshot_restores_every_partition(owners):
+    owner_list, client = owners
+    a, b = _ids_in_partitions(2)
+    client.create_or_update_account(a, 10)
+    client.create_or_update_account(b, 20)
+    client.save_snapshot("seed")
+    client.transfer_between_accounts(a, b, 5)
+    client.create_or_update_account("late", 1)
+
+    client.restore_snapshot("seed")
+    assert (client.get_account_balance(a), client.get_account_balance(b)) == (10, 20)
+    assert client.get_account_balance("late") is None
+    # Séquestre ouvert : l'instantané décrirait un transfert à moitié appliqué
+    owner_list[partition_for(a, 2)].handle(("reserve", "tx", a, 100, partition_for(b, 2)))
+    with pytest.raises(SnapshotError):
+        client.save_snapshot("torn")
+    client.delete_snapshot("seed")
+    with pytest.raises(UnknownSnapshot):
+        client.restore_snapshot("seed")
+
+
+def test_restore_with_owner_journal_is_refused_with_409(client, owners, monkeypatch, tmp_path):
+    from src.app import main
+    _, ledger = owners
+    monkeypatch.setattr(main, "ledger", ledger)
+    ledger.create_or_update_account("j1", 10)
+    assert client.post("/snapshots/seed").status_code == 201
+    core.open_journal(str(tmp_path / "owner.journal"))
+    try:
+        response = client.post("/snapshots/seed/restore")
+        assert response.status_code == 409, response.text
+        assert client.post("/snapshots/missing/restore").status_code == 404
+    finally:
+        core.close_journal()
+        ledger.delete_snapshot("seed")
+
+
+def test_commit_failure_after_credit_still_reports_transfer(owners, monkeypatch):
+    (owner_a, _), client = owners
+    a, b = _ids_in_partitions(2)
+    client.create_or_update_account(a, 100)
+    client.create_or_update_account(b, 0)
+    call = client.call
+
+    def failing_commit(index, op, *args):
+        if op == "commit":
+            raise PartitionError("Propriétaire indisponible")
+        return call(index, op, *args)
+
+    monkeypatch.setattr(client, "call", failing_commit)
+    origin, dest = client.transfer_between_accounts(a, b, 25)
+    assert (origin.balance, dest.balance) == (75, 25)
+    # Le séquestre resté ouvert est commité par le propriétaire d'origine
+    assert owner_a.resolve_expired(now=time.monotonic() + 61) == 1
+    assert (client.get_account_balance(a), client.get_account_balance(b)) == (75, 25)
+
+
+def test_abandoned_escrow_is_refunded_and_fenced(owners):
+    (owner_a, owner_b), client = owners
+    a, b = _ids_in_partitions(2)
+    client.create_or_update_account(a, 100)
+    client.create_or_update_account(b, 0)
+    txid = uuid.uuid4().hex
+    # Client interrompu après la réservation
+    client.call(0, "reserve", txid, a, to_minor(25), 1)
+    assert client.get_account_balance(a) == 75
+
+    assert owner_a.resolve_expired(now=time.monotonic() + 61) == 1
+    assert client.get_account_balance(a) == 100
+    # Un crédit tardif est refusé : pas de double dépense
+    assert client.call(1, "credit", txid, b, to_minor(25))[0] == "aborted"
+    assert client.get_account_balance(b) == 0
+
+
+def test_abandoned_escrow_already_credited_is_committed(owners):
+    (owner_a, _), client = owners
+    a, b = _ids_in_partitions(2)
+    client.create_or_update_account(a, 100)
+    client.create_or_update_account(b, 0)
+    txid = uuid.uuid4().hex
+    client.call(0, "reserve", txid, a, to_minor(25), 1)
+    client.call(1, "credit", txid, b, to_minor(25))
+    # Un crédit rejoué n'est appliqué qu'une fois
+    client.call(1, "credit", txid, b, to_minor(25))
+
+    assert owner_a.resolve_expired(now=time.monotonic() + 61) == 1
+    assert client.get_account_balance(a) == 75
+    assert client.get_account_balance(b) == 25
+
+
+def test_event_endpoint_routes_to_partitions(client, owners, monkeypatch):
+    from src.app import main
+    _, ledger = owners
+    monkeypatch.setattr(main, "ledger", ledger)
+    a, b = _ids_in_partitions(2)
+    assert client.post("/event", json={"type": "deposit", "account_id": a, "amount": 50}).status_code == 200
+    assert client.post("/event", json={"type": "deposit", "account_id": b, "amount": 5}).status_code == 200
+    response = client.post("/event", json={"type": "transfer", "account_id": a,
+                                           "destination": b, "amount": 20})
+    assert response.status_code == 200, response.text
+    assert client.post("/event", json={"type": "withdraw", "account_id": "ghost",
+                                       "amount": 1}).status_code == 404
+    assert client.post("/event", json={"type": "withdraw", "account_id": a,
+                                       "amount": 500}).status_code == 403
+    assert client.get("/balance", params={"account_id": b}).json()["balance"] == 25
+    for path in ("/stats", f"/accounts/{a}/stats", "/stats/verify"):
+        assert client.get(path).status_code == 501
+
+
+def test_owner_processes_keep_totals_consistent(socket_dir):
+    processes = start_owners(3, socket_dir)
+    client = LedgerClient(socket_dir, 3)
+    try:
+        ids = [f"p{i}" for i in range(12)]
+        for account_id in ids:
+            client.create_or_update_account(account_id, 100)
+
+        def worker(seed):
+            for i in range(200):
+                origin = ids[(seed + i) % len(ids)]
+                dest = ids[(seed * 7 + i * 3 + 1) % len(ids)]
+                if origin != dest:
+                    client.transfer_between_accounts(origin, dest, 1.5)
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sum(client.get_account_balance(account_id) for account_id in ids) == 1200
+    finally:
+        client.close()
+        stop_owners(processes)
+
+
+def test_restarted_owners_resolve_in_flight_transfers(socket_dir, tmp_path):
+    journal_dir = str(tmp_path / "wal")
+    a, b = _ids_in_partitions(2)
+    origin, dest = partition_for(a, 2), partition_for(b, 2)
+    processes = start_owners(2, socket_dir, journal_dir=journal_dir, escrow_timeout=60)
+    client = LedgerClient(socket_dir, 2)
+    try:
+        client.create_or_update_account(a, 100)
+        client.create_or_update_account(b, 0)
+        # Client interrompu : une réservation seule, puis une réservation déjà créditée
+        client.call(origin, "reserve", "tx-refund", a, to_minor(10), dest)
+        client.call(origin, "reserve", "tx-commit", a, to_minor(25), dest)
+        client.call(dest, "credit", "tx-commit", b, to_minor(25))
+    finally:
+        client.close()
+        stop_owners(processes)
+
+    # Redémarrage avant toute résolution : séquestres et crédit reviennent du journal
+    processes = start_owners(2, socket_dir, journal_dir=journal_dir, escrow_timeout=0.2)
+    client = LedgerClient(socket_dir, 2)
+    try:
+        deadline = time.monotonic() + 10
+        while client.get_account_balance(a) != 75 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert (client.get_account_balance(a), client.get_account_balance(b)) == (75, 25)
+        # La réservation remboursée a été close chez la destination
+        assert client.call(dest, "credit", "tx-refund", b, to_minor(10))[0] == "aborted"
+    finally:
+        client.close()
+        stop_owners(processes)
+
+    # Un second redémarrage ne rejoue ni remboursement ni commit
+    processes = start_owners(2, socket_dir, journal_dir=journal_dir, escrow_timeout=0.2)
+    client = LedgerClient(socket_dir, 2)
+    try:
+        time.sleep(0.5)
+        assert client.get_account_balance(a) + client.get_account_balance(b) == 100
+        assert client.call(dest, "credit", "tx-refund", b, to_minor(10))[0] == "aborted"
+    finally:
+        client.close()
+        stop_owners(processes)
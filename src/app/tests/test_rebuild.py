@@ -0,0 +1,64 @@
+from sqlalchemy import create_engine, insert
+
+from src.app import main
+from src.app.core import core
+from src.app.core.rebuild import rebuild_balances
+from src.app.models import Base
+from src.app.models.account import AccountModel
+from src.app.models.transaction import TransactionModel
+
+
+def _seed(engine, accounts=20, per_account=50):
+    Base.metadata.create_all(bind=engine)
+    rows, expected = [], {}
+    for a in range(accounts):
+        account_id = f"r{a}"
+        for i in range(per_account):
+            kind = ("deposit", "withdraw", "transfer")[i % 3]
+            amount = i + 1 if kind != "transfer" else -(i + 1) if a % 2 else i + 1
+            rows.append({"type": kind, "amount": amount, "account_id": account_id})
+            expected[account_id] = expected.get(account_id, 0) + (
+                -(amount * 100) if kind == "withdraw" else amount * 100)
+    with engine.begin() as conn:
+        conn.execute(insert(AccountModel), [{"id": a, "balance": 0, "owner_id": 1} for a in expected])
+        conn.execute(insert(TransactionModel), rows)
+    return expected
+
+
+def test_serial_rebuild_folds_signed_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'serial.db'}")
+    expected = _seed(engine)
+    balances, progress = rebuild_balances(engine, workers=1, chunk_size=64)
+    assert balances == expected
+    assert progress.rows == 20 * 50
+    engine.dispose()
+
+
+def test_parallel_rebuild_matches_serial(tmp_path):
+    url = f"sqlite:///{tmp_path / 'parallel.db'}"
+    engine = create_engine(url)
+    expected = _seed(engine)
+    balances, progress = rebuild_balances(engine, url, workers=2, chunk_size=100)
+    assert balances == expected
+    assert progress.rows == progress.total_rows == 20 * 50
+    engine.dispose()
+
+
+def test_empty_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    Base.metadata.create_all(bind=engine)
+    assert rebuild_balances(engine, workers=1)[0] == {}
+    engine.dispose()
+
+
+def test_requests_gated_until_ready(client):
+    main.ledger_ready.clear()
+    try:
+        assert client.get("/ready").status_code == 503
+        response = client.post("/event", json={"type": "deposit", "account_id": "g", "amount": 1})
+        assert response.status_code == 503
+    finally:
+        main.ledger_ready.set()
+    core.load_balances({"g": 4200})
+    assert client.get("/ready").json() == {"status": "ready"}
+    assert client.get("/balance", params={"account_id": "g"}).json()["balance"] == 42
@@ -1,5 +1,5 @@
 import pytest
-from src.app.schemas import UserCreate, User, AccountSchema, AccountCreate, TransactionCreate, TransactionResponse
+from src.app.schemas import UserCreate, User, AccountSchema, AccountCreate, TransactionBatch, TransactionCreate, TransactionResponse
 
 # ---------------- Tests pour les schémas ----------------
 def test_user_create_model():
@@ -36,6 +36,20 @@ def test_transaction_create_invalid():
     with pytest.raises(ValueError):
         TransactionCreate(type="", amount=-10.0)  # Type vide et montant négatif
 
+def test_transaction_batch_validates_in_one_call():
+    batch = TransactionBatch.validate_python([
+        {"type": "deposit", "amount": 10, "account_id": "a"},
+        {"type": "transfer", "amount": "2.50", "account_id": "a", "destination": "b"},
+    ])
+    assert [t.type for t in batch] == ["deposit", "transfer"]
+    assert batch[1].amount == 2.5
+    with pytest.raises(ValueError) as exc_info:
+        TransactionBatch.validate_python([{"type": "refund", "amount": 0, "account_id": "a"}])
+    errors = exc_info.value.errors()
+    assert errors[0]["loc"] == (0, "type")
+    assert "Type must be deposit, withdraw, or transfer" in errors[0]["msg"]
+    assert errors[1]["loc"] == (0, "amount")
+
 def test_transaction_response():
     # CORRECTION : utiliser account_id au lieu de origin/destination
     response = TransactionResponse(type="deposit", account_id="acc1")
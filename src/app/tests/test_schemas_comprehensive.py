@@ -1,6 +1,7 @@
 import pytest
 from pydantic import ValidationError
 from datetime import datetime
+from decimal import Decimal
 
 from src.app.schemas import (
     UserBase, UserCreate, User,
@@ -251,7 +252,8 @@ class TestEdgeCases:
         }
         account = AccountSchema(**data)
         
-        assert account.balance == 999999999.99
+        assert account.balance == Decimal("999999999.99")
+        assert account.model_dump(mode="json")["balance"] == 999999999.99
     
     def test_transaction_large_amount(self):
         """Test Transaction avec un montant très élevé"""
@@ -0,0 +1,48 @@
+import json
+import uuid
+
+import pytest
+
+from src.app.schemas import AccountSchema, TransactionResponse
+from src.app.serialization import ENCODERS, FastJSONResponse, encode_balance
+
+
+def test_precomputed_encoder_matches_pydantic():
+    response = TransactionResponse.model_construct(type="transfer", account_id="a", destination="b",
+                                                   status="success")
+    encoded = ENCODERS[TransactionResponse](response)
+    assert json.loads(encoded) == json.loads(response.model_dump_json())
+
+    account = AccountSchema(id="acc1", balance=12.5, owner_id=3)
+    assert json.loads(ENCODERS[AccountSchema](account)) == account.model_dump()
+    assert json.loads(encode_balance("acc1", 12.5)) == {"account_id": "acc1", "balance": 12.5}
+
+
+def test_fast_response_renders_bytes_and_plain_content():
+    assert FastJSONResponse(b'{"a":1}').body == b'{"a":1}'
+    assert json.loads(FastJSONResponse({"a": [1, 2]}).body) == {"a": [1, 2]}
+
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_endpoints_same_payload_in_both_modes(sql_client, monkeypatch, fast):
+    from src.app import main
+    monkeypatch.setattr(main, "FAST_SERIALIZATION", fast)
+    client = sql_client
+    key = uuid.uuid4().hex
+
+    response = client.post("/event", json={"type": "deposit", "account_id": "f1", "amount": 10})
+    assert response.status_code == 200
+    body = response.json()
+    assert {k: body[k] for k in ("type", "account_id", "destination", "status")} == {
+        "type": "deposit", "account_id": "f1", "destination": None, "status": "success"}
+    assert "timestamp" in body
+
+    for _ in range(2):
+        replayed = client.post("/event", json={"type": "deposit", "account_id": "f1", "amount": 10},
+                               headers={"Idempotency-Key": key})
+    assert replayed.headers["Idempotent-Replayed"] == "true"
+
+    assert client.get("/balance", params={"account_id": "f1"}).json() == {
+        "account_id": "f1", "balance": 20.0}
+    account = client.post("/accounts/", json={"id": "acc1", "balance": 5, "user_id": 1})
+    assert account.json() == {"id": "acc1", "balance": 5.0, "owner_id": 1}
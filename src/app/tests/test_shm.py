@@ -0,0 +1,139 @@
+import shutil
+import tempfile
+import threading
+import uuid
+
+import pytest
+
+from src.app.core import core
+from src.app.core.partition import LedgerClient, PartitionedBalanceReader, start_owners, stop_owners
+from src.app.core.shm import (
+    BalancePublisher, SharedBalanceReader, SharedBalanceTable, TableUnavailable,
+)
+
+
+@pytest.fixture
+def table():
+    table = SharedBalanceTable(f"test-ledger-{uuid.uuid4().hex[:8]}", capacity=64)
+    yield table
+    table.close()
+
+
+def test_publish_and_read(table):
+    reader = SharedBalanceReader(table.name)
+    table.publish("a1", 1234)
+    table.publish("a2", -5)
+    table.publish("a1", 1500)
+    assert reader.read_minor("a1") == 1500
+    assert reader.get_account_balance("a2") == -0.05
+    assert reader.read_minor("ghost") is None
+    reader.close()
+
+
+def test_colliding_ids_probe_linearly(table):
+    reader = SharedBalanceReader(table.name)
+    ids = [f"id-{i}" for i in range(40)]
+    for minor, account_id in enumerate(ids):
+        table.publish(account_id, minor)
+    assert [reader.read_minor(account_id) for account_id in ids] == list(range(40))
+    reader.close()
+
+
+def test_overflow_makes_misses_unreliable(table):
+    reader = SharedBalanceReader(table.name)
+    table.publish("x" * 100, 1)  # id trop long : non publié
+    with pytest.raises(TableUnavailable):
+        reader.read_minor("x" * 100)
+    table.publish("ok", 7)
+    assert reader.read_minor("ok") == 7
+    table.clear()
+    assert reader.read_minor("ok") is None
+    reader.close()
+
+
+def test_only_the_writer_unlinks():
+    from multiprocessing import resource_tracker
+    table = SharedBalanceTable(f"test-ledger-{uuid.uuid4().hex[:8]}", capacity=8)
+    table.publish("a1", 1)
+    registered = []
+    original = resource_tracker.register
+    resource_tracker.register = lambda *args: registered.append(args)
+    try:
+        reader = SharedBalanceReader(table.name)
+    finally:
+        resource_tracker.register = original
+    assert registered == []  # le lecteur ne touche pas au resource tracker
+    reader.close()
+    # Le segment survit à la fermeture du lecteur ; l'écrivain le détruit une seule fois
+    other = SharedBalanceReader(table.name)
+    assert other.read_minor("a1") == 1
+    other.close()
+    table.close()
+    with pytest.raises(TableUnavailable):
+        SharedBalanceReader(table.name)
+
+
+def test_missing_segment_is_unavailable():
+    with pytest.raises(TableUnavailable):
+        SharedBalanceReader(f"test-ledger-missing-{uuid.uuid4().hex[:8]}")
+
+
+def test_publisher_follows_ledger(table):
+    core.reset_memory()
+    publisher = BalancePublisher(table, core.accounts)
+    core.add_listener(publisher)
+    try:
+        reader = SharedBalanceReader(table.name)
+        core.create_or_update_account("s1", 100)
+        core.create_or_update_account("s2", 10)
+        core.transfer_between_accounts("s1", "s2", 25)
+        assert reader.get_account_balance("s1") == 75
+        assert reader.get_account_balance("s2") == 35
+        core.reset_memory()
+        assert reader.read_minor("s1") is None
+        reader.close()
+    finally:
+        core.remove_listener(publisher)
+
+
+def test_reads_consistent_under_concurrent_writes(table):
+    reader = SharedBalanceReader(table.name)
+    table.publish("hot", 0)
+    stop = threading.Event()
+
+    def writer():
+        value = 0
+        while not stop.is_set():
+            value += 1
+            table.publish("hot", value)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        seen = [reader.read_minor("hot") for _ in range(5000)]
+    finally:
+        stop.set()
+        thread.join()
+    assert seen == sorted(seen)
+    reader.close()
+
+
+def test_balance_endpoint_reads_owner_tables(client, monkeypatch):
+    from src.app import main
+    socket_dir = tempfile.mkdtemp(prefix="ledger-")
+    shm_name = f"test-ledger-{uuid.uuid4().hex[:8]}"
+    processes = start_owners(2, socket_dir, shm_name=shm_name, shm_capacity=1024)
+    ledger = LedgerClient(socket_dir, 2)
+    reader = PartitionedBalanceReader(shm_name, 2)
+    monkeypatch.setattr(main, "ledger", ledger)
+    monkeypatch.setattr(main, "balance_reader", reader)
+    try:
+        client.post("/event", json={"type": "deposit", "account_id": "r1", "amount": 42.5})
+        assert reader.get_account_balance("r1") == 42.5
+        assert client.get("/balance", params={"account_id": "r1"}).json()["balance"] == 42.5
+        assert client.get("/balance", params={"account_id": "ghost"}).status_code == 404
+    finally:
+        reader.close()
+        ledger.close()
+        stop_owners(processes)
+        shutil.rmtree(socket_dir, ignore_errors=True)
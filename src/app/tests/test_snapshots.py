@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.app.core.snapshots import DatabaseSnapshots, InvalidSnapshotName, UnknownSnapshot
+from src.app.core.store import AccountStore
+
+
+def test_store_restore_is_repeatable_and_detaches_views():
+    store = AccountStore()
+    store.add("a", 100)
+    store.add("b", 200)
+    snapshot = store.snapshot()
+    view = store["a"]
+    balances = store.balances
+
+    store.balances[0] = 1
+    store.add("c", 5)
+    store.restore(snapshot)
+    assert dict((k, store[k].balance_minor) for k in store) == {"a": 100, "b": 200}
+    assert store.balances is balances  # colonnes recopiées en place
+    with pytest.raises(KeyError):
+        view.balance
+
+    store.add("d", 7)
+    store.restore(snapshot)
+    assert sorted(store) == ["a", "b"]
+
+
+def _count(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM t")).scalar()
+
+
+@pytest.mark.parametrize("in_directory", [False, True])
+def test_sqlite_backup_round_trip(tmp_path, in_directory):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1), (2)"))
+    snapshots = DatabaseSnapshots(engine, str(tmp_path / "snaps") if in_directory else None)
+    snapshots.save("seeded")
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO t VALUES (3)"))
+    assert _count(engine) == 3
+
+    snapshots.restore("seeded")
+    assert _count(engine) == 2
+    assert snapshots.names() == ["seeded"]
+    snapshots.delete("seeded")
+    with pytest.raises(UnknownSnapshot):
+        snapshots.restore("seeded")
+    with pytest.raises(InvalidSnapshotName):
+        snapshots.save("../evil")
+    engine.dispose()
+
+
+def test_background_writers_are_paused_around_snapshots(tmp_path):
+    from contextlib import contextmanager
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    calls = []
+
+    class Writer:
+        @contextmanager
+        def paused(self):
+            calls.append("pause")
+            yield
+            calls.append("resume")
+
+    snapshots = DatabaseSnapshots(engine)
+    writer = Writer()
+    snapshots.add_writer(writer)
+    snapshots.save("seeded")
+    snapshots.restore("seeded")
+    assert calls == ["pause", "resume"] * 2
+    snapshots.remove_writer(writer)
+    snapshots.save("seeded")
+    assert len(calls) == 4
+    engine.dispose()
+
+
+def test_snapshot_endpoints(client):
+    client.post("/event", json={"type": "deposit", "account_id": "s1", "amount": 100})
+    assert client.post("/snapshots/base").status_code == 201
+    assert "base" in client.get("/snapshots").json()["snapshots"]
+
+    client.post("/event", json={"type": "withdraw", "account_id": "s1", "amount": 60})
+    client.post("/event", json={"type": "deposit", "account_id": "s2", "amount": 1})
+    assert client.post("/snapshots/base/restore").status_code == 200
+    assert client.get("/balance", params={"account_id": "s1"}).json()["balance"] == 100
+    assert client.get("/balance", params={"account_id": "s2"}).status_code == 404
+    # Les agrégats repartent des soldes restaurés
+    assert client.get("/stats").json()["total_balance"] == 100
+    assert client.get("/stats/verify").json()["ok"]
+
+    client.post("/event", json={"type": "deposit", "account_id": "s1", "amount": 1})
+    assert client.post("/reset", params={"snapshot": "base"}).json()["snapshot"] == "base"
+    assert client.get("/balance", params={"account_id": "s1"}).json()["balance"] == 100
+
+    assert client.post("/snapshots/missing/restore").status_code == 404
+    assert client.post("/snapshots/bad.name").status_code == 400
+    assert client.delete("/snapshots/base").status_code == 200
@@ -0,0 +1,82 @@
+import pytest
+
+from src.app.core.core import MemoryAccount
+from src.app.core.store import AccountStore, from_minor, to_minor
+
+
+def test_minor_units_round_trip():
+    assert to_minor(12.34) == 1234
+    assert to_minor(0.1) == 10
+    assert from_minor(1234) == 12.34
+
+
+def test_add_and_read_columns():
+    store = AccountStore()
+    row = store.add("a1", 1500, owner_id=7)
+    assert store.row_of("a1") == row
+    assert store.balances[row] == 1500
+    assert store["a1"].balance == 15.0
+    assert store["a1"].owner_id == 7
+    assert store["a1"].balance_minor == 1500
+
+
+def test_setitem_accepts_memory_account():
+    store = AccountStore()
+    store["a1"] = MemoryAccount(id="a1", balance=200)
+    store["a1"].balance += 50
+    assert store["a1"].balance == 250
+    assert "a1" in store and len(store) == 1
+
+
+def test_view_is_interned_while_referenced():
+    store = AccountStore()
+    store.add("a1", 100)
+    first = store["a1"]
+    assert store["a1"] is first
+    assert store.get("missing") is None
+
+
+def test_delete_keeps_columns_dense():
+    store = AccountStore()
+    for i in range(3):
+        store.add(f"a{i}", i * 100)
+    moved = store["a2"]
+    del store["a0"]
+    assert len(store) == 2
+    assert len(store.balances) == 2
+    assert moved.balance == 2.0
+    assert store["a1"].balance == 1.0
+    with pytest.raises(KeyError):
+        store["a0"]
+
+
+def test_clear_detaches_views():
+    store = AccountStore()
+    store.add("a1", 100)
+    view = store["a1"]
+    store.clear()
+    assert len(store) == 0
+    with pytest.raises(KeyError):
+        view.balance
+
+
+def test_concurrent_adds_get_distinct_rows():
+    import sys
+    import threading
+    store = AccountStore()
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # bascule de thread quasi à chaque instruction
+    try:
+        def adder(prefix):
+            for i in range(500):
+                store.add(f"{prefix}{i}", i)
+        threads = [threading.Thread(target=adder, args=(f"t{n}-",)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert len(store) == len(store.balances) == len(store.owner_ids) == 4000
+    assert sorted(store.row_of(store.id_at(row)) for row in range(4000)) == list(range(4000))
+    assert all(store.balances[store.row_of(f"t3-{i}")] == i for i in range(500))
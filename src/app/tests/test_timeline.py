@@ -0,0 +1,94 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from src.app.core import core
+from src.app.core.events import LedgerEvent, OP_DEPOSIT
+from src.app.core.store import AccountStore
+from src.app.core.timeline import BalanceTimeline, HistoryTruncated
+
+
+def _deposit(store, timeline, account_id, minor, ts):
+    row = store.row_of(account_id)
+    if row is None:
+        store.add(account_id, minor)
+    else:
+        store.balances[row] += minor
+    timeline.on_event(LedgerEvent(ts, OP_DEPOSIT, account_id, "", minor))
+
+
+def test_balance_at_bisects_checkpoints():
+    store = AccountStore()
+    timeline = BalanceTimeline(store)
+    for ts, minor in ((10, 100), (20, 50), (30, 25)):
+        _deposit(store, timeline, "a", minor, ts)
+    assert timeline.balance_at("a", 9) is None
+    assert timeline.balance_at("a", 10) == 100
+    assert timeline.balance_at("a", 25) == 150
+    assert timeline.balance_at("a", 10**18) == 175
+    assert timeline.balance_at("ghost", 10) is None
+
+
+def test_pruned_history_reports_truncation():
+    store = AccountStore()
+    timeline = BalanceTimeline(store, max_points=4)
+    for ts in range(1, 7):
+        _deposit(store, timeline, "a", 1, ts)
+    assert timeline.balance_at("a", 6) == 6
+    assert timeline.balance_at("a", 3) == 3
+    with pytest.raises(HistoryTruncated):
+        timeline.balance_at("a", 2)
+
+
+def test_global_cap_prunes_every_account():
+    store = AccountStore()
+    timeline = BalanceTimeline(store, max_total_points=10)
+    for ts in range(1, 5):
+        for account_id in ("a", "b", "c"):
+            _deposit(store, timeline, account_id, 1, ts)
+    # 11e point : chaque compte garde la moitié la plus récente de son historique
+    assert timeline._total == 7
+    assert timeline.balance_at("a", 3) == 3
+    assert timeline.balance_at("c", 2) == 2
+    assert timeline.balance_at("c", 4) == 4
+    with pytest.raises(HistoryTruncated):
+        timeline.balance_at("b", 2)
+    with pytest.raises(HistoryTruncated):
+        timeline.balance_at("c", 1)
+
+
+def test_journal_replay_feeds_timeline(tmp_path):
+    path = str(tmp_path / "ledger.wal")
+    core.reset_memory()
+    core.open_journal(path)
+    try:
+        core.create_or_update_account("j1", 10)
+        between = time.time_ns()
+        core.create_or_update_account("j1", 5)
+    finally:
+        core.close_journal()
+    core.reset_memory()
+
+    timeline = BalanceTimeline(core.accounts)
+    core.open_journal(path, replay_to=[timeline])
+    try:
+        assert timeline.balance_at("j1", between) == 1000
+        assert timeline.balance_at("j1", time.time_ns()) == 1500
+    finally:
+        core.close_journal()
+        core.reset_memory()
+
+
+def test_balance_endpoint_as_of(client):
+    client.post("/event", json={"type": "deposit", "account_id": "t1", "amount": 100})
+    between = datetime.now(timezone.utc)
+    time.sleep(0.001)
+    client.post("/event", json={"type": "withdraw", "account_id": "t1", "amount": 40})
+
+    past = client.get("/balance", params={"account_id": "t1", "as_of": between.isoformat()})
+    assert past.status_code == 200, past.text
+    assert past.json()["balance"] == 100
+    assert client.get("/balance", params={"account_id": "t1"}).json()["balance"] == 60
+    early = client.get("/balance", params={"account_id": "t1", "as_of": "2000-01-01T00:00:00Z"})
+    assert early.status_code == 404
@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+from src.app.core import core
+from src.app.core.events import LedgerEvent, OP_DEPOSIT, OP_TRANSFER
+from src.app.core.store import AccountStore
+from src.app.core.write_behind import WriteBehindFlusher
+from src.app.models import AccountModel, TransactionModel
+
+
+@pytest.fixture
+def listening_flusher(session_factory):
+    core.accounts.clear()
+    flusher = WriteBehindFlusher(session_factory, core.accounts, interval=60)
+    core.add_listener(flusher)
+    yield flusher
+    core.remove_listener(flusher)
+    core.accounts.clear()
+
+
+def test_flush_inserts_accounts_and_transactions(listening_flusher, session_factory):
+    core.create_or_update_account("w1", 100)
+    core.create_or_update_account("w2", 10)
+    core.transfer_between_accounts("w1", "w2", 40)
+    assert listening_flusher.pending == 4
+    assert listening_flusher.flush() == 4
+    assert listening_flusher.pending == 0
+
+    session = session_factory()
+    balances = {a.id: a.balance for a in session.query(AccountModel)}
+    assert balances == {"w1": 60.0, "w2": 50.0}
+    transfers = session.query(TransactionModel).filter_by(type="transfer").all()
+    assert sorted((t.account_id, t.amount) for t in transfers) == [("w1", -40.0), ("w2", 40.0)]
+    session.close()
+
+
+def test_second_flush_updates_existing_rows(listening_flusher, session_factory):
+    core.create_or_update_account("w1", 100)
+    listening_flusher.flush()
+    core.withdraw_from_account("w1", 25)
+    listening_flusher.flush()
+
+    session = session_factory()
+    assert session.get(AccountModel, "w1").balance == 75.0
+    assert session.query(TransactionModel).count() == 2
+    session.close()
+
+
+def test_failed_flush_requeues_batch(session_factory):
+    store = AccountStore()
+    store.add("w1", 500)
+    flusher = WriteBehindFlusher(session_factory, store)
+    flusher.on_event(LedgerEvent(0, OP_DEPOSIT, "w1", "", 500))
+
+    def broken_factory():
+        raise RuntimeError("database down")
+
+    flusher.session_factory = broken_factory
+    with pytest.raises(RuntimeError):
+        flusher.flush()
+    assert flusher.pending == 1
+
+    flusher.session_factory = session_factory
+    assert flusher.flush() == 1
+
+
+def test_throttle_blocks_until_flushed(session_factory):
+    store = AccountStore()
+    store.add("w1", 0)
+    flusher = WriteBehindFlusher(session_factory, store, max_pending=2)
+    for _ in range(2):
+        flusher.on_event(LedgerEvent(0, OP_DEPOSIT, "w1", "", 1))
+    assert flusher.throttle(timeout=0.01) is False
+    assert flusher.lag() > 0
+
+    timer = threading.Timer(0.05, flusher.flush)
+    timer.start()
+    try:
+        assert flusher.throttle(timeout=5) is True
+        assert flusher.lag() == 0
+    finally:
+        # throttle rend la main dès que le lot est pris : l'écriture doit finir
+        # avant que la fixture ne ferme la base
+        timer.join()
+
+
+def test_background_thread_flushes_on_size(session_factory):
+    store = AccountStore()
+    store.add("w1", 300)
+    flusher = WriteBehindFlusher(session_factory, store, interval=60, max_batch=3)
+    flusher.start()
+    try:
+        for _ in range(3):
+            flusher.on_event(LedgerEvent(0, OP_DEPOSIT, "w1", "", 100))
+        deadline = time.monotonic() + 5
+        while flusher.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert flusher.pending == 0
+    finally:
+        flusher.stop()
+    session = session_factory()
+    assert session.query(TransactionModel).count() == 3
+    session.close()
+
+
+def test_reset_discards_pending(listening_flusher):
+    listening_flusher.on_event(LedgerEvent(0, OP_TRANSFER, "a", "b", 1))
+    listening_flusher.on_reset()
+    assert listening_flusher.pending == 0
+
+
+def test_flush_keeps_sql_owner_and_carries_store_owner(session_factory):
+    session = session_factory()
+    session.add(AccountModel(id="w1", balance=1, owner_id=7))
+    session.commit()
+    store = AccountStore()
+    store.add("w1", 500)  # propriétaire inconnu du ledger (1 par défaut)
+    store.add("w2", 200, owner_id=3)
+    flusher = WriteBehindFlusher(session_factory, store)
+    flusher.on_event(LedgerEvent(0, OP_TRANSFER, "w1", "w2", 100))
+    flusher.flush()
+
+    session.expire_all()
+    assert (session.get(AccountModel, "w1").balance, session.get(AccountModel, "w1").owner_id) == (5.0, 7)
+    assert (session.get(AccountModel, "w2").balance, session.get(AccountModel, "w2").owner_id) == (2.0, 3)
+    session.close()
+
+
+def test_paused_flushes_pending_then_blocks_writes(listening_flusher):
+    core.create_or_update_account("w1", 100)
+    with listening_flusher.paused():
+        assert listening_flusher.pending == 0
+        core.create_or_update_account("w1", 50)
+        flushed = []
+        thread = threading.Thread(target=lambda: flushed.append(listening_flusher.flush()))
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive() and not flushed
+    thread.join()
+    assert flushed == [1]